@@ -0,0 +1,23 @@
+"""Gunicorn settings picked up automatically by `gunicorn run:app`.
+
+Workers are separate processes, so Prometheus metrics are written to a shared
+directory and merged when /metrics is scraped (see src/metrics.py).
+"""
+import os
+import shutil
+import tempfile
+
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'workforce-prometheus')
+)
+
+
+def on_starting(server):
+    # Start each master with an empty directory so stale worker files don't linger.
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,8 +3,17 @@ import os
 import logging
 from flask import Flask, request
 from flask_cors import CORS
-from .extensions import db, migrate, jwt, api, ma, mail, socketio
+from werkzeug.middleware.proxy_fix import ProxyFix
+from .extensions import db, migrate, jwt, api, ma, mail, socketio, limiter, hasher, renderer
 from .config import DevConfig
+from .instrumentation import init_sql_instrumentation
+from .metrics import init_metrics
+from .slow_queries import init_slow_query_log
+from .replicas import init_read_replicas
+from .serializers import init_serializers
+from .compression import init_compression
+from .idempotency import init_idempotency
+from .cli import init_cli
 from .routes import init_routes
 from .routes.auth import auth_ns
 from .routes.applications import register_routes as register_applications
@@ -15,6 +24,11 @@ from .routes.freelancer import register_routes as register_freelancer
 from .routes.freelancers_list import api as freelancers_ns
 from .routes.chat import api as chat_ns
 from .routes.projects import api as projects_ns
+from .routes.batch import api as batch_ns, init_batch
+from .routes.dashboard import api as dashboard_ns
+from .routes.milestone import api as milestones_ns
+from .routes.time_logs import api as time_entries_ns
+from .routes.timesheets import api as timesheets_ns
 from . import models  # ensure models are imported for mapper configuration
 
 
@@ -41,9 +55,9 @@ def create_app(config=DevConfig):
                 "http://localhost:8080",
             ],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept"],
+            "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept", "Idempotency-Key"],
             "supports_credentials": True,
-            "expose_headers": ["X-Total-Count", "X-Page-Count"],
+            "expose_headers": ["X-Total-Count", "X-Page-Count", "Server-Timing", "Content-Encoding", "Idempotent-Replayed"],
         }
     })
     migrate.init_app(app, db)
@@ -79,6 +93,22 @@ def create_app(config=DevConfig):
         return {"success": False, "message": "Token has been revoked."}, 401
     ma.init_app(app)
     mail.init_app(app)
+    limiter.init_app(app)
+    hasher.init_app(app)
+    renderer.init_app(app)
+
+    # Registered first so its after_request hook runs last, on the final body.
+    init_compression(app)
+    init_sql_instrumentation(app)
+    init_slow_query_log(app)
+    init_read_replicas(app)
+    init_metrics(app)
+    init_idempotency(app)
+    init_batch(app)
+    init_cli(app)
+
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
     # Optional safety net: create tables automatically if allowed (useful on fresh DBs)
     if os.getenv('AUTO_CREATE_TABLES', 'true').lower() == 'true':
@@ -117,12 +147,19 @@ def create_app(config=DevConfig):
         except Exception as e:
             app.logger.error(f"Schema auto-patch failed: {e}")
 
+    init_serializers(app)
+
     # Register namespaces
     init_routes()
     api.add_namespace(auth_ns, path='/api/auth')
     api.add_namespace(projects_ns, path='/api/projects')
     api.add_namespace(freelancers_ns, path='/api/freelancers')
     api.add_namespace(chat_ns, path='/api/chat')
+    api.add_namespace(batch_ns, path='/api/batch')
+    api.add_namespace(dashboard_ns, path='/api/client/dashboard')
+    api.add_namespace(milestones_ns, path='/api/milestones')
+    api.add_namespace(time_entries_ns, path='/api/time-entries')
+    api.add_namespace(timesheets_ns, path='/api/timesheets')
     register_applications(api.namespace('applications', description='Application Management', path='/api/applications'))
     register_invoices(api.namespace('invoices', description='Invoice Management', path='/api/invoices'))
     register_receipts(api.namespace('freelancer/payments', description='Freelancer Payment History', path='/api/freelancer/payments'))
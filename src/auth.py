@@ -1,7 +1,8 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt
-from .extensions import jwt
+from flask_limiter.util import get_remote_address
+from .extensions import jwt, limiter
 from .models import User
 
 # Initialize JWT manager (configured in app.py)
@@ -18,6 +19,19 @@ def admin_required(fn):
         return fn(*args, **kwargs)
     return wrapper
 
+# Rate limit credential endpoints per client IP and per target account
+def account_key():
+    data = request.get_json(silent=True) or {}
+    email = str(data.get('email') or '').strip().lower()
+    return f'account:{email}' if email else get_remote_address()
+
+
+def auth_rate_limited(fn):
+    """Applies AUTH_IP_RATE_LIMIT and AUTH_ACCOUNT_RATE_LIMIT to a login/registration handler."""
+    fn = limiter.limit(lambda: current_app.config['AUTH_ACCOUNT_RATE_LIMIT'], key_func=account_key)(fn)
+    fn = limiter.limit(lambda: current_app.config['AUTH_IP_RATE_LIMIT'])(fn)
+    return fn
+
 # Create JWT token with role claim
 def create_token(user):
     additional_claims = {'role': user.role}
@@ -0,0 +1,95 @@
+"""Background job queue throughput: jobs claimed and run per second with N workers.
+
+For each worker count, enqueues --jobs jobs spread over the three lanes, then
+drains them with that many Worker threads claiming --batch jobs per
+statement. Each job sleeps --work-ms to stand in for an email or gateway
+call (0 measures the queue alone). Reports jobs/sec and how many jobs were
+claimed more than once, which must stay 0: ``SKIP LOCKED`` claims never
+overlap. Needs PostgreSQL; benchmark jobs are deleted afterwards.
+
+Usage:
+    python -m src.benchmarks.job_queue --workers 1,2,4,8 --jobs 5000
+    python -m src.benchmarks.job_queue --workers 8,16 --batch 1 --work-ms 20
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, insert, select
+
+from src.app import create_app
+from src.config import DevConfig
+from src.extensions import db
+from src.jobs import Worker, job_handler
+from src.models import BackgroundJob
+from src.models.background_job import LANES
+
+KIND = 'benchmark.noop'
+
+
+def enqueue_jobs(app, count):
+    with app.app_context():
+        db.session.execute(delete(BackgroundJob).where(BackgroundJob.kind == KIND))
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        lanes = list(LANES.values())
+        db.session.execute(insert(BackgroundJob), [{
+            'kind': KIND, 'payload': {}, 'priority': lanes[n % len(lanes)], 'status': 'queued',
+            'run_at': now, 'attempts': 0, 'max_attempts': 1,
+        } for n in range(count)])
+        db.session.commit()
+
+
+def remaining(app):
+    with app.app_context():
+        return db.session.execute(
+            select(func.count()).where(BackgroundJob.kind == KIND, BackgroundJob.status != 'done')
+        ).scalar()
+
+
+def run(app, workers, count):
+    enqueue_jobs(app, count)
+    stop = threading.Event()
+    threads = [threading.Thread(target=Worker(app).run, args=(stop,)) for _ in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    while remaining(app):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for t in threads:
+        t.join()
+    with app.app_context():
+        repeated = db.session.execute(
+            select(func.count()).where(BackgroundJob.kind == KIND, BackgroundJob.attempts > 1)
+        ).scalar()
+    return elapsed, repeated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4,8', help='Comma-separated worker thread counts')
+    parser.add_argument('--jobs', type=int, default=5000, help='Jobs per run')
+    parser.add_argument('--batch', type=int, default=10, help='Jobs claimed per statement')
+    parser.add_argument('--work-ms', type=float, default=0.0, help='Simulated work per job')
+    args = parser.parse_args()
+
+    app = create_app(DevConfig)
+    app.config.update(JOB_CLAIM_BATCH=args.batch, JOB_POLL_INTERVAL=0.01)
+    job_handler(KIND)(lambda: time.sleep(args.work_ms / 1000.0))
+
+    print(f"{args.jobs} jobs per run, batch {args.batch}, {args.work_ms:g} ms of work per job")
+    print(f"{'workers':>8} {'seconds':>9} {'jobs/sec':>10} {'re-claimed':>11}")
+    try:
+        for workers in [int(n) for n in args.workers.split(',')]:
+            elapsed, repeated = run(app, workers, args.jobs)
+            print(f"{workers:>8} {elapsed:>9.2f} {args.jobs / elapsed:>10.0f} {repeated:>11}")
+    finally:
+        with app.app_context():
+            db.session.execute(delete(BackgroundJob).where(BackgroundJob.kind == KIND))
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+"""Endpoint load test driving scripted user journeys through the real app.
+
+Each virtual user plays a client and a freelancer through the main flows:
+signup/login, project browsing, apply, hire, milestones and payments.
+Per step we record latency (p50/p95/p99), status codes and SQL statements per
+request, plus overall throughput, then compare against a stored baseline and
+flag regressions.
+
+Targets:
+    inprocess  create_app() driven through its WSGI test client (default)
+    gunicorn   a local `gunicorn run:app` started for the run, driven over HTTP
+
+Usage:
+    python -m src.benchmarks.journeys --users 8 --iterations 5
+    python -m src.benchmarks.journeys --target gunicorn --workers 4 --users 32
+    python -m src.benchmarks.journeys --save-baseline      # record a new baseline
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+
+from src.app import create_app
+from src.config import DevConfig
+from src.extensions import db
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+PASSWORD = 'journey-password-123'
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+class JourneyConfig(DevConfig):
+    # Every virtual user signs up and logs in from the same address
+    RATELIMIT_ENABLED = False
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Thread-safe collector of per-step samples."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)   # step -> [(seconds, status, sql_count)]
+
+    def add(self, step, seconds, status, sql_count):
+        with self.lock:
+            self.samples[step].append((seconds, status, sql_count))
+
+    def summary(self, elapsed):
+        steps = {}
+        total = 0
+        for step, rows in sorted(self.samples.items()):
+            latencies = [r[0] for r in rows]
+            sql = [r[2] for r in rows if r[2] is not None]
+            total += len(rows)
+            steps[step] = {
+                'requests': len(rows),
+                'errors': sum(1 for r in rows if r[1] >= 400),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'sql_per_request': round(sum(sql) / len(sql), 2) if sql else None,
+            }
+        return {'elapsed_s': round(elapsed, 2), 'requests': total,
+                'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0, 'steps': steps}
+
+
+class InProcessTarget:
+    """Drives the WSGI app directly; SQL statements are counted per thread."""
+
+    def __init__(self, app):
+        from sqlalchemy import event
+
+        self.app = app
+        self.local = threading.local()
+        with app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            self.local.sql = getattr(self.local, 'sql', 0) + 1
+
+    def session(self):
+        return _InProcessSession(self)
+
+    def close(self):
+        pass
+
+
+class _InProcessSession:
+    def __init__(self, target):
+        self.target = target
+        self.client = target.app.test_client()
+
+    def request(self, method, path, token=None, json_body=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        self.target.local.sql = 0
+        resp = self.client.open(path, method=method, json=json_body, headers=headers)
+        return resp.status_code, resp.get_json(silent=True), self.target.local.sql
+
+
+class GunicornTarget:
+    """Starts gunicorn on a local port and talks to it over HTTP."""
+
+    def __init__(self, workers, port):
+        self.base_url = f'http://127.0.0.1:{port}'
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.proc = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', 'run:app'],
+            cwd=root,
+            # Every virtual user signs up and logs in from 127.0.0.1
+            env={**os.environ, 'RATELIMIT_ENABLED': 'false'},
+        )
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                requests.get(f'{self.base_url}/api/docs', timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.25)
+        self.close()
+        raise RuntimeError('gunicorn did not start within 30s')
+
+    def session(self):
+        return _HttpSession(self.base_url)
+
+    def close(self):
+        self.proc.terminate()
+        self.proc.wait(timeout=10)
+
+
+class _HttpSession:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.http = requests.Session()
+
+    def request(self, method, path, token=None, json_body=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        resp = self.http.request(method, self.base_url + path, json=json_body, headers=headers)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = None
+        # SQL counts come back from the server in the Server-Timing header.
+        match = SERVER_TIMING_QUERIES.search(resp.headers.get('Server-Timing', ''))
+        return resp.status_code, body, int(match.group(1)) if match else None
+
+
+class VirtualUser:
+    """One client + one freelancer walking through the platform's main journeys."""
+
+    def __init__(self, target, recorder):
+        self.session = target.session()
+        self.recorder = recorder
+        self.tag = uuid.uuid4().hex[:10]
+
+    def step(self, name, method, path, token=None, json_body=None):
+        started = time.perf_counter()
+        status, body, sql = self.session.request(method, path, token, json_body)
+        self.recorder.add(name, time.perf_counter() - started, status, sql)
+        return status, body or {}
+
+    def signup_and_login(self, role, extra):
+        email = f'journey-{role}-{self.tag}@example.com'
+        self.step(f'signup_{role}', 'POST', f'/api/auth/register/{role}',
+                  json_body={'email': email, 'password': PASSWORD, **extra})
+        _, body = self.step('login', 'POST', '/api/auth/login', json_body={'email': email, 'password': PASSWORD})
+        return body.get('access_token')
+
+    def run(self, iterations):
+        client = self.signup_and_login('client', {'company_name': f'Journey {self.tag}'})
+        freelancer = self.signup_and_login('freelancer', {'hourly_rate': 40, 'bio': 'Benchmarks'})
+
+        for n in range(iterations):
+            _, body = self.step('create_project', 'POST', '/api/projects/', client,
+                                {'title': f'Journey project {self.tag}-{n}', 'description': 'Load test', 'budget': 1500})
+            project_id = (body.get('data') or {}).get('id')
+
+            self.step('list_projects', 'GET', '/api/projects/?page=1&per_page=20', freelancer)
+            self.step('list_projects_client', 'GET', '/api/projects/?page=1&per_page=20', client)
+            if not project_id:
+                continue
+            self.step('project_detail', 'GET', f'/api/projects/{project_id}', freelancer)
+            self.step('apply', 'POST', f'/api/freelancer/projects/{project_id}/apply', freelancer,
+                      {'proposal': 'I can do this quickly.', 'bid_amount': 1200})
+            _, apps = self.step('project_applications', 'GET', f'/api/projects/{project_id}/applications', client)
+            applicants = apps.get('data') or []
+            if applicants:
+                freelancer_id = applicants[0].get('freelancer', {}).get('id')
+                self.step('hire', 'POST', f'/api/projects/{project_id}/hire', client, {'freelancer_id': freelancer_id})
+
+            _, ms = self.step('create_milestone', 'POST', '/api/milestones/', client,
+                              {'project_id': project_id, 'title': 'Phase 1', 'description': 'First delivery',
+                               'due_date': '2030-01-01', 'amount': 500})
+            milestone_id = (ms.get('data') or {}).get('id')
+            self.step('list_milestones', 'GET', '/api/milestones/', client)
+            if milestone_id:
+                self.step('approve_milestone', 'PUT', f'/api/milestones/{milestone_id}/approve', client)
+
+            self.step('list_payments', 'GET', '/api/client/payments', client)
+
+
+def compare(result, baseline, tolerance):
+    """Returns a list of human-readable regressions against the baseline."""
+    regressions = []
+    for step, current in result['steps'].items():
+        before = baseline.get('steps', {}).get(step)
+        if not before:
+            continue
+        for metric in ('p95_ms', 'p99_ms'):
+            if before[metric] and current[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f'{step}: {metric} {before[metric]} -> {current[metric]}')
+        if before.get('sql_per_request') is not None and current.get('sql_per_request') is not None \
+                and current['sql_per_request'] > before['sql_per_request']:
+            regressions.append(f"{step}: sql_per_request {before['sql_per_request']} -> {current['sql_per_request']}")
+        if current['errors'] > before['errors']:
+            regressions.append(f"{step}: errors {before['errors']} -> {current['errors']}")
+    if baseline.get('throughput_rps') and result['throughput_rps'] < baseline['throughput_rps'] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['throughput_rps']} -> {result['throughput_rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run scripted user journeys and report latency/throughput.')
+    parser.add_argument('--target', choices=['inprocess', 'gunicorn'], default='inprocess')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--users', type=int, default=4, help='Concurrent virtual users')
+    parser.add_argument('--iterations', type=int, default=3, help='Journeys per virtual user')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown before flagging')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--output', help='Write the JSON result here as well')
+    args = parser.parse_args()
+
+    if args.target == 'gunicorn':
+        target = GunicornTarget(args.workers, args.port)
+    else:
+        target = InProcessTarget(create_app(JourneyConfig))
+
+    recorder = Recorder()
+    users = [VirtualUser(target, recorder) for _ in range(args.users)]
+    threads = [threading.Thread(target=u.run, args=(args.iterations,)) for u in users]
+    started = time.perf_counter()
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        target.close()
+    result = recorder.summary(time.perf_counter() - started)
+    result['target'] = args.target
+
+    print(f"\n{'step':<24}{'req':>6}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'sql/req':>9}")
+    for step, s in result['steps'].items():
+        sql = '-' if s['sql_per_request'] is None else s['sql_per_request']
+        print(f"{step:<24}{s['requests']:>6}{s['errors']:>6}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{sql:>9}")
+    print(f"\n{result['requests']} requests in {result['elapsed_s']}s -> {result['throughput_rps']} req/s")
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(result, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as fh:
+            json.dump(result, fh, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline to record one.')
+        return
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    if baseline.get('target') != result['target']:
+        print(f"Warning: baseline was recorded against '{baseline.get('target')}'")
+    regressions = compare(result, baseline, args.tolerance)
+    if regressions:
+        print('\nREGRESSIONS:')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
+    print('\nNo regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
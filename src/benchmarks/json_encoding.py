@@ -0,0 +1,63 @@
+"""Encoding time for our largest list responses: stdlib json vs orjson.
+
+Loads the biggest list payloads straight from the database (project list with
+client/freelancer details, milestones, applications, payments, admin user
+list), serializes them the way the endpoints do, then times only the JSON
+encoding step with each encoder in representations.py.
+
+Usage:
+    python -m src.benchmarks.json_encoding --limit 5000 --repeat 10
+"""
+import argparse
+import time
+
+from src.app import create_app
+from src.config import DevConfig
+from src.models import Milestone, Payment, Project, ProjectApplication, User
+from src.representations import ENCODERS
+from src.serializers import serialize_many
+
+
+def load_payloads(limit):
+    project_include = ('client_details', 'freelancer_details')
+    return {
+        'projects': serialize_many(Project.query.limit(limit).all(), Project, project_include),
+        'milestones': serialize_many(Milestone.query.limit(limit).all(), Milestone),
+        'applications': serialize_many(ProjectApplication.query.limit(limit).all(), ProjectApplication),
+        'payments': serialize_many(Payment.query.limit(limit).all(), Payment),
+        'admin_users': serialize_many(User.query.limit(limit).all(), User),
+    }
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time JSON encoding of large list responses.')
+    parser.add_argument('--limit', type=int, default=5000, help='Rows per list payload')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per case; the best one is reported')
+    args = parser.parse_args()
+
+    app = create_app(DevConfig)
+    with app.app_context():
+        payloads = load_payloads(args.limit)
+
+    names = sorted(ENCODERS)
+    print(f"{'payload':<14}{'rows':>7}{'KiB':>9}" + ''.join(f'{n + " ms":>12}' for n in names))
+    for label, items in payloads.items():
+        body = {'success': True, 'data': items}
+        size = len(ENCODERS['json'](body)) / 1024
+        cells = ''.join(f'{best_of(lambda: ENCODERS[n](body), args.repeat) * 1000:>12.2f}' for n in names)
+        print(f'{label:<14}{len(items):>7}{size:>9.0f}{cells}')
+    if 'orjson' not in ENCODERS:
+        print('\norjson is not installed; only the stdlib encoder was measured.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Login throughput while the auth endpoints are under a credential-stuffing burst.
+
+Attacker threads hammer /api/auth/login with wrong passwords (rotating source
+IPs and a handful of target accounts) while one legitimate client keeps
+logging in with valid credentials from its own IP. The legitimate client is
+paced to stay under the app's AUTH_ACCOUNT_RATE_LIMIT and AUTH_IP_RATE_LIMIT
+for the length of the run, so its numbers measure login latency rather than
+the limiter. Reports attacker status codes (401 / 429 / 503), the legitimate
+client's latency and throughput, and any legitimate logins that were still
+rate limited.
+
+Usage:
+    python -m src.benchmarks.login_under_attack --attackers 32 --duration 20
+"""
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+
+from limits import parse_many
+
+from src.app import create_app
+from src.config import DevConfig
+from src.extensions import db
+from src.models import User
+
+LEGIT_EMAIL = 'bench-legit@example.com'
+LEGIT_PASSWORD = 'bench-legit-password'
+
+
+def ensure_user(app, email, password):
+    with app.app_context():
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            user = User(email=email, role='client', is_verified=True)
+            db.session.add(user)
+        user.set_password(password)
+        db.session.commit()
+
+
+def attacker(app, index, targets, stop, statuses):
+    client = app.test_client()
+    n = 0
+    while not stop.is_set():
+        ip = f'10.{index % 250}.{(n // 250) % 250}.{n % 250}'
+        email = targets[n % len(targets)]
+        resp = client.post('/api/auth/login', json={'email': email, 'password': f'wrong-{n}'},
+                           environ_base={'REMOTE_ADDR': ip})
+        statuses[resp.status_code] += 1
+        n += 1
+
+
+def legit_interval(app, duration):
+    """Seconds between legitimate logins that keep one account on one IP under
+    every configured auth limit for a run of ``duration`` seconds."""
+    interval = 0.0
+    for limit in parse_many(f"{app.config['AUTH_ACCOUNT_RATE_LIMIT']};{app.config['AUTH_IP_RATE_LIMIT']}"):
+        # Logins land at 0, interval, 2 * interval, ...: at most ``amount`` per window
+        span = min(limit.get_expiry(), duration)
+        interval = max(interval, span / max(limit.amount - 1, 1))
+    return interval
+
+
+def legit(app, stop, interval, latencies, statuses):
+    client = app.test_client()
+    while not stop.is_set():
+        start = time.perf_counter()
+        resp = client.post('/api/auth/login', json={'email': LEGIT_EMAIL, 'password': LEGIT_PASSWORD},
+                           environ_base={'REMOTE_ADDR': '192.0.2.10'})
+        statuses[resp.status_code] += 1
+        if resp.status_code != 429:
+            latencies.append(time.perf_counter() - start)
+        stop.wait(interval)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attackers', type=int, default=32)
+    parser.add_argument('--targets', type=int, default=5, help='Distinct accounts attacked')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds to run')
+    args = parser.parse_args()
+
+    app = create_app(DevConfig)
+    ensure_user(app, LEGIT_EMAIL, LEGIT_PASSWORD)
+    targets = [f'bench-victim{i}@example.com' for i in range(args.targets)]
+    for email in targets:
+        ensure_user(app, email, 'victim-password')
+
+    interval = legit_interval(app, args.duration)
+    stop = threading.Event()
+    attack_statuses, legit_statuses, latencies = Counter(), Counter(), []
+    threads = [threading.Thread(target=attacker, args=(app, i, targets, stop, attack_statuses))
+               for i in range(args.attackers)]
+    threads.append(threading.Thread(target=legit, args=(app, stop, interval, latencies, legit_statuses)))
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    attempts = sum(attack_statuses.values())
+    print(f"\nAttack: {attempts} attempts in {elapsed:.1f}s ({attempts / elapsed:.0f} req/s)")
+    for code, count in sorted(attack_statuses.items()):
+        print(f"  {code}: {count}")
+    limited = legit_statuses.pop(429, 0)
+    print(f"\nLegitimate logins (one every {interval:.1f}s): {sum(legit_statuses.values())} {dict(legit_statuses)}")
+    print(f"  rate limited (429): {limited}")
+    if latencies:
+        print(f"  p50 {percentile(latencies, 50) * 1000:.1f} ms"
+              f"  p95 {percentile(latencies, 95) * 1000:.1f} ms"
+              f"  max {max(latencies) * 1000:.1f} ms"
+              f"  mean {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
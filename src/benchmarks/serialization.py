@@ -0,0 +1,67 @@
+"""Rows per second for Marshmallow auto-schemas vs. the precompiled serializers.
+
+Serializes in-memory (transient) model instances so only the dump path is
+measured, no database needed. Project rows include their client and
+freelancer details, like ``Project.to_dict``.
+
+Usage:
+    python -m src.benchmarks.serialization --rows 20000 --repeat 5
+"""
+import argparse
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from src.app import create_app
+from src.config import DevConfig
+from src.models import (
+    ClientProfile, FreelancerProfile, Milestone, MilestoneSchema, Payment, PaymentSchema, Project, ProjectSchema,
+)
+from src.serializers import serializer_for
+
+
+def make_rows(n):
+    now = datetime.now(timezone.utc)
+    client = ClientProfile(id=1, user_id=1, company_name='Acme', industry='Software')
+    freelancer = FreelancerProfile(id=2, user_id=2, hourly_rate=Decimal('45.00'))
+    projects = [Project(id=i, title=f'Project {i}', description='Build the thing', budget=Decimal('1500.00'),
+                        status='active', client_id=1, freelancer_id=2, client=client, freelancer=freelancer,
+                        created_at=now) for i in range(n)]
+    milestones = [Milestone(id=i, project_id=i, title='Phase 1', description='First delivery',
+                            due_date=date(2030, 1, 1), amount=Decimal('500.00'), status='pending') for i in range(n)]
+    payments = [Payment(id=i, invoice_id=i, client_id=1, freelancer_id=2, transaction_id=f'tx-{i}',
+                        amount=Decimal('500.00'), paid_at=now, created_at=now, status='completed',
+                        payment_date=now.date(), payment_method='card') for i in range(n)]
+    return {'projects': (Project, ProjectSchema, projects),
+            'milestones': (Milestone, MilestoneSchema, milestones),
+            'payments': (Payment, PaymentSchema, payments)}
+
+
+def rows_per_second(fn, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Marshmallow and precompiled serializer throughput.')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the best one is reported')
+    args = parser.parse_args()
+
+    app = create_app(DevConfig)
+    with app.app_context():
+        print(f"{'model':<12}{'marshmallow rows/s':>20}{'precompiled rows/s':>20}{'speedup':>10}")
+        for name, (model, schema_cls, rows) in make_rows(args.rows).items():
+            include = ('client_details', 'freelancer_details') if model is Project else ()
+            before = rows_per_second(lambda r: schema_cls(many=True).dump(r), rows, args.repeat)
+            after = rows_per_second(lambda r: serializer_for(model).dump_many(r, include), rows, args.repeat)
+            print(f'{name:<12}{before:>20,.0f}{after:>20,.0f}{after / before:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Flask CLI maintenance commands (``flask <group> <command>``).
+
+Meant for cron jobs; each command runs in one transaction and prints a
+one-line summary. ``flask jobs work`` is the exception: it is the
+long-running background job worker (see jobs.py).
+"""
+import signal
+import threading
+
+import click
+from flask import current_app
+
+from .extensions import db
+from .idempotency import purge_expired
+from .jobs import prune_jobs, run_workers
+from .invoice_reminders import send_invoice_reminders, sweep_overdue_invoices
+from .models.invoice import generate_milestone_invoices
+from .models.timesheet import roll_up_finished_weeks
+
+
+def init_cli(app):
+    @app.cli.group('timesheets')
+    def timesheets_cli():
+        """Timesheet rollup maintenance."""
+
+    @timesheets_cli.command('rollup')
+    def rollup_command():
+        """Roll up time logged in finished weeks (run weekly)."""
+        through = roll_up_finished_weeks()
+        db.session.commit()
+        click.echo(f'Timesheets rolled up through {through.date().isoformat()}')
+
+    @app.cli.group('idempotency')
+    def idempotency_cli():
+        """Idempotency-Key maintenance."""
+
+    @idempotency_cli.command('purge')
+    def purge_command():
+        """Delete expired idempotency keys (also after IDEMPOTENCY_ENABLED is turned off)."""
+        click.echo(f'Deleted {purge_expired()} expired idempotency keys')
+
+    @app.cli.group('invoices')
+    def invoices_cli():
+        """Invoice batch jobs."""
+
+    @invoices_cli.command('generate')
+    @click.option('--due-days', type=int, default=None, help='Days until the new invoices are due '
+                                                             '(default INVOICE_DUE_DAYS).')
+    def generate_command(due_days):
+        """Invoice every approved milestone that has no invoice yet."""
+        if due_days is None:
+            due_days = current_app.config.get('INVOICE_DUE_DAYS', 14)
+        created = generate_milestone_invoices(due_days)
+        db.session.commit()
+        click.echo(f'Created {created} invoices')
+
+    @invoices_cli.command('sweep-overdue')
+    @click.option('--no-send', is_flag=True, help='Only queue the reminder digests.')
+    def sweep_overdue_command(no_send):
+        """Mark pending invoices past their due date overdue and remind clients (run daily)."""
+        marked, queued = sweep_overdue_invoices()
+        db.session.commit()
+        click.echo(f'Marked {marked} invoices overdue; queued {queued} client reminders')
+        if not no_send:
+            send_reminders()
+
+    @invoices_cli.command('send-reminders')
+    def send_reminders_command():
+        """Mail queued overdue-invoice reminders."""
+        send_reminders()
+
+    def send_reminders():
+        batch = current_app.config.get('INVOICE_REMINDER_BATCH', 100)
+        lease = current_app.config.get('INVOICE_REMINDER_LEASE_SECONDS', 600)
+        total_sent = total_failed = last_id = 0
+        while True:
+            sent, failed, last_id = send_invoice_reminders(limit=batch, after_id=last_id, lease=lease)
+            total_sent, total_failed = total_sent + sent, total_failed + failed
+            if sent + failed < batch:
+                break
+        click.echo(f'Sent {total_sent} reminders ({total_failed} failed)')
+
+    @app.cli.group('jobs')
+    def jobs_cli():
+        """Background job queue."""
+
+    @jobs_cli.command('work')
+    @click.option('--concurrency', type=int, default=None, help='Worker threads (default JOB_WORKER_CONCURRENCY).')
+    @click.option('--lane', 'lanes', multiple=True, type=click.Choice(['high', 'default', 'low']),
+                  help='Only run jobs from this lane; repeatable (default: all lanes).')
+    def work_command(concurrency, lanes):
+        """Run background jobs until SIGTERM or Ctrl-C."""
+        if concurrency is None:
+            concurrency = current_app.config.get('JOB_WORKER_CONCURRENCY', 4)
+        stop = threading.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: stop.set())
+        click.echo(f'Running {concurrency} job workers on {", ".join(lanes) or "all"} lanes')
+        run_workers(current_app._get_current_object(), concurrency, list(lanes) or None, stop)
+        click.echo('Job workers stopped')
+
+    @jobs_cli.command('prune')
+    @click.option('--days', type=int, default=7, help='Keep finished jobs this many days.')
+    def prune_command(days):
+        """Delete finished jobs older than --days."""
+        deleted = prune_jobs(days)
+        db.session.commit()
+        click.echo(f'Deleted {deleted} finished jobs')
@@ -0,0 +1,135 @@
+"""Response compression negotiated by Accept-Encoding.
+
+Brotli is used when the ``brotli`` package is installed and the client
+accepts it, gzip otherwise. Responses are left alone when they are:
+
+* smaller than COMPRESS_MIN_SIZE bytes,
+* of a type that is already compressed (images, archives, PDFs, ...),
+* file downloads (``send_file`` passthrough or ``Content-Disposition:
+  attachment``), or already carry a Content-Encoding.
+
+Streamed (generator) responses are compressed chunk by chunk with a
+compressor object and flushed after every chunk, so clients still receive
+data incrementally. COMPRESS_GZIP_LEVEL / COMPRESS_BROTLI_QUALITY trade CPU
+for size; the defaults sit well below the maximums, which cost several times
+the CPU for a few percent smaller JSON.
+"""
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from flask import request
+
+SKIP_MIMETYPE_PREFIXES = ('image/', 'video/', 'audio/', 'font/')
+SKIP_MIMETYPES = frozenset({
+    'application/zip', 'application/gzip', 'application/x-gzip', 'application/x-bzip2',
+    'application/x-7z-compressed', 'application/x-rar-compressed', 'application/pdf',
+    'application/octet-stream', 'application/wasm',
+})
+COMPRESSIBLE_IMAGES = frozenset({'image/svg+xml'})
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header with a non-zero q-value."""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def is_compressible(response):
+    mimetype = response.mimetype or ''
+    if mimetype in SKIP_MIMETYPES:
+        return False
+    if mimetype.startswith(SKIP_MIMETYPE_PREFIXES) and mimetype not in COMPRESSIBLE_IMAGES:
+        return False
+    return True
+
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_stream(chunks, encoding, level):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 -> gzip container
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compress(chunk) + flush()
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def init_compression(app):
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+    min_size = int(app.config.get('COMPRESS_MIN_SIZE', 1024))
+    levels = {
+        'gzip': int(app.config.get('COMPRESS_GZIP_LEVEL', 5)),
+        'br': int(app.config.get('COMPRESS_BROTLI_QUALITY', 4)),
+    }
+
+    @app.after_request
+    def _compress_response(response):
+        if (request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or 'Content-Encoding' in response.headers
+                or 'attachment' in response.headers.get('Content-Disposition', '')
+                or not is_compressible(response)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, encoding, levels[encoding])
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(_compress(data, encoding, levels[encoding]))
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -31,10 +31,102 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Moved to base Config
 
+    # Read replicas (comma-separated URLs), registered as replica_<n> binds; GET
+    # handlers read from them (see replicas.py). Users who just wrote are pinned
+    # to the primary for DB_PRIMARY_PIN_SECONDS.
+    SQLALCHEMY_BINDS = {
+        f'replica_{i}': normalize_db_url(url.strip())
+        for i, url in enumerate(os.getenv('DATABASE_REPLICA_URLS', '').split(',')) if url.strip()
+    }
+    DB_PRIMARY_PIN_SECONDS = float(os.getenv('DB_PRIMARY_PIN_SECONDS', 5))
+
     # JWT settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default-jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
 
+    # Number of trusted proxies in front of the app (Render adds one); used to
+    # recover the real client IP for rate limiting.
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+
+    # Rate limiting (Flask-Limiter). In-memory storage is per worker process.
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
+    RATELIMIT_HEADERS_ENABLED = True
+    AUTH_IP_RATE_LIMIT = os.getenv('AUTH_IP_RATE_LIMIT', '20 per minute;200 per hour')
+    AUTH_ACCOUNT_RATE_LIMIT = os.getenv('AUTH_ACCOUNT_RATE_LIMIT', '5 per minute;30 per hour')
+
+    # Per-request SQL instrumentation (see instrumentation.py)
+    SQL_SERVER_TIMING = os.getenv('SQL_SERVER_TIMING', 'true').lower() == 'true'
+    SQL_QUERY_BUDGET_STRICT = os.getenv('SQL_QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+
+    # Opt-in slow-query log with EXPLAIN capture (see slow_queries.py)
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'false').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 100))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+
+    # API response encoder: orjson (default when installed) or json (see representations.py)
+    API_JSON_ENCODER = os.getenv('API_JSON_ENCODER')
+
+    # Response compression (see compression.py); brotli is used when installed
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 5))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+
+    # POST /api/batch limits (see routes/batch.py)
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 10))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+
+    # Number of recent payments on GET /api/client/dashboard
+    DASHBOARD_RECENT_PAYMENTS = int(os.getenv('DASHBOARD_RECENT_PAYMENTS', 5))
+
+    # Idempotency-Key handling for POST requests (see idempotency.py)
+    IDEMPOTENCY_ENABLED = os.getenv('IDEMPOTENCY_ENABLED', 'true').lower() == 'true'
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 10))
+    IDEMPOTENCY_LEASE_SECONDS = float(os.getenv('IDEMPOTENCY_LEASE_SECONDS', 60))
+
+    # Time entries (see routes/time_logs.py): rows per POST /api/time-entries/bulk
+    # and the longest single entry accepted
+    TIME_LOG_BULK_MAX_ENTRIES = int(os.getenv('TIME_LOG_BULK_MAX_ENTRIES', 5000))
+    TIME_LOG_MAX_ENTRY_HOURS = float(os.getenv('TIME_LOG_MAX_ENTRY_HOURS', 24))
+    # Longest range GET /api/timesheets reports on
+    TIMESHEET_MAX_DAYS = int(os.getenv('TIMESHEET_MAX_DAYS', 366))
+
+    # Invoice document rendering pool (see invoice_documents.py); a download
+    # waits up to INVOICE_RENDER_WAIT_SECONDS before answering 202 and retrying
+    INVOICE_RENDER_WORKERS = int(os.getenv('INVOICE_RENDER_WORKERS', 2))
+    INVOICE_RENDER_QUEUE = int(os.getenv('INVOICE_RENDER_QUEUE', 8))
+    INVOICE_RENDER_WAIT_SECONDS = float(os.getenv('INVOICE_RENDER_WAIT_SECONDS', 5))
+    # Payment terms for invoices created by `flask invoices generate`
+    INVOICE_DUE_DAYS = int(os.getenv('INVOICE_DUE_DAYS', 14))
+    # Overdue reminder digests mailed per batch by `flask invoices sweep-overdue`
+    INVOICE_REMINDER_BATCH = int(os.getenv('INVOICE_REMINDER_BATCH', 100))
+    # Seconds a claimed digest is left to its sender before another run may retry it
+    INVOICE_REMINDER_LEASE_SECONDS = int(os.getenv('INVOICE_REMINDER_LEASE_SECONDS', 600))
+
+    # Background jobs (see jobs.py): `flask jobs work` threads, jobs claimed
+    # per statement, seconds a claimed job stays hidden from other workers,
+    # and retries with exponential backoff between JOB_BACKOFF_SECONDS and
+    # JOB_BACKOFF_MAX_SECONDS
+    JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+    JOB_CLAIM_BATCH = int(os.getenv('JOB_CLAIM_BATCH', 10))
+    JOB_VISIBILITY_TIMEOUT = float(os.getenv('JOB_VISIBILITY_TIMEOUT', 300))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    JOB_BACKOFF_SECONDS = float(os.getenv('JOB_BACKOFF_SECONDS', 10))
+    JOB_BACKOFF_MAX_SECONDS = float(os.getenv('JOB_BACKOFF_MAX_SECONDS', 3600))
+
+    # Optional bearer token required to scrape /metrics
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Password hashing pool (see passwords.py)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
 class DevConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = True
     DEBUG = True
@@ -0,0 +1,401 @@
+"""High-volume synthetic data generator for benchmarking.
+
+Unlike seed.py, which builds a small demo dataset through the ORM, this writes
+millions of rows with PostgreSQL COPY (or executemany on other databases).
+Primary keys are assigned here, after the current max(id) of each table, so
+foreign keys can be computed without reading anything back; sequences are
+bumped at the end. One password hash is computed up front by the app's
+hasher (PASSWORD_HASH_METHOD, as at signup) and shared by every generated
+user, so benchmark logins never trigger a rehash. Derived data the
+application keeps up to date on writes (projects.applications_count, the
+milestone progress rollups) is computed while generating and written with
+the rest. Output is deterministic for a given --seed and starting state.
+
+Usage:
+    python -m src.datagen --users 1000000 --projects 500000 --seed 42
+    python -m src.datagen --users 2000 --projects 1000 --truncate
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from faker import Faker
+from sqlalchemy import text
+
+from src.app import create_app
+from src.extensions import db, hasher
+
+EPOCH = datetime(2024, 1, 1)
+PROJECT_STATUSES = ['draft', 'posted', 'active', 'completed']
+PROJECT_STATUS_WEIGHTS = [5, 35, 35, 25]
+MILESTONE_STATUSES = ['pending', 'submitted', 'approved', 'rejected']
+MILESTONE_STATUS_WEIGHTS = [35, 20, 40, 5]
+INDUSTRIES = ['Tech', 'Finance', 'Healthcare', 'Retail', 'Education', 'Media', 'Logistics', 'Energy']
+
+# Tables in dependency order with the columns the generator writes. Tables keyed
+# by something other than ``id`` (rollups) get no offset or sequence.
+TABLES = {
+    'users': ('id', 'email', 'password_hash', 'role', 'is_verified', 'created_at', 'last_login'),
+    'client_profiles': ('id', 'user_id', 'company_name', 'industry', 'bio', 'website', 'created_at', 'updated_at'),
+    'freelancer_profiles': ('id', 'user_id', 'hourly_rate', 'bio', 'experience', 'created_at', 'updated_at'),
+    'projects': ('id', 'title', 'description', 'budget', 'status', 'client_id', 'freelancer_id', 'created_at', 'completed_at',
+                 'applications_count'),
+    'milestones': ('id', 'project_id', 'title', 'description', 'due_date', 'amount', 'status'),
+    'project_milestone_progress': ('project_id', 'total', 'approved', 'pending', 'amount_approved',
+                                   'amount_remaining', 'updated_at'),
+    'project_applications': ('id', 'project_id', 'freelancer_id', 'proposal', 'bid_amount', 'status', 'applied_at'),
+    'messages': ('id', 'project_id', 'sender_id', 'receiver_id', 'content', 'timestamp', 'is_approved'),
+    'time_logs': ('id', 'project_id', 'freelancer_id', 'start_time', 'end_time'),
+    'invoices': ('id', 'milestone_id', 'amount', 'generated_at', 'due_date', 'status'),
+    'payments': ('id', 'invoice_id', 'client_id', 'freelancer_id', 'transaction_id', 'amount', 'paid_at',
+                 'created_at', 'status', 'payment_date', 'payment_method'),
+}
+
+
+class CopyWriter:
+    """Streams rows into PostgreSQL with COPY ... FROM STDIN in fixed-size chunks."""
+
+    def __init__(self, connection, batch_size):
+        self.raw = connection.connection.dbapi_connection
+        self.batch_size = batch_size
+
+    def write(self, table, columns, rows):
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        total = 0
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        pending = 0
+        with self.raw.cursor() as cur:
+            for row in rows:
+                writer.writerow(['\\N' if v is None else v for v in row])
+                pending += 1
+                if pending >= self.batch_size:
+                    buf.seek(0)
+                    cur.copy_expert(sql, buf)
+                    total += pending
+                    buf.seek(0)
+                    buf.truncate()
+                    pending = 0
+            if pending:
+                buf.seek(0)
+                cur.copy_expert(sql, buf)
+                total += pending
+        return total
+
+
+class ExecutemanyWriter:
+    """Fallback for non-PostgreSQL databases: batched executemany INSERTs."""
+
+    def __init__(self, connection, batch_size):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def write(self, table, columns, rows):
+        stmt = text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})")
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(dict(zip(columns, row)))
+            if len(batch) >= self.batch_size:
+                self.connection.execute(stmt, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self.connection.execute(stmt, batch)
+            total += len(batch)
+        return total
+
+
+class DataGenerator:
+    def __init__(self, seed, users, client_ratio, projects, milestones_per_project, applications_per_project,
+                 messages_per_project, time_logs_per_project, payment_ratio, password_hash, invoice_due_days=14):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.n_clients = max(1, int(users * client_ratio))
+        self.n_freelancers = max(1, users - self.n_clients)
+        self.n_projects = projects
+        self.milestones_per_project = milestones_per_project
+        self.applications_per_project = applications_per_project
+        self.messages_per_project = messages_per_project
+        self.time_logs_per_project = time_logs_per_project
+        self.payment_ratio = payment_ratio
+        self.invoice_due_days = invoice_due_days
+        self.password_hash = password_hash
+
+        # Faker is far too slow to call per row at this scale; sample from pools instead.
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.companies = [fake.company() for _ in range(2000)]
+        self.titles = [fake.catch_phrase() for _ in range(5000)]
+        self.sentences = [fake.sentence(nb_words=12) for _ in range(5000)]
+        self.paragraphs = [fake.paragraph(nb_sentences=5) for _ in range(2000)]
+        self.domains = [fake.domain_name() for _ in range(1000)]
+
+        # Filled while generating projects/milestones; consumed by dependent tables.
+        self.project_client = array('l')
+        self.project_freelancer = array('l')
+        self.project_created = array('l')
+        self.project_applicants = array('l')
+        self.approved_milestones = array('l')
+        self.approved_amounts = array('d')
+        self.approved_projects = array('l')
+        self.progress_projects = array('l')
+        self.progress_totals = array('l')
+        self.progress_approved = array('l')
+        self.progress_amounts = array('d')
+        self.progress_amounts_approved = array('d')
+
+    # -- helpers -----------------------------------------------------------------
+
+    def ts(self, max_days=700):
+        return EPOCH + timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def created(self, p):
+        return EPOCH + timedelta(seconds=self.project_created[p])
+
+    def load_offsets(self, connection):
+        self.offset = {
+            table: connection.execute(text(f'SELECT COALESCE(MAX(id), 0) FROM {table}')).scalar()
+            for table in id_tables()
+        }
+
+    def client_user_id(self, k):
+        return self.offset['users'] + k
+
+    def freelancer_user_id(self, k):
+        return self.offset['users'] + self.n_clients + k
+
+    # -- row streams -------------------------------------------------------------
+
+    def users(self):
+        base = self.offset['users']
+        for k in range(1, self.n_clients + self.n_freelancers + 1):
+            uid = base + k
+            role = 'client' if k <= self.n_clients else 'freelancer'
+            created = self.ts()
+            yield (uid, f'user{uid}.s{self.seed}@bench.example.com', self.password_hash, role,
+                   self.rng.random() < 0.9, created, created + timedelta(days=self.rng.randrange(30)))
+
+    def client_profiles(self):
+        base = self.offset['client_profiles']
+        for k in range(1, self.n_clients + 1):
+            created = self.ts()
+            yield (base + k, self.client_user_id(k), self.rng.choice(self.companies), self.rng.choice(INDUSTRIES),
+                   self.rng.choice(self.sentences), f'https://{self.rng.choice(self.domains)}', created, created)
+
+    def freelancer_profiles(self):
+        base = self.offset['freelancer_profiles']
+        for k in range(1, self.n_freelancers + 1):
+            created = self.ts()
+            yield (base + k, self.freelancer_user_id(k), self.rng.randint(15, 150), self.rng.choice(self.sentences),
+                   self.rng.choice(self.paragraphs), created, created)
+
+    def projects(self):
+        base = self.offset['projects']
+        cp_base, fp_base = self.offset['client_profiles'], self.offset['freelancer_profiles']
+        for k in range(1, self.n_projects + 1):
+            client = self.rng.randint(1, self.n_clients)
+            status = self.rng.choices(PROJECT_STATUSES, PROJECT_STATUS_WEIGHTS)[0]
+            freelancer = self.rng.randint(1, self.n_freelancers) if status in ('active', 'completed') else 0
+            created = self.ts()
+            self.project_client.append(client)
+            self.project_freelancer.append(freelancer)
+            self.project_created.append(int((created - EPOCH).total_seconds()))
+            completed = created + timedelta(days=self.rng.randint(7, 120)) if status == 'completed' else None
+            # Drawn here so applications_count matches the applications written later.
+            applicants = min(self._per_project(self.applications_per_project), self.n_freelancers)
+            self.project_applicants.append(applicants)
+            yield (base + k, self.rng.choice(self.titles), self.rng.choice(self.paragraphs),
+                   round(self.rng.uniform(100, 20000), 2), status, cp_base + client,
+                   fp_base + freelancer if freelancer else None, created, completed, applicants)
+
+    def _per_project(self, average):
+        return self.rng.randint(0, 2 * average) if average else 0
+
+    def milestones(self):
+        mid = self.offset['milestones']
+        p_base = self.offset['projects']
+        for p in range(self.n_projects):
+            if not self.project_freelancer[p]:
+                continue
+            created = self.created(p)
+            count = self._per_project(self.milestones_per_project)
+            approved, amount_total, amount_approved = 0, 0.0, 0.0
+            for n in range(count):
+                mid += 1
+                status = self.rng.choices(MILESTONE_STATUSES, MILESTONE_STATUS_WEIGHTS)[0]
+                amount = round(self.rng.uniform(50, 5000), 2)
+                amount_total += amount
+                if status == 'approved':
+                    approved += 1
+                    amount_approved += amount
+                    self.approved_milestones.append(mid)
+                    self.approved_amounts.append(amount)
+                    self.approved_projects.append(p)
+                yield (mid, p_base + p + 1, f'Milestone {n + 1}', self.rng.choice(self.sentences),
+                       (created + timedelta(days=14 * (n + 1))).date(), amount, status)
+            if count:
+                self.progress_projects.append(p)
+                self.progress_totals.append(count)
+                self.progress_approved.append(approved)
+                self.progress_amounts.append(amount_total)
+                self.progress_amounts_approved.append(amount_approved)
+
+    def project_milestone_progress(self):
+        # The rollup refresh_milestone_progress would compute, from the milestones just written.
+        p_base = self.offset['projects']
+        for n, p in enumerate(self.progress_projects):
+            total, approved = self.progress_totals[n], self.progress_approved[n]
+            amount_approved = round(self.progress_amounts_approved[n], 2)
+            yield (p_base + p + 1, total, approved, total - approved, amount_approved,
+                   round(self.progress_amounts[n] - amount_approved, 2), self.created(p))
+
+    def project_applications(self):
+        aid = self.offset['project_applications']
+        p_base, fp_base = self.offset['projects'], self.offset['freelancer_profiles']
+        for p in range(self.n_projects):
+            count = self.project_applicants[p]
+            if not count:
+                continue
+            hired = self.project_freelancer[p]
+            created = self.created(p)
+            for freelancer in self.rng.sample(range(1, self.n_freelancers + 1), count):
+                aid += 1
+                status = 'hired' if freelancer == hired else ('rejected' if hired else 'pending')
+                yield (aid, p_base + p + 1, fp_base + freelancer, self.rng.choice(self.paragraphs),
+                       round(self.rng.uniform(100, 20000), 2), status,
+                       created + timedelta(hours=self.rng.randint(1, 24 * 14)))
+
+    def messages(self):
+        mid = self.offset['messages']
+        p_base = self.offset['projects']
+        for p in range(self.n_projects):
+            if not self.project_freelancer[p]:
+                continue
+            client_uid = self.client_user_id(self.project_client[p])
+            freelancer_uid = self.freelancer_user_id(self.project_freelancer[p])
+            sent = self.created(p)
+            for _ in range(self._per_project(self.messages_per_project)):
+                mid += 1
+                sent += timedelta(minutes=self.rng.randint(1, 2880))
+                sender, receiver = (client_uid, freelancer_uid) if self.rng.random() < 0.5 else (freelancer_uid, client_uid)
+                yield (mid, p_base + p + 1, sender, receiver, self.rng.choice(self.sentences), sent, True)
+
+    def time_logs(self):
+        tid = self.offset['time_logs']
+        p_base, fp_base = self.offset['projects'], self.offset['freelancer_profiles']
+        for p in range(self.n_projects):
+            freelancer = self.project_freelancer[p]
+            if not freelancer:
+                continue
+            start = self.created(p)
+            for _ in range(self._per_project(self.time_logs_per_project)):
+                tid += 1
+                start += timedelta(hours=self.rng.randint(4, 72))
+                yield (tid, p_base + p + 1, fp_base + freelancer, start,
+                       start + timedelta(minutes=self.rng.randint(15, 600)))
+
+    def is_paid(self, n):
+        # Invoices and payments are written in separate passes; derive the paid flag
+        # from a per-invoice stream so both passes agree without storing it.
+        return random.Random(self.seed * 1000003 + n).random() < self.payment_ratio
+
+    def invoices(self):
+        base = self.offset['invoices']
+        for n in range(len(self.approved_milestones)):
+            generated = self.ts()
+            yield (base + n + 1, self.approved_milestones[n], self.approved_amounts[n], generated,
+                   (generated + timedelta(days=self.invoice_due_days)).date(),
+                   'paid' if self.is_paid(n) else 'pending')
+
+    def payments(self):
+        pid = self.offset['payments']
+        inv_base = self.offset['invoices']
+        cp_base, fp_base = self.offset['client_profiles'], self.offset['freelancer_profiles']
+        for n in range(len(self.approved_milestones)):
+            if not self.is_paid(n):
+                continue
+            pid += 1
+            p = self.approved_projects[n]
+            paid = self.ts()
+            yield (pid, inv_base + n + 1, cp_base + self.project_client[p], fp_base + self.project_freelancer[p],
+                   f'BENCH-{self.seed}-{pid}', self.approved_amounts[n], paid, paid, 'completed', paid.date(),
+                   self.rng.choice(['card', 'bank_transfer', 'mobile_money']))
+
+    def run(self, writer):
+        streams = {
+            'users': self.users, 'client_profiles': self.client_profiles,
+            'freelancer_profiles': self.freelancer_profiles, 'projects': self.projects,
+            'milestones': self.milestones, 'project_milestone_progress': self.project_milestone_progress,
+            'project_applications': self.project_applications,
+            'messages': self.messages, 'time_logs': self.time_logs,
+            'invoices': self.invoices, 'payments': self.payments,
+        }
+        for table, columns in TABLES.items():
+            started = time.perf_counter()
+            count = writer.write(table, columns, streams[table]())
+            elapsed = time.perf_counter() - started
+            print(f"{table:<22} {count:>10} rows  {elapsed:7.1f}s  ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+def id_tables():
+    return [table for table, columns in TABLES.items() if columns[0] == 'id']
+
+
+def reset_sequences(connection):
+    for table in id_tables():
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a large synthetic dataset for benchmarking.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--client-ratio', type=float, default=0.3)
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--milestones-per-project', type=int, default=4, help='Average per hired project')
+    parser.add_argument('--applications-per-project', type=int, default=8)
+    parser.add_argument('--messages-per-project', type=int, default=20, help='Average per hired project')
+    parser.add_argument('--time-logs-per-project', type=int, default=30, help='Average per hired project')
+    parser.add_argument('--payment-ratio', type=float, default=0.6, help='Share of invoices that are paid')
+    parser.add_argument('--password', default='benchpass123', help='Password shared by all generated users')
+    parser.add_argument('--batch-size', type=int, default=50000)
+    parser.add_argument('--truncate', action='store_true', help='Empty the generated tables first')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            postgres = connection.dialect.name == 'postgresql'
+            if args.truncate:
+                if postgres:
+                    connection.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+                else:
+                    for table in reversed(list(TABLES)):
+                        connection.execute(text(f'DELETE FROM {table}'))
+
+            generator = DataGenerator(
+                seed=args.seed, users=args.users, client_ratio=args.client_ratio, projects=args.projects,
+                milestones_per_project=args.milestones_per_project,
+                applications_per_project=args.applications_per_project,
+                messages_per_project=args.messages_per_project,
+                time_logs_per_project=args.time_logs_per_project,
+                payment_ratio=args.payment_ratio, password_hash=hasher.hash(args.password),
+                invoice_due_days=app.config.get('INVOICE_DUE_DAYS', 14),
+            )
+            generator.load_offsets(connection)
+            writer = CopyWriter(connection, args.batch_size) if postgres else ExecutemanyWriter(connection, args.batch_size)
+            generator.run(writer)
+            if postgres:
+                reset_sequences(connection)
+    print(f"Done. All generated users share the password '{args.password}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,20 @@ from flask_jwt_extended import JWTManager
 from flask_restx import Api
 from flask_marshmallow import Marshmallow
 from flask_mail import Mail
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from .passwords import PasswordHasher
+from .invoice_documents import InvoiceRenderer
+from .replicas import RoutingSession
+from .representations import output_json
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 ma = Marshmallow()
 mail = Mail()
-api = Api(title='FreelanceFlow API', version='1.0', description='API for freelance management', doc='/api/docs')
\ No newline at end of file
+limiter = Limiter(key_func=get_remote_address)
+hasher = PasswordHasher()
+renderer = InvoiceRenderer()
+api = Api(title='FreelanceFlow API', version='1.0', description='API for freelance management', doc='/api/docs')
+api.representation('application/json')(output_json)
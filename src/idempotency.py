@@ -0,0 +1,202 @@
+"""``Idempotency-Key`` support for POST requests.
+
+A POST carrying the header is run at most once per (caller, key) within
+IDEMPOTENCY_TTL_SECONDS:
+
+* the first request claims the key by inserting a row (``ON CONFLICT DO
+  NOTHING``) on its own connection, runs normally, and stores its status
+  and body on the row. The claim is a lease of IDEMPOTENCY_LEASE_SECONDS:
+  if the worker dies mid-request a later duplicate takes the key over
+  instead of getting 409 until the TTL runs out, and the original can no
+  longer store over the new claim;
+* a replay finds the stored response with one primary-key read and gets it
+  back, with the STORED_HEADERS it had (Location, ETag, ...) and
+  ``Idempotent-Replayed: true``, without running the handler;
+* a duplicate arriving while the first is still running polls that row (up
+  to IDEMPOTENCY_WAIT_SECONDS) and returns the first request's response
+  instead of redoing the work, or 409 if it is still running by then;
+* reusing a key for a different request (method, path or body) is a 422.
+
+5xx responses, unhandled errors and any response produced after a failed
+SQL statement (handlers that turn database errors into a 4xx) release the key
+so the client can retry; only 2xx and deliberate 4xx responses are stored.
+The caller is the JWT identity, or the client address for anonymous
+requests. Expired rows are ignored and overwritten on reuse; ``flask
+idempotency purge`` deletes them in bulk. The key's own statements are not
+counted in the request's SQL stats or query budget.
+"""
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import g, has_request_context, make_response, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from .extensions import db
+from .instrumentation import sql_stats_paused
+from .models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+# Response headers kept with a stored response and sent again on replay; the
+# rest (Content-Length, Set-Cookie, Server-Timing, ...) belong to the request
+# that ran. Compression runs after this, so Content-Encoding is never stored.
+STORED_HEADERS = ('Content-Type', 'Location', 'ETag', 'Last-Modified', 'Cache-Control', 'Content-Language',
+                  'Link', 'Vary')
+
+table = IdempotencyKey.__table__
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _caller():
+    """JWT identity or client address; None when the token is invalid (the handler will 401)."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return None
+    return f'user:{identity}' if identity is not None else f'ip:{request.remote_addr}'
+
+
+def request_fingerprint():
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.full_path.encode(), request.get_data(cache=True)):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _insert_if_absent(conn, values):
+    insert_ = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[conn.dialect.name]
+    stmt = insert_(table).values(values).on_conflict_do_nothing(index_elements=['key_hash'])
+    return conn.execute(stmt).rowcount == 1
+
+
+def claim(key_hash, fingerprint, lease, wait):
+    """Claims ``key_hash`` for ``lease`` seconds. Returns ``(claimed_at, None)``
+    if this request should run, otherwise ``(None, response)`` with the
+    response to send (a replay, 409 or 422)."""
+    deadline = time.monotonic() + wait
+    delay = 0.05
+    while True:
+        # Autocommitted on its own connection so concurrent duplicates see the claim immediately
+        with db.engine.begin() as conn:
+            row = conn.execute(select(table).where(table.c.key_hash == key_hash)).first()
+            now = _now()
+            if row is None or row.expires_at <= now:
+                if row is not None:
+                    conn.execute(delete(table).where(table.c.key_hash == key_hash, table.c.expires_at <= now))
+                if _insert_if_absent(conn, {'key_hash': key_hash, 'fingerprint': fingerprint,
+                                            'created_at': now, 'expires_at': now + timedelta(seconds=lease)}):
+                    return now, None
+                continue  # lost the race for the claim; read the winner's row
+        if row.fingerprint != fingerprint:
+            return None, ({'success': False,
+                           'message': f'{HEADER} was already used for a different request'}, 422)
+        if row.response_status is not None:
+            response = make_response(row.response_body, row.response_status)
+            for name, values in (row.response_headers or {}).items():
+                response.headers.setlist(name, values)
+            response.headers[REPLAYED_HEADER] = 'true'
+            return None, response
+        if time.monotonic() >= deadline:
+            return None, ({'success': False,
+                           'message': f'A request with this {HEADER} is still being processed'}, 409)
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def _own_claim(key_hash, claimed_at):
+    # A claim taken over after its lease ran out belongs to the new request
+    return (table.c.key_hash == key_hash, table.c.created_at == claimed_at, table.c.response_status.is_(None))
+
+
+def release(key_hash, claimed_at):
+    with db.engine.begin() as conn:
+        conn.execute(delete(table).where(*_own_claim(key_hash, claimed_at)))
+
+
+def store(key_hash, claimed_at, response, ttl):
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(*_own_claim(key_hash, claimed_at)).values(
+            response_status=response.status_code,
+            response_body=response.get_data(),
+            response_headers={name: response.headers.getlist(name) for name in STORED_HEADERS
+                              if name in response.headers},
+            expires_at=_now() + timedelta(seconds=ttl)
+        ))
+
+
+def _note_failed_statement(exception_context):
+    # A 4xx built from a database error isn't a deliberate answer; don't replay it
+    if has_request_context() and '_idempotency_key' in g:
+        g._idempotency_sql_failed = True
+
+
+def purge_expired():
+    with db.engine.begin() as conn:
+        return conn.execute(delete(table).where(table.c.expires_at <= _now())).rowcount
+
+
+def init_idempotency(app):
+    if not app.config.get('IDEMPOTENCY_ENABLED', True):
+        return
+    ttl = int(app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400))
+    wait = float(app.config.get('IDEMPOTENCY_WAIT_SECONDS', 10))
+    lease = float(app.config.get('IDEMPOTENCY_LEASE_SECONDS', 60))
+
+    if not event.contains(Engine, 'handle_error', _note_failed_statement):
+        event.listen(Engine, 'handle_error', _note_failed_statement)
+
+    @app.before_request
+    def _claim_idempotency_key():
+        g.pop('_idempotency_key', None)  # g can outlive a request (batched sub-requests)
+        g.pop('_idempotency_sql_failed', None)
+        key = request.headers.get(HEADER)
+        if request.method != 'POST' or not key:
+            return None
+        if len(key) > MAX_KEY_LENGTH:
+            return {'success': False, 'message': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}, 400
+        caller = _caller()
+        if caller is None:
+            return None
+        key_hash = hashlib.sha256(f'{caller}\0{key}'.encode()).hexdigest()
+        with sql_stats_paused():
+            claimed_at, response = claim(key_hash, request_fingerprint(), lease, wait)
+        if claimed_at is not None:
+            g._idempotency_key = (key_hash, claimed_at)
+        return response
+
+    @app.after_request
+    def _store_idempotent_response(response):
+        claimed = g.pop('_idempotency_key', None)
+        if claimed is None:
+            return response
+        try:
+            with sql_stats_paused():
+                if (response.status_code >= 500 or g.get('_idempotency_sql_failed')
+                        or response.is_streamed or response.direct_passthrough):
+                    release(*claimed)
+                else:
+                    store(*claimed, response, ttl)
+        except Exception:
+            logger.exception('Could not record idempotent response')
+        return response
+
+    @app.teardown_request
+    def _release_idempotency_key(exc):
+        # Only still set when after_request didn't run (unhandled error)
+        claimed = g.pop('_idempotency_key', None)
+        if claimed is not None:
+            with sql_stats_paused():
+                release(*claimed)
@@ -0,0 +1,171 @@
+"""Per-request SQL instrumentation.
+
+Cursor-level SQLAlchemy hooks count the statements each request runs, the
+total time spent in the database and the slowest statement. The numbers are
+returned in a ``Server-Timing`` header and written as one structured (JSON)
+log line per request.
+
+Handlers can declare how many statements they are expected to need with
+``@query_budget(n)``. Only statements run from the point the decorated
+handler is entered count, so lookups made by decorators applied outside it
+(``admin_required``, ``jwt_required``) are not charged to the budget. Going
+over budget logs a warning; with
+``SQL_QUERY_BUDGET_STRICT`` enabled (meant for tests) it raises
+``QueryBudgetExceeded`` instead.
+
+Middleware bookkeeping (idempotency keys) runs inside ``sql_stats_paused``
+and is left out of the counts.
+
+The same cursor hook feeds the opt-in slow-query log (slow_queries.py) via
+``set_slow_query_hook``.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# (threshold_seconds, callback) or None; set by slow_queries.init_slow_query_log.
+_slow_query_hook = None
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A handler ran more SQL statements than its declared budget."""
+
+
+class SqlStats:
+    __slots__ = ('count', 'total', 'slowest', 'slowest_statement')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+
+def current_sql_stats():
+    """Stats for the active request/app context, or None outside one."""
+    if not has_app_context():
+        return None
+    return g.get('_sql_stats')
+
+
+@contextmanager
+def sql_stats_paused():
+    """Leave statements run inside the block out of the request's stats,
+    e.g. middleware bookkeeping on its own connection."""
+    stats = g.pop('_sql_stats', None) if has_app_context() else None
+    try:
+        yield
+    finally:
+        if stats is not None:
+            g._sql_stats = stats
+
+
+def query_budget(limit):
+    """Declare the maximum number of SQL statements a handler should need."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = current_sql_stats()
+            g._sql_query_budget = limit
+            g._sql_budget_start = stats.count if stats is not None else 0
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_slow_query_hook(threshold, callback):
+    """Call ``callback(conn, cursor, statement, parameters, executemany, elapsed)``
+    for statements taking at least ``threshold`` seconds; None disables it."""
+    global _slow_query_hook
+    _slow_query_hook = (threshold, callback) if callback is not None else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['_query_start'].pop()
+    stats = current_sql_stats()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    hook = _slow_query_hook
+    if hook is not None and elapsed >= hook[0]:
+        hook[1](conn, cursor, statement, parameters, executemany, elapsed)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for failed statements; drop their start time.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('_query_start'):
+        conn.info['_query_start'].pop()
+
+
+def init_sql_instrumentation(app):
+    # Listen on the Engine class so every engine (primary, binds) is covered.
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def _start_sql_stats():
+        g._sql_stats = SqlStats()
+        # g can outlive a request (batched sub-requests)
+        g.pop('_sql_query_budget', None)
+        g.pop('_sql_budget_start', None)
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def _report_sql_stats(response):
+        stats = g.get('_sql_stats')
+        if stats is None:
+            return response
+        app_ms = (time.perf_counter() - g._request_started) * 1000
+        db_ms = stats.total * 1000
+
+        if app.config.get('SQL_SERVER_TIMING', True):
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={db_ms:.2f};desc="{stats.count} queries", '
+                f'db-slowest;dur={stats.slowest * 1000:.2f}, app;dur={app_ms:.2f}'
+            )
+
+        budget = g.get('_sql_query_budget')
+        budgeted = stats.count - g.get('_sql_budget_start', 0)
+        logger.info(json.dumps({
+            'event': 'request_sql',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(db_ms, 2),
+            'app_ms': round(app_ms, 2),
+            'slowest_ms': round(stats.slowest * 1000, 2),
+            'slowest_sql': (stats.slowest_statement or '')[:300] or None,
+            'budget': budget,
+            'budgeted_queries': budgeted if budget is not None else None,
+        }))
+
+        if budget is not None and budgeted > budget:
+            message = f'{request.method} {request.path} ran {budgeted} SQL statements (budget {budget})'
+            if app.config.get('SQL_QUERY_BUDGET_STRICT'):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,178 @@
+"""Invoice documents (HTML, or PDF when WeasyPrint is installed) rendered off
+the request threads.
+
+Rendering is CPU-bound, so it runs on a small process pool with a hard cap
+on queued work; when the pool is saturated callers get a 503 straight away.
+Each document is identified by ``document_hash``, a SHA-256 of everything it
+shows (invoice, milestone, project and party details), the format and
+TEMPLATE_VERSION. Rendered documents are stored under that hash (see
+models/invoice_document.py), so repeat downloads are a single lookup and a
+document is only rendered again once its inputs change. Renders of the same
+hash already in flight are shared rather than started twice, until the result
+has been stored; storing runs on a separate thread, not the pool's result
+thread, so a slow database write doesn't hold up other renders' results.
+
+This module only imports the standard library and Jinja2, so the worker
+processes start without loading the app.
+"""
+import hashlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from jinja2 import Environment
+from werkzeug.exceptions import ServiceUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever TEMPLATE changes so every cached document is re-rendered
+TEMPLATE_VERSION = 1
+
+CONTENT_TYPES = {'html': 'text/html; charset=utf-8', 'pdf': 'application/pdf'}
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Invoice #{{ invoice.id }}</title>
+<style>
+  body { font-family: Helvetica, Arial, sans-serif; color: #222; margin: 40px; }
+  h1 { font-size: 24px; margin-bottom: 4px; }
+  .meta, .parties { width: 100%; margin-bottom: 24px; }
+  .parties td { vertical-align: top; width: 50%; }
+  table.lines { width: 100%; border-collapse: collapse; }
+  table.lines th, table.lines td { border-bottom: 1px solid #ddd; padding: 8px; text-align: left; }
+  .amount { text-align: right; }
+  .total td { font-weight: bold; border-bottom: none; }
+</style>
+</head>
+<body>
+<h1>Invoice #{{ invoice.id }}</h1>
+<table class="meta">
+  <tr><td>Status: {{ invoice.status or 'pending' }}</td>
+      <td>Issued: {{ invoice.generated_at or '' }}</td></tr>
+</table>
+<table class="parties">
+  <tr>
+    <td><strong>From</strong><br>{{ freelancer.email or '' }}</td>
+    <td><strong>Bill to</strong><br>{{ client.company_name or '' }}<br>{{ client.email or '' }}</td>
+  </tr>
+</table>
+<p><strong>Project:</strong> {{ project.title or '' }}</p>
+<table class="lines">
+  <tr><th>Milestone</th><th>Due</th><th class="amount">Amount</th></tr>
+  <tr>
+    <td>{{ milestone.title or '' }}{% if milestone.description %}<br><small>{{ milestone.description }}</small>{% endif %}</td>
+    <td>{{ milestone.due_date or '' }}</td>
+    <td class="amount">{{ milestone.amount or '0.00' }}</td>
+  </tr>
+  <tr class="total"><td colspan="2">Total due</td><td class="amount">{{ invoice.amount or '0.00' }}</td></tr>
+</table>
+</body>
+</html>
+"""
+
+_template = Environment(autoescape=True).from_string(TEMPLATE)
+
+
+class InvoiceRendererBusy(ServiceUnavailable):
+    """Raised when the render pool has no free slot; rendered as a 503."""
+    description = 'Invoice rendering is busy. Please retry shortly.'
+
+
+def pdf_available():
+    return importlib.util.find_spec('weasyprint') is not None
+
+
+def document_hash(inputs, fmt):
+    """SHA-256 of the document's inputs; ``inputs`` is a JSON-serialisable dict."""
+    payload = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f'{TEMPLATE_VERSION}\0{fmt}\0{payload}'.encode()).hexdigest()
+
+
+def render_invoice(inputs, fmt):
+    """Renders one document; runs in a worker process."""
+    html = _template.render(**inputs)
+    if fmt == 'pdf':
+        import weasyprint
+        return weasyprint.HTML(string=html).write_pdf()
+    return html.encode()
+
+
+class InvoiceRenderer:
+    """Flask extension running ``render_invoice`` on a bounded process pool.
+
+    Config:
+        INVOICE_RENDER_WORKERS  worker processes
+        INVOICE_RENDER_QUEUE    extra renders allowed to wait for a worker
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._callbacks = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        workers = int(app.config.get('INVOICE_RENDER_WORKERS', 2))
+        queue = int(app.config.get('INVOICE_RENDER_QUEUE', 8))
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._callbacks.shutdown(wait=False)
+        # spawn: never fork a process holding threads and DB connections
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix='invoice-store')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        app.extensions['invoice_renderer'] = self
+
+    def submit(self, key, inputs, fmt, on_done=None):
+        """Future rendering ``inputs``; shares a render of ``key`` already in flight.
+
+        ``on_done(body)`` is called once with the rendered bytes, on the
+        renderer's own thread, when a new render succeeds; the render stays
+        shared until it returns. Raises InvoiceRendererBusy when the pool and
+        its queue are full.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                raise RuntimeError('InvoiceRenderer.init_app() was not called')
+            if not self._slots.acquire(blocking=False):
+                raise InvoiceRendererBusy(retry_after=1)
+            try:
+                future = self._executor.submit(render_invoice, inputs, fmt)
+            except Exception:
+                self._slots.release()
+                raise
+            self._in_flight[key] = future
+
+        def finished(done):
+            self._slots.release()
+            if on_done is not None and not done.cancelled() and done.exception() is None:
+                self._callbacks.submit(self._complete, key, on_done, done.result())
+            else:
+                self._forget(key)
+
+        future.add_done_callback(finished)
+        return future
+
+    def _complete(self, key, on_done, body):
+        try:
+            on_done(body)
+        except Exception:
+            logger.exception('Storing a rendered invoice failed')
+        finally:
+            self._forget(key)
+
+    def _forget(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
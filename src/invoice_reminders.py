@@ -0,0 +1,117 @@
+"""Overdue invoices: a scheduled sweep plus one reminder digest per client.
+
+``sweep_overdue_invoices`` flips every pending invoice past its due date to
+``overdue`` with a single ``UPDATE ... RETURNING`` (served by the partial
+``ix_invoices_pending_due_date`` index), and in the same transaction queues
+one InvoiceReminder per client listing all of that client's newly overdue
+invoices. ``send_invoice_reminders`` mails queued digests. Both are run by
+``flask invoices sweep-overdue`` (see the cron job in render.yaml), so
+nothing about overdue status is computed on read.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import insert, or_, select, update
+
+from .extensions import db
+from .models import ClientProfile, Invoice, InvoiceReminder, Milestone, Project, User
+from .utils import send_overdue_invoices_email
+
+logger = logging.getLogger(__name__)
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def sweep_overdue_invoices(today=None):
+    """Marks pending invoices due before ``today`` overdue and queues digests.
+
+    Returns ``(invoices_marked, digests_queued)``. At most three statements
+    however many invoices are due; runs in the caller's transaction.
+    """
+    today = today or _now().date()
+    invoices = Invoice.__table__
+    overdue = db.session.execute(
+        update(invoices)
+        .where(invoices.c.status == 'pending', invoices.c.due_date < today)
+        .values(status='overdue')
+        .returning(invoices.c.id, invoices.c.amount, invoices.c.due_date, invoices.c.milestone_id)
+    ).all()
+    if not overdue:
+        return 0, 0
+
+    projects = {row.id: row for row in db.session.execute(
+        select(Milestone.id, Project.client_id, Project.title)
+        .join(Project, Project.id == Milestone.project_id)
+        .where(Milestone.id.in_({row.milestone_id for row in overdue}))
+    )}
+    by_client = defaultdict(list)
+    for row in overdue:
+        project = projects.get(row.milestone_id)
+        if project is not None and project.client_id is not None:
+            by_client[project.client_id].append((row, project.title))
+    if by_client:
+        now = _now()
+        db.session.execute(insert(InvoiceReminder), [{
+            'client_id': client_id,
+            'invoices': [{'id': r.id, 'project': title, 'amount': str(r.amount or 0),
+                          'due_date': r.due_date.isoformat()} for r, title in sorted(rows, key=lambda p: p[0].id)],
+            'total': sum((r.amount or Decimal(0) for r, _ in rows), Decimal(0)),
+            'created_at': now,
+            'attempts': 0,
+        } for client_id, rows in by_client.items()])
+    return len(overdue), len(by_client)
+
+
+def send_invoice_reminders(limit=100, max_attempts=5, after_id=0, lease=600):
+    """Mails up to ``limit`` queued digests with ids above ``after_id``.
+
+    Returns ``(sent, failed, last_id)``; pass ``last_id`` back as
+    ``after_id`` to continue without retrying this batch's failures.
+    The batch is claimed first: rows are locked ``FOR UPDATE SKIP LOCKED``,
+    ``attempts`` and ``claimed_at`` are bumped and the claim is committed,
+    so no lock is held while talking to SMTP and overlapping runs skip
+    digests claimed less than ``lease`` seconds ago. Each digest is then
+    mailed outside any transaction and its outcome committed on its own: a
+    crash mid-batch leaves the digests already mailed marked sent, and the
+    rest are retried once their claim has lapsed. Failed digests are
+    released for later runs until ``max_attempts``.
+    """
+    now = _now()
+    rows = db.session.execute(
+        select(InvoiceReminder.id, InvoiceReminder.invoices, InvoiceReminder.total, User.email)
+        .join(ClientProfile, ClientProfile.id == InvoiceReminder.client_id)
+        .join(User, User.id == ClientProfile.user_id)
+        .where(InvoiceReminder.sent_at.is_(None), InvoiceReminder.attempts < max_attempts,
+               InvoiceReminder.id > after_id,
+               or_(InvoiceReminder.claimed_at.is_(None),
+                   InvoiceReminder.claimed_at <= now - timedelta(seconds=lease)))
+        .order_by(InvoiceReminder.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=InvoiceReminder)
+    ).all()
+    if not rows:
+        db.session.commit()
+        return 0, 0, after_id
+    db.session.execute(
+        update(InvoiceReminder)
+        .where(InvoiceReminder.id.in_([row.id for row in rows]))
+        .values(attempts=InvoiceReminder.attempts + 1, claimed_at=now)
+    )
+    db.session.commit()
+
+    sent = failed = 0
+    for row in rows:
+        mark = update(InvoiceReminder).where(InvoiceReminder.id == row.id)
+        if send_overdue_invoices_email(row.email, row.invoices, row.total):
+            db.session.execute(mark.values(sent_at=_now()))
+            sent += 1
+        else:
+            db.session.execute(mark.values(claimed_at=None))
+            failed += 1
+        db.session.commit()
+    logger.info(f"Sent {sent} overdue invoice reminders ({failed} failed)")
+    return sent, failed, rows[-1].id
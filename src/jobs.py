@@ -0,0 +1,264 @@
+"""Durable background jobs kept in the ``background_jobs`` table.
+
+A route calls ``enqueue`` inside its own transaction and returns: the job
+exists exactly when the request's writes commit, and the slow part runs on
+a worker instead of the request thread. Payment verification
+(``GET /api/client/payments/verify/<tx_ref>``) works this way, queueing the
+Flutterwave call as a ``verify_payment`` job. Workers are started with ``flask jobs work`` as a service of their
+own next to gunicorn (see render.yaml).
+
+* Claiming: ``claim_jobs`` takes a batch of ready jobs with
+  ``FOR UPDATE SKIP LOCKED``, so any number of workers poll the table
+  without waiting on or double-claiming each other's rows.
+* Visibility timeout: a claim pushes the job's ``run_at`` ahead by
+  ``JOB_VISIBILITY_TIMEOUT``, and so does starting each job of a claimed
+  batch, so the timeout bounds one job rather than the whole batch. If the
+  worker dies mid-job the job is simply claimable again once that passes;
+  nothing has to notice the crash.
+* Retries: a handler that raises is retried after an exponential backoff
+  with jitter until ``max_attempts``, then marked ``failed`` with its last
+  error.
+* Lanes: jobs are enqueued into the ``high``, ``default`` or ``low`` lane;
+  claims take the most urgent ready jobs first, and a worker can be limited
+  to some lanes so bulk work never delays e.g. payment verification.
+
+Delivery is at least once, so handlers must be idempotent. A handler's
+database writes commit together with its job being marked done.
+
+The other caller, the verification email sent on signup (routes/routes.py),
+belongs to a namespace create_app doesn't mount; the live signup in
+routes/auth.py sends no email at all.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .extensions import db
+from .models.background_job import CLAIMABLE, LANES, BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(**payload), filled by @job_handler
+HANDLERS = {}
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _config(name, default):
+    return current_app.config.get(name, default)
+
+
+def job_handler(kind):
+    """Registers the decorated function as the handler for jobs of ``kind``.
+
+    The function is called with the job's payload as keyword arguments, in
+    an app context; raising schedules a retry.
+    """
+    def decorator(f):
+        HANDLERS[kind] = f
+        return f
+    return decorator
+
+
+def enqueue(kind, payload=None, lane='default', key=None, delay=0, max_attempts=None):
+    """Queues a job in the caller's transaction; returns its id.
+
+    With a ``key``, a job of the same kind and key that hasn't finished yet
+    wins and None is returned instead. ``delay`` is in seconds.
+    """
+    table = BackgroundJob.__table__
+    insert_ = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[db.engine.dialect.name]
+    now = _now()
+    stmt = insert_(table).values(
+        kind=kind, key=key, payload=payload or {}, priority=LANES[lane], status='queued',
+        run_at=now + timedelta(seconds=delay), attempts=0, created_at=now,
+        max_attempts=max_attempts or _config('JOB_MAX_ATTEMPTS', 5),
+    )
+    if key is not None:
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=['kind', 'key'],
+            index_where=table.c.status.in_(CLAIMABLE) & table.c.key.isnot(None),
+        )
+    return db.session.execute(stmt.returning(table.c.id)).scalar()
+
+
+def claim_statement(worker_id, limit, visibility_timeout, lanes, now):
+    """The ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)``
+    that claims jobs; ``claim_jobs`` runs it."""
+    ready = select(BackgroundJob.id).where(BackgroundJob.status.in_(CLAIMABLE), BackgroundJob.run_at <= now)
+    if lanes:
+        ready = ready.where(BackgroundJob.priority.in_([LANES[lane] for lane in lanes]))
+    ready = ready.order_by(
+        BackgroundJob.priority, BackgroundJob.run_at, BackgroundJob.id
+    ).limit(limit).with_for_update(skip_locked=True)
+    table = BackgroundJob.__table__
+    return (
+        update(table)
+        .where(table.c.id.in_(ready))
+        .values(status='running', attempts=table.c.attempts + 1, locked_by=worker_id,
+                run_at=now + timedelta(seconds=visibility_timeout))
+        .returning(table.c.id, table.c.kind, table.c.payload, table.c.priority,
+                   table.c.attempts, table.c.max_attempts)
+    )
+
+
+def claim_jobs(worker_id, limit=10, visibility_timeout=300, lanes=None, now=None):
+    """Claims up to ``limit`` ready jobs for ``worker_id``, most urgent first.
+
+    Ready means queued and due, or claimed earlier by a worker whose
+    visibility timeout has passed. Each claim counts as an attempt. One
+    statement; commit before running the jobs so the claim is visible.
+    """
+    rows = db.session.execute(
+        claim_statement(worker_id, limit, visibility_timeout, lanes, now or _now())
+    ).all()
+    return sorted(rows, key=lambda row: (row.priority, row.id))
+
+
+def renew_claim(job, worker_id, visibility_timeout, now=None):
+    """Pushes a claimed job's ``run_at`` ahead by ``visibility_timeout`` as it starts.
+
+    False if ``worker_id`` no longer holds the job: earlier jobs of its
+    batch outlasted the timeout and another worker has claimed it since.
+    """
+    table = BackgroundJob.__table__
+    return db.session.execute(
+        update(table)
+        .where(table.c.id == job.id, table.c.locked_by == worker_id, table.c.status == 'running')
+        .values(run_at=(now or _now()) + timedelta(seconds=visibility_timeout))
+    ).rowcount == 1
+
+
+def backoff_seconds(attempts, base=None, cap=None):
+    """Delay before retrying a job that has failed ``attempts`` times."""
+    base = base if base is not None else _config('JOB_BACKOFF_SECONDS', 10)
+    cap = cap if cap is not None else _config('JOB_BACKOFF_MAX_SECONDS', 3600)
+    delay = min(cap, base * 2 ** (attempts - 1))
+    # Jitter keeps jobs that failed together (a gateway outage) from retrying together
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _settle(job, worker_id, **values):
+    # Only while this worker still holds the job: after its visibility
+    # timeout another worker may have claimed it.
+    table = BackgroundJob.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.id == job.id, table.c.locked_by == worker_id, table.c.status == 'running')
+        .values(locked_by=None, **values)
+    )
+
+
+def fail_job(job, worker_id, error, now=None):
+    """Schedules a retry of a failed attempt, or fails the job for good."""
+    now = now or _now()
+    if job.attempts >= job.max_attempts:
+        logger.error(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error}")
+        _settle(job, worker_id, status='failed', last_error=error, finished_at=now)
+    else:
+        _settle(job, worker_id, status='queued', last_error=error,
+                run_at=now + timedelta(seconds=backoff_seconds(job.attempts)))
+
+
+def run_job(job, worker_id):
+    """Runs one claimed job and records the outcome; commits. True on success."""
+    handler = HANDLERS.get(job.kind)
+    if job.attempts > job.max_attempts:
+        # Claimed again after a worker timed out on its last attempt
+        error = 'Visibility timeout expired on the last attempt'
+    elif handler is None:
+        error = f'No handler for job kind {job.kind!r}'
+    else:
+        try:
+            handler(**job.payload)
+            _settle(job, worker_id, status='done', last_error=None, finished_at=_now())
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {e}")
+            fail_job(job, worker_id, f'{type(e).__name__}: {e}')
+            db.session.commit()
+            return False
+    _settle(job, worker_id, status='failed', last_error=error, finished_at=_now())
+    db.session.commit()
+    logger.error(f"Job {job.id} ({job.kind}) failed: {error}")
+    return False
+
+
+def prune_jobs(older_than_days=7, now=None):
+    """Deletes jobs that finished (done or failed) before the cutoff; returns the count."""
+    cutoff = (now or _now()) - timedelta(days=older_than_days)
+    return db.session.execute(
+        delete(BackgroundJob).where(BackgroundJob.finished_at < cutoff)
+    ).rowcount
+
+
+class Worker:
+    """Claims and runs jobs in a loop; one per thread.
+
+    Each claim runs in a fresh app context, so every worker thread has its
+    own session and connection.
+
+    Config:
+        JOB_CLAIM_BATCH         jobs claimed per statement
+        JOB_VISIBILITY_TIMEOUT  seconds a job stays hidden from other workers once
+                                claimed, renewed as each job of the batch starts
+        JOB_POLL_INTERVAL       seconds to sleep when no job is ready
+    """
+
+    def __init__(self, app, lanes=None, name=None):
+        self.app = app
+        self.lanes = lanes
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.batch = int(app.config.get('JOB_CLAIM_BATCH', 10))
+        self.visibility_timeout = float(app.config.get('JOB_VISIBILITY_TIMEOUT', 300))
+        self.poll_interval = float(app.config.get('JOB_POLL_INTERVAL', 1))
+
+    def run_once(self):
+        """Claims one batch and runs it; returns how many jobs were claimed."""
+        with self.app.app_context():
+            jobs = claim_jobs(self.name, self.batch, self.visibility_timeout, self.lanes)
+            db.session.commit()
+            for job in jobs:
+                renewed = renew_claim(job, self.name, self.visibility_timeout)
+                db.session.commit()
+                if renewed:
+                    run_job(job, self.name)
+                else:
+                    logger.warning(f"Job {job.id} ({job.kind}) was reclaimed before worker {self.name} reached it")
+            return len(jobs)
+
+    def run(self, stop):
+        """Runs until ``stop`` (a threading.Event) is set, finishing the current batch."""
+        while not stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception:
+                logger.exception(f"Worker {self.name} failed to claim jobs")
+                claimed = 0
+            if not claimed:
+                stop.wait(self.poll_interval)
+
+
+def run_workers(app, concurrency=1, lanes=None, stop=None):
+    """Runs ``concurrency`` Worker threads until ``stop`` is set; blocks."""
+    stop = stop or threading.Event()
+    threads = [threading.Thread(target=Worker(app, lanes).run, args=(stop,), name=f'job-worker-{n}', daemon=True)
+               for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        # Joined with a timeout so the main thread keeps handling signals
+        while thread.is_alive():
+            thread.join(1)
@@ -0,0 +1,155 @@
+"""Prometheus metrics and the /metrics endpoint.
+
+Covers per-route latency and status counts (labelled by API namespace and
+resource), in-flight requests, SQLAlchemy pool usage, worker liveness and the
+latency of outbound calls (payment gateway, SMTP).
+
+Under gunicorn every worker is a separate process, so metrics are written to
+the directory named by PROMETHEUS_MULTIPROC_DIR (set up in gunicorn.conf.py)
+and merged at scrape time. Without that variable the default in-process
+registry is used.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+
+from .extensions import api, db
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by API namespace and resource',
+    ['namespace', 'resource', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total', 'Requests by API namespace, resource and status code',
+    ['namespace', 'resource', 'method', 'status'],
+)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled', ['namespace'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections currently checked out of the pool', ['bind'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Connections open beyond pool_size', ['bind'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_SIZE = Gauge(
+    'db_pool_size', 'Configured pool size', ['bind'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_CHECKOUTS = Counter('db_pool_checkouts_total', 'Pool checkouts', ['bind'])
+EXTERNAL_CALL_LATENCY = Histogram(
+    'external_call_duration_seconds', 'Latency of outbound calls',
+    ['service', 'operation', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+WORKER_UP = Gauge('app_worker_up', 'One series per live worker process', multiprocess_mode='liveall')
+
+
+@contextmanager
+def track_external_call(service, operation):
+    """Time an outbound call, e.g. ``with track_external_call('flutterwave', 'verify'):``."""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        EXTERNAL_CALL_LATENCY.labels(service, operation, outcome).observe(time.perf_counter() - started)
+
+
+def _namespace_prefixes():
+    prefixes = [(path.rstrip('/'), ns.name) for ns, path in api.ns_paths.items() if path]
+    return sorted(prefixes, key=lambda p: len(p[0]), reverse=True)
+
+
+def route_labels(rule, prefixes):
+    """(namespace, resource) for a URL rule such as /api/client/payments/<int:payment_id>."""
+    if rule is None:
+        return 'unmatched', ''
+    for path, name in prefixes:
+        if rule == path or rule.startswith(path + '/'):
+            return name, rule[len(path):] or '/'
+    # Namespaces registered under several paths only remember the last one;
+    # fall back to the first segment after /api.
+    parts = rule.split('/')
+    if len(parts) > 2 and parts[1] == 'api':
+        return parts[2], '/' + '/'.join(parts[3:])
+    return '', rule
+
+
+def _instrument_pool(name, engine):
+    pool = engine.pool
+    size = getattr(pool, 'size', None)
+    if callable(size):
+        DB_POOL_SIZE.labels(name).set(size())
+
+    def _update():
+        if hasattr(pool, 'checkedout'):
+            DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        if hasattr(pool, 'overflow'):
+            DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(name).inc()
+        _update()
+
+    @event.listens_for(engine, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        _update()
+
+
+def init_metrics(app):
+    prefixes = []
+
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            _instrument_pool(bind or 'default', engine)
+    WORKER_UP.set(1)
+
+    @app.before_request
+    def _start_metrics():
+        if request.path == '/metrics':
+            return
+        if not prefixes:
+            prefixes.extend(_namespace_prefixes())
+        namespace, resource = route_labels(request.url_rule.rule if request.url_rule else None, prefixes)
+        g._metrics = (namespace, resource, time.perf_counter())
+        IN_FLIGHT.labels(namespace).inc()
+
+    @app.after_request
+    def _record_metrics(response):
+        labels = g.get('_metrics')
+        if labels:
+            namespace, resource, started = labels
+            REQUEST_LATENCY.labels(namespace, resource, request.method).observe(time.perf_counter() - started)
+            REQUEST_COUNT.labels(namespace, resource, request.method, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_request
+    def _finish_metrics(exc):
+        labels = g.pop('_metrics', None)
+        if labels:
+            IN_FLIGHT.labels(labels[0]).dec()
+
+    @app.get('/metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return {'message': 'Unauthorized'}, 401
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
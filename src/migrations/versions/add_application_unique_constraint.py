@@ -0,0 +1,36 @@
+"""one application per freelancer and project
+
+Revision ID: add_application_unique
+Revises: add_applications_count
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_application_unique'
+down_revision = 'add_applications_count'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the earliest application of each duplicate pair, then fix the cached counts
+    op.execute("""
+        DELETE FROM project_applications a
+        USING project_applications b
+        WHERE a.project_id = b.project_id
+          AND a.freelancer_id = b.freelancer_id
+          AND a.id > b.id
+    """)
+    op.execute("""
+        UPDATE projects p
+        SET applications_count = (SELECT count(*) FROM project_applications a WHERE a.project_id = p.id)
+    """)
+    op.create_unique_constraint('uq_project_applications_project_freelancer', 'project_applications',
+                                ['project_id', 'freelancer_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_project_applications_project_freelancer', 'project_applications', type_='unique')
@@ -0,0 +1,45 @@
+"""background job queue
+
+Revision ID: add_background_jobs
+Revises: add_invoice_reminders
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_background_jobs'
+down_revision = 'add_invoice_reminders'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'background_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.String(length=100), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('priority', sa.SmallInteger(), nullable=False, server_default='1'),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_background_jobs_ready', 'background_jobs', ['priority', 'run_at', 'id'],
+                    postgresql_where=sa.text("status IN ('queued', 'running')"))
+    op.create_index('uq_background_jobs_pending_key', 'background_jobs', ['kind', 'key'], unique=True,
+                    postgresql_where=sa.text("status IN ('queued', 'running') AND key IS NOT NULL"))
+
+
+def downgrade():
+    op.drop_index('uq_background_jobs_pending_key', table_name='background_jobs')
+    op.drop_index('ix_background_jobs_ready', table_name='background_jobs')
+    op.drop_table('background_jobs')
@@ -0,0 +1,33 @@
+"""add indexes for the client dashboard aggregates
+
+Revision ID: add_dashboard_indexes
+Revises: add_verification_cols
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_dashboard_indexes'
+down_revision = 'add_verification_cols'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_projects_client_id_status', 'projects', ['client_id', 'status']),
+    ('ix_milestones_project_id_status', 'milestones', ['project_id', 'status']),
+    ('ix_invoices_milestone_id_status', 'invoices', ['milestone_id', 'status']),
+    ('ix_payments_client_id_paid_at', 'payments', ['client_id', 'paid_at']),
+    ('ix_project_applications_project_id_status', 'project_applications', ['project_id', 'status']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,36 @@
+"""store replayed headers on idempotency keys
+
+Revision ID: add_idempotency_headers
+Revises: add_background_jobs
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_idempotency_headers'
+down_revision = 'add_background_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('idempotency_keys', sa.Column('response_headers', sa.JSON(), nullable=True))
+    op.execute("""
+        UPDATE idempotency_keys
+        SET response_headers = json_build_object('Content-Type', json_build_array(content_type))
+        WHERE content_type IS NOT NULL
+    """)
+    op.drop_column('idempotency_keys', 'content_type')
+
+
+def downgrade():
+    op.add_column('idempotency_keys', sa.Column('content_type', sa.String(length=100), nullable=True))
+    op.execute("""
+        UPDATE idempotency_keys
+        SET content_type = response_headers -> 'Content-Type' ->> 0
+        WHERE response_headers IS NOT NULL
+    """)
+    op.drop_column('idempotency_keys', 'response_headers')
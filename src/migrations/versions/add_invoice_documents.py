@@ -0,0 +1,33 @@
+"""rendered invoice documents cached by content hash
+
+Revision ID: add_invoice_documents
+Revises: add_timesheet_rollup
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_invoice_documents'
+down_revision = 'add_timesheet_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'invoice_documents',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('invoice_id', sa.Integer(), sa.ForeignKey('invoices.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('rendered_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('invoice_id', 'format', name='uq_invoice_documents_invoice_format'),
+    )
+
+
+def downgrade():
+    op.drop_table('invoice_documents')
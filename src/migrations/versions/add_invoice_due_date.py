@@ -0,0 +1,47 @@
+"""invoice due dates and one invoice per milestone
+
+Revision ID: add_invoice_due_date
+Revises: add_invoice_documents
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_invoice_due_date'
+down_revision = 'add_invoice_documents'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('invoices', sa.Column('due_date', sa.Date(), nullable=True))
+    # Drop duplicate invoices for a milestone, keeping the paid one (status
+    # 'paid' or referenced by a payment) if there is one and the earliest
+    # otherwise. Invoices that payments refer to are never deleted; if two of
+    # those exist for one milestone the constraint below fails and they need
+    # reconciling by hand.
+    op.execute("""
+        DELETE FROM invoices i
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY milestone_id
+                ORDER BY (COALESCE(status = 'paid', false)
+                          OR EXISTS (SELECT 1 FROM payments p WHERE p.invoice_id = invoices.id)) DESC,
+                         id
+            ) AS rank
+            FROM invoices
+            WHERE milestone_id IS NOT NULL
+        ) ranked
+        WHERE i.id = ranked.id
+          AND ranked.rank > 1
+          AND NOT EXISTS (SELECT 1 FROM payments p WHERE p.invoice_id = i.id)
+    """)
+    op.create_unique_constraint('uq_invoices_milestone_id', 'invoices', ['milestone_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_invoices_milestone_id', 'invoices', type_='unique')
+    op.drop_column('invoices', 'due_date')
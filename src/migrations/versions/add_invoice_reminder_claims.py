@@ -0,0 +1,24 @@
+"""add claimed_at to invoice reminders
+
+Revision ID: add_invoice_reminder_claims
+Revises: add_idempotency_headers
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_invoice_reminder_claims'
+down_revision = 'add_idempotency_headers'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('invoice_reminders', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('invoice_reminders', 'claimed_at')
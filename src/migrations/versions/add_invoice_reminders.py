@@ -0,0 +1,40 @@
+"""overdue invoice sweep index and reminder digests
+
+Revision ID: add_invoice_reminders
+Revises: add_invoice_due_date
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_invoice_reminders'
+down_revision = 'add_invoice_due_date'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_invoices_pending_due_date', 'invoices', ['due_date'],
+                    postgresql_where=sa.text("status = 'pending'"))
+    op.create_table(
+        'invoice_reminders',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('client_id', sa.Integer(), sa.ForeignKey('client_profiles.id', ondelete='CASCADE'),
+                  nullable=False),
+        sa.Column('invoices', sa.JSON(), nullable=False),
+        sa.Column('total', sa.Numeric(12, 2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_invoice_reminders_unsent', 'invoice_reminders', ['id'],
+                    postgresql_where=sa.text('sent_at IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_invoice_reminders_unsent', table_name='invoice_reminders')
+    op.drop_table('invoice_reminders')
+    op.drop_index('ix_invoices_pending_due_date', table_name='invoices')
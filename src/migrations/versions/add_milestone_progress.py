@@ -0,0 +1,48 @@
+"""add per-project milestone progress rollup
+
+Revision ID: add_milestone_progress
+Revises: add_dashboard_indexes
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_milestone_progress'
+down_revision = 'add_dashboard_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'project_milestone_progress',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('approved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('pending', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount_approved', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('amount_remaining', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    # Backfill from existing milestones
+    op.execute("""
+        INSERT INTO project_milestone_progress
+            (project_id, total, approved, pending, amount_approved, amount_remaining, updated_at)
+        SELECT project_id,
+               count(*),
+               count(*) FILTER (WHERE status = 'approved'),
+               count(*) FILTER (WHERE status IS DISTINCT FROM 'approved'),
+               coalesce(sum(amount) FILTER (WHERE status = 'approved'), 0),
+               coalesce(sum(amount) FILTER (WHERE status IS DISTINCT FROM 'approved'), 0),
+               now()
+        FROM milestones
+        WHERE project_id IS NOT NULL
+        GROUP BY project_id
+    """)
+
+
+def downgrade():
+    op.drop_table('project_milestone_progress')
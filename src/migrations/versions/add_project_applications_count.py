@@ -0,0 +1,33 @@
+"""add projects.applications_count
+
+Revision ID: add_applications_count
+Revises: add_idempotency_keys
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_applications_count'
+down_revision = 'add_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('applications_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE projects p
+        SET applications_count = c.n
+        FROM (SELECT project_id, count(*) AS n FROM project_applications GROUP BY project_id) c
+        WHERE c.project_id = p.id
+    """)
+    op.create_index('ix_project_applications_project_id_applied_at', 'project_applications',
+                    ['project_id', 'applied_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_project_applications_project_id_applied_at', table_name='project_applications', if_exists=True)
+    op.drop_column('projects', 'applications_count')
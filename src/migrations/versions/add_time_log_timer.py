@@ -0,0 +1,44 @@
+"""time log descriptions and one running timer per freelancer
+
+Revision ID: add_time_log_timer
+Revises: add_application_unique
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_time_log_timer'
+down_revision = 'add_application_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('time_logs', sa.Column('description', sa.Text(), nullable=True))
+    op.add_column('time_logs', sa.Column('created_at', sa.DateTime(), nullable=True))
+    # Only the latest open entry per freelancer stays running; older ones are
+    # closed at their start so they log no time
+    op.execute("""
+        UPDATE time_logs t
+        SET end_time = t.start_time
+        WHERE t.end_time IS NULL
+          AND EXISTS (
+              SELECT 1 FROM time_logs newer
+              WHERE newer.freelancer_id = t.freelancer_id
+                AND newer.end_time IS NULL
+                AND (newer.start_time, newer.id) > (t.start_time, t.id)
+          )
+    """)
+    op.create_index('uq_time_logs_running_timer', 'time_logs', ['freelancer_id'], unique=True,
+                    postgresql_where=sa.text('end_time IS NULL'))
+    op.create_index('ix_time_logs_freelancer_id_start_time', 'time_logs', ['freelancer_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_time_logs_freelancer_id_start_time', table_name='time_logs')
+    op.drop_index('uq_time_logs_running_timer', table_name='time_logs')
+    op.drop_column('time_logs', 'created_at')
+    op.drop_column('time_logs', 'description')
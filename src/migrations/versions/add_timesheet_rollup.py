@@ -0,0 +1,47 @@
+"""timesheet rollup of finished weeks
+
+Revision ID: add_timesheet_rollup
+Revises: add_time_log_timer
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_timesheet_rollup'
+down_revision = 'add_time_log_timer'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'timesheet_days',
+        sa.Column('freelancer_id', sa.Integer(), sa.ForeignKey('freelancer_profiles.id', ondelete='CASCADE'),
+                  primary_key=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('seconds', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_timesheet_days_project_id_day', 'timesheet_days', ['project_id', 'day'])
+    op.create_table(
+        'timesheet_rollup',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('through', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    # Writers share-lock this row while they touch rolled-up weeks; nothing is
+    # rolled up until the first `flask timesheets rollup`
+    op.execute("INSERT INTO timesheet_rollup (id, through, updated_at) VALUES (1, NULL, now())")
+    op.create_index('ix_time_logs_freelancer_id_end_time', 'time_logs', ['freelancer_id', 'end_time'])
+    op.create_index('ix_time_logs_project_id_end_time', 'time_logs', ['project_id', 'end_time'])
+
+
+def downgrade():
+    op.drop_index('ix_time_logs_project_id_end_time', table_name='time_logs')
+    op.drop_index('ix_time_logs_freelancer_id_end_time', table_name='time_logs')
+    op.drop_table('timesheet_rollup')
+    op.drop_index('ix_timesheet_days_project_id_day', table_name='timesheet_days')
+    op.drop_table('timesheet_days')
@@ -0,0 +1,28 @@
+"""add version columns for optimistic concurrency
+
+Revision ID: add_version_columns
+Revises: add_milestone_progress
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_version_columns'
+down_revision = 'add_milestone_progress'
+branch_labels = None
+depends_on = None
+
+TABLES = ('projects', 'milestones', 'disputes')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_column(table, 'version')
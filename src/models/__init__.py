@@ -6,16 +6,22 @@ from .skill import Skill, FreelancerSkill
 from .user import User, ClientProfile, FreelancerProfile
 from .project import Project
 from .milestone import Milestone
+from .milestone_progress import MilestoneProgress
 from .dispute import Dispute
 from .deliverable import Deliverable
 from .invoice import Invoice
+from .invoice_document import InvoiceDocument
+from .invoice_reminder import InvoiceReminder
 from .payment import Payment
 from .message import Message
 from .review import Review
 # skill already imported above
 from .time_log import TimeLog
+from .timesheet import TimesheetDay, TimesheetRollup
 from .project_application import ProjectApplication
 from .policy import Policy
+from .idempotency_key import IdempotencyKey
+from .background_job import BackgroundJob
 
 # Import schemas
 from .user import UserSchema, ClientProfileSchema, FreelancerProfileSchema
@@ -48,8 +54,11 @@ except ImportError:
 __all__ = [
     'Deliverable',
     'Invoice',
+    'InvoiceDocument',
+    'InvoiceReminder',
     'Message',
     'Milestone',
+    'MilestoneProgress',
     'Payment',
     'ProjectApplication',
     'Project',
@@ -58,9 +67,13 @@ __all__ = [
     'FreelancerSkill',
     'TimeLog',
     'TimeEntry',  # Alias
+    'TimesheetDay',
+    'TimesheetRollup',
     'User',
     'FreelancerProfile',
     'ClientProfile',
     'Application',
     'Job',
+    'IdempotencyKey',
+    'BackgroundJob',
 ]
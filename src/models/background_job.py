@@ -0,0 +1,43 @@
+from ..extensions import db
+from datetime import datetime, timezone
+
+# Priority lanes, most urgent first; stored as ``BackgroundJob.priority``
+LANES = {'high': 0, 'default': 1, 'low': 2}
+
+# States a job can still be claimed in: ``running`` ones only once their
+# visibility timeout (``run_at``) has passed
+CLAIMABLE = ('queued', 'running')
+
+
+class BackgroundJob(db.Model):
+    """One unit of background work, run by ``flask jobs work`` (see jobs.py).
+
+    ``run_at`` is when the job may next be claimed: the enqueue time (or a
+    delay), pushed past the visibility timeout while a worker holds it and
+    past the backoff after a failed attempt. ``key`` makes enqueueing
+    idempotent: at most one unfinished job exists per ``(kind, key)``.
+    """
+    __tablename__ = 'background_jobs'
+    __table_args__ = (
+        # Claims scan ready jobs lane by lane in run_at order
+        db.Index('ix_background_jobs_ready', 'priority', 'run_at', 'id',
+                 postgresql_where=db.text("status IN ('queued', 'running')"),
+                 sqlite_where=db.text("status IN ('queued', 'running')")),
+        db.Index('uq_background_jobs_pending_key', 'kind', 'key', unique=True,
+                 postgresql_where=db.text("status IN ('queued', 'running') AND key IS NOT NULL"),
+                 sqlite_where=db.text("status IN ('queued', 'running') AND key IS NOT NULL")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(100), nullable=False)
+    key = db.Column(db.String(255))
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    priority = db.Column(db.SmallInteger, nullable=False, default=LANES['default'])
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    run_at = db.Column(db.DateTime, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime)
@@ -1,4 +1,5 @@
 from ..extensions import db
+from ..serializers import serialize
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
@@ -13,14 +14,7 @@ class Deliverable(db.Model):
     status = db.Column(db.String(50))
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'milestone_id': self.milestone_id,
-            'file_url': self.file_url,
-            'link': self.link,
-            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
-            'status': self.status
-        }
+        return serialize(self)
 
 class DeliverableSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -11,6 +11,8 @@ class Dispute(db.Model):
     resolution = db.Column(db.Text, default='')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     resolved_at = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False, default=1)  # optimistic concurrency, see transitions.py
+    __mapper_args__ = {'version_id_col': version}
 
 class DisputeSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -0,0 +1,20 @@
+from ..extensions import db
+
+
+class IdempotencyKey(db.Model):
+    """A claimed ``Idempotency-Key`` and, once the request finished, its response.
+
+    ``key_hash`` is sha256 of the caller scope and the header value, so the
+    row stays small whatever keys clients send. ``response_status`` is NULL
+    while the first request is still running; ``response_headers`` maps each
+    replayed header name to its values.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    key_hash = db.Column(db.String(64), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    response_status = db.Column(db.SmallInteger)
+    response_body = db.Column(db.LargeBinary)
+    response_headers = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
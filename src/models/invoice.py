@@ -1,29 +1,62 @@
 from ..extensions import db
+from ..serializers import serialize
+from sqlalchemy import exists, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import NUMERIC
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_milestone_id_status', 'milestone_id', 'status'),
+        # One invoice per milestone; generate_milestone_invoices relies on it
+        db.UniqueConstraint('milestone_id', name='uq_invoices_milestone_id'),
+        # The overdue sweep only scans pending invoices by due date
+        db.Index('ix_invoices_pending_due_date', 'due_date', postgresql_where=db.text("status = 'pending'"),
+                 sqlite_where=db.text("status = 'pending'")),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     milestone_id = db.Column(db.Integer, db.ForeignKey('milestones.id'))
     amount = db.Column(NUMERIC(10, 2))
-    generated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    generated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    due_date = db.Column(db.Date)
     status = db.Column(db.String(50))
 
     # payments = db.relationship("Payment", backref="invoices")
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'milestone_id': self.milestone_id,
-            'amount': float(self.amount) if self.amount is not None else None,
-            'generated_at': self.generated_at.isoformat() if self.generated_at else None,
-            'status': self.status
-        }
+        return serialize(self)
+
+
+def generate_milestone_invoices(due_days=14, now=None):
+    """Invoices every approved milestone that has none yet; returns how many.
+
+    A single ``INSERT ... SELECT ... ON CONFLICT (milestone_id) DO NOTHING``,
+    so a month-end run over tens of thousands of milestones is one statement,
+    and runs racing each other (or a manual invoice) can't double-bill a
+    milestone. Runs in the caller's transaction.
+    """
+    from .milestone import Milestone  # milestone.py builds its schema at import
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    table = Invoice.__table__
+    insert_ = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[db.engine.dialect.name]
+    uninvoiced = select(
+        Milestone.id, Milestone.amount, literal(now, db.DateTime),
+        literal((now + timedelta(days=due_days)).date(), db.Date), literal('pending')
+    ).where(
+        Milestone.status == 'approved',
+        ~exists().where(table.c.milestone_id == Milestone.id)
+    )
+    stmt = insert_(table).from_select(
+        ['milestone_id', 'amount', 'generated_at', 'due_date', 'status'], uninvoiced
+    ).on_conflict_do_nothing(index_elements=['milestone_id'])
+    return db.session.execute(stmt).rowcount
+
 
 class InvoiceSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = Invoice
-        load_instance = True
\ No newline at end of file
+        load_instance = True
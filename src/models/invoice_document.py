@@ -0,0 +1,107 @@
+from ..extensions import db
+from .invoice import Invoice
+from .milestone import Milestone
+from .project import Project
+from .user import ClientProfile, FreelancerProfile, User
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased
+from datetime import datetime, timezone
+
+
+class InvoiceDocument(db.Model):
+    """The latest rendered document per invoice and format.
+
+    ``content_hash`` is ``document_hash`` of the inputs it was rendered from
+    (see invoice_documents.py); a lookup only hits when the invoice's current
+    inputs hash to the same value, and a re-render replaces the row.
+    """
+    __tablename__ = 'invoice_documents'
+    __table_args__ = (
+        db.UniqueConstraint('invoice_id', 'format', name='uq_invoice_documents_invoice_format'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id', ondelete='CASCADE'), nullable=False)
+    format = db.Column(db.String(10), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    body = db.Column(db.LargeBinary, nullable=False)
+    rendered_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def invoice_document_inputs(invoice_id):
+    """Everything an invoice document shows, plus who may read it, in one query.
+
+    Returns ``(inputs, client_user_id, freelancer_user_id)`` or None when the
+    invoice doesn't exist. ``inputs`` holds only strings and ints so it can
+    be hashed and sent to a worker process as is.
+    """
+    client_user, freelancer_user = aliased(User), aliased(User)
+    row = db.session.execute(
+        select(
+            Invoice.id, Invoice.amount, Invoice.status, Invoice.generated_at,
+            Milestone.id.label('milestone_id'), Milestone.title.label('milestone_title'),
+            Milestone.description.label('milestone_description'), Milestone.due_date,
+            Milestone.amount.label('milestone_amount'),
+            Project.id.label('project_id'), Project.title.label('project_title'),
+            ClientProfile.company_name, client_user.id.label('client_user_id'),
+            client_user.email.label('client_email'),
+            freelancer_user.id.label('freelancer_user_id'), freelancer_user.email.label('freelancer_email'),
+        )
+        .select_from(Invoice)
+        .outerjoin(Milestone, Milestone.id == Invoice.milestone_id)
+        .outerjoin(Project, Project.id == Milestone.project_id)
+        .outerjoin(ClientProfile, ClientProfile.id == Project.client_id)
+        .outerjoin(client_user, client_user.id == ClientProfile.user_id)
+        .outerjoin(FreelancerProfile, FreelancerProfile.id == Project.freelancer_id)
+        .outerjoin(freelancer_user, freelancer_user.id == FreelancerProfile.user_id)
+        .where(Invoice.id == invoice_id)
+    ).first()
+    if row is None:
+        return None
+    inputs = {
+        'invoice': {'id': row.id, 'amount': _text(row.amount), 'status': row.status,
+                    'generated_at': _text(row.generated_at)},
+        'milestone': {'id': row.milestone_id, 'title': row.milestone_title,
+                      'description': row.milestone_description, 'due_date': _text(row.due_date),
+                      'amount': _text(row.milestone_amount)},
+        'project': {'id': row.project_id, 'title': row.project_title},
+        'client': {'company_name': row.company_name, 'email': row.client_email},
+        'freelancer': {'email': row.freelancer_email},
+    }
+    return inputs, row.client_user_id, row.freelancer_user_id
+
+
+def cached_invoice_document(invoice_id, fmt, content_hash):
+    """The stored body for exactly these inputs, or None."""
+    return db.session.execute(
+        select(InvoiceDocument.body).where(
+            InvoiceDocument.invoice_id == invoice_id,
+            InvoiceDocument.format == fmt,
+            InvoiceDocument.content_hash == content_hash,
+        )
+    ).scalar()
+
+
+def store_invoice_document(invoice_id, fmt, content_hash, body):
+    """Saves a render, replacing the invoice's previous document in that format.
+
+    Commits on its own connection: it is called from the render pool's
+    callback thread, outside any request.
+    """
+    table = InvoiceDocument.__table__
+    with db.engine.begin() as conn:
+        insert_ = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[conn.dialect.name]
+        stmt = insert_(table).values(
+            invoice_id=invoice_id, format=fmt, content_hash=content_hash, body=body,
+            rendered_at=datetime.now(timezone.utc)
+        )
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=['invoice_id', 'format'],
+            set_={'content_hash': stmt.excluded.content_hash, 'body': stmt.excluded.body,
+                  'rendered_at': stmt.excluded.rendered_at}
+        ))
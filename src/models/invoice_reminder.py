@@ -0,0 +1,27 @@
+from ..extensions import db
+from datetime import datetime, timezone
+
+
+class InvoiceReminder(db.Model):
+    """One overdue-invoice digest for a client, queued by the overdue sweep.
+
+    ``invoices`` lists what the email covers (id, project, amount, due
+    date) as it was when the invoices went overdue; ``sent_at`` stays NULL
+    until the digest has been mailed. ``claimed_at`` is set while a sender
+    is mailing it, so overlapping senders leave it alone.
+    """
+    __tablename__ = 'invoice_reminders'
+    __table_args__ = (
+        # Senders only ever look for unsent digests
+        db.Index('ix_invoice_reminders_unsent', 'id', postgresql_where=db.text('sent_at IS NULL'),
+                 sqlite_where=db.text('sent_at IS NULL')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('client_profiles.id', ondelete='CASCADE'), nullable=False)
+    invoices = db.Column(db.JSON, nullable=False)
+    total = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
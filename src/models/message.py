@@ -1,4 +1,5 @@
 from ..extensions import db
+from ..serializers import serialize
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
@@ -20,16 +21,7 @@ class Message(db.Model):
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref=db.backref('received_messages', lazy='dynamic'))
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'sender_id': self.sender_id,
-            'receiver_id': self.receiver_id,
-            'content': self.content,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'attachment_url': self.attachment_url,
-            'is_approved': self.is_approved
-        }
+        return serialize(self)
 
 class MessageSchema(SQLAlchemyAutoSchema):
     class Meta:
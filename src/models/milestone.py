@@ -1,10 +1,12 @@
 from ..extensions import db
+from ..serializers import serialize
 from sqlalchemy.dialects.postgresql import NUMERIC
 from datetime import date, datetime
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 class Milestone(db.Model):
     __tablename__ = 'milestones'
+    __table_args__ = (db.Index('ix_milestones_project_id_status', 'project_id', 'status'),)
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'))
@@ -13,20 +15,14 @@ class Milestone(db.Model):
     due_date = db.Column(db.Date)
     amount = db.Column(NUMERIC(10, 2))
     status = db.Column(db.String(20))
+    version = db.Column(db.Integer, nullable=False, default=1)  # optimistic concurrency, see transitions.py
+    __mapper_args__ = {'version_id_col': version}
     
     # Define relationship with project
     project = db.relationship('Project', backref=db.backref('milestones', cascade='all, delete-orphan'))
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'title': self.title,
-            'description': self.description,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'amount': float(self.amount) if self.amount is not None else None,
-            'status': self.status
-        }
+        return serialize(self)
 
 class MilestoneSchema(SQLAlchemyAutoSchema):
     class Meta:
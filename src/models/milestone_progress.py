@@ -0,0 +1,106 @@
+from ..extensions import db
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import NUMERIC
+from datetime import datetime, timezone
+from decimal import Decimal
+
+
+class MilestoneProgress(db.Model):
+    """Per-project milestone rollup, so project cards don't scan milestones.
+
+    ``pending`` counts every milestone that isn't approved yet (pending,
+    submitted or rejected), so ``total == approved + pending`` and
+    ``amount_remaining`` is what is still to be approved. Milestone handlers
+    keep it current with ``apply_milestone_change``; set-based changes that
+    bypass them rebuild it with ``refresh_milestone_progress``.
+    """
+    __tablename__ = 'project_milestone_progress'
+
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    approved = db.Column(db.Integer, nullable=False, default=0)
+    pending = db.Column(db.Integer, nullable=False, default=0)
+    amount_approved = db.Column(NUMERIC(12, 2), nullable=False, default=0)
+    amount_remaining = db.Column(NUMERIC(12, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    project = db.relationship('Project', backref=db.backref(
+        'milestone_progress', uselist=False, passive_deletes=True))
+
+
+ROLLUP_COLUMNS = ('total', 'approved', 'pending', 'amount_approved', 'amount_remaining')
+
+
+def _contribution(status, amount):
+    amount = Decimal(str(amount or 0))
+    if status == 'approved':
+        return {'total': 1, 'approved': 1, 'pending': 0, 'amount_approved': amount, 'amount_remaining': 0}
+    return {'total': 1, 'approved': 0, 'pending': 1, 'amount_approved': 0, 'amount_remaining': amount}
+
+
+def milestone_delta(before=None, after=None):
+    """Rollup change for a milestone going from ``before`` to ``after``.
+
+    Each side is a ``(status, amount)`` pair, or None for a created/deleted
+    milestone.
+    """
+    delta = dict.fromkeys(ROLLUP_COLUMNS, 0)
+    for side, sign in ((before, -1), (after, 1)):
+        if side is not None:
+            for key, value in _contribution(*side).items():
+                delta[key] += sign * value
+    return delta
+
+
+def _upsert(values, set_):
+    dialect = db.engine.dialect.name
+    insert_ = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[dialect]
+    stmt = insert_(MilestoneProgress).values(values)
+    return stmt.on_conflict_do_update(index_elements=['project_id'], set_=set_(stmt.excluded))
+
+
+def apply_milestone_change(project_id, before=None, after=None):
+    """Adds the delta for one milestone change to its project's rollup.
+
+    Increments rather than recomputes, so concurrent changes to the same
+    project can't overwrite each other. Runs in the caller's transaction.
+    """
+    delta = milestone_delta(before, after)
+    if not any(delta.values()):
+        return
+    table = MilestoneProgress.__table__
+    now = datetime.now(timezone.utc)
+    stmt = _upsert(
+        {'project_id': project_id, 'updated_at': now, **delta},
+        lambda excluded: {**{c: table.c[c] + excluded[c] for c in ROLLUP_COLUMNS}, 'updated_at': now}
+    )
+    db.session.execute(stmt)
+
+
+def refresh_milestone_progress(project_ids=None):
+    """Recomputes rollups from the milestones table (all projects when None)."""
+    from .milestone import Milestone  # milestone.py builds its schema at import; avoid the cycle via project.py
+
+    approved = Milestone.status == 'approved'
+    amount = func.coalesce(Milestone.amount, 0)
+    query = select(
+        Milestone.project_id,
+        func.count(),
+        func.count().filter(approved),
+        func.count().filter(~approved | Milestone.status.is_(None)),
+        func.coalesce(func.sum(case((approved, amount), else_=0)), 0),
+        func.coalesce(func.sum(case((approved, 0), else_=amount)), 0),
+        literal(datetime.now(timezone.utc), db.DateTime),
+    ).where(Milestone.project_id.isnot(None)).group_by(Milestone.project_id)
+    stale = delete(MilestoneProgress)
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        if not project_ids:
+            return
+        query = query.where(Milestone.project_id.in_(project_ids))
+        stale = stale.where(MilestoneProgress.project_id.in_(project_ids))
+    # Projects whose milestones are all gone keep no rollup row.
+    db.session.execute(stale)
+    db.session.execute(insert(MilestoneProgress).from_select(['project_id', *ROLLUP_COLUMNS, 'updated_at'], query))
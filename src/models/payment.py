@@ -1,10 +1,12 @@
 from ..extensions import db
+from ..serializers import serialize
 from sqlalchemy.dialects.postgresql import NUMERIC
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (db.Index('ix_payments_client_id_paid_at', 'client_id', 'paid_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'))
@@ -22,19 +24,7 @@ class Payment(db.Model):
     # access payments from profiles via ClientProfile.payments and FreelancerProfile.payments
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'invoice_id': self.invoice_id,
-            'client_id': self.client_id,
-            'freelancer_id': self.freelancer_id,
-            'transaction_id': self.transaction_id,
-            'amount': float(self.amount) if self.amount is not None else None,
-            'paid_at': self.paid_at.isoformat() if self.paid_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'status': self.status,
-            'payment_date': self.payment_date.isoformat() if self.payment_date else None,
-            'payment_method': self.payment_method
-        }
+        return serialize(self)
 
 class PaymentSchema(SQLAlchemyAutoSchema):
     class Meta:
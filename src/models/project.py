@@ -1,8 +1,12 @@
 from ..extensions import db, ma
+from ..serializers import ModelSerializer, register
+from .user import ClientProfile, FreelancerProfile
+from .milestone_progress import MilestoneProgress, ROLLUP_COLUMNS
 from datetime import datetime, timezone
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (db.Index('ix_projects_client_id_status', 'client_id', 'status'),)
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200))
     description = db.Column(db.Text)
@@ -12,6 +16,10 @@ class Project(db.Model):
     freelancer_id = db.Column(db.Integer, db.ForeignKey('freelancer_profiles.id'))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     completed_at = db.Column(db.DateTime, onupdate=lambda: datetime.now(timezone.utc))
+    # Maintained by ProjectApplication insert/delete events, see project_application.py
+    applications_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    version = db.Column(db.Integer, nullable=False, default=1)  # optimistic concurrency, see transitions.py
+    __mapper_args__ = {'version_id_col': version}
 
     client = db.relationship('ClientProfile', backref=db.backref('projects', lazy='dynamic'))
     freelancer = db.relationship('FreelancerProfile', backref=db.backref('projects', lazy='dynamic'))
@@ -46,9 +54,16 @@ class ProjectSchema(ma.SQLAlchemyAutoSchema):
             }
         return None
 
-# Convenience serialization methods on Project
-def _project_to_dict(obj):
-    return ProjectSchema().dump(obj)
+# Precompiled serializer; the nested details match what ProjectSchema exposes.
+project_serializer = register(Project, nested={
+    'client_details': ('client', ModelSerializer(ClientProfile, fields=('id', 'company_name', 'industry'))),
+    'freelancer_details': ('freelancer', ModelSerializer(FreelancerProfile, fields=('id', 'hourly_rate'))),
+    'milestone_progress': ('milestone_progress', ModelSerializer(MilestoneProgress, fields=ROLLUP_COLUMNS)),
+})
+
+
+def _project_to_dict(obj, include=('client_details', 'freelancer_details')):
+    return project_serializer.dump(obj, include)
 
 # Monkey-patch to_dict onto Project class
 Project.to_dict = _project_to_dict
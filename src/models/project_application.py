@@ -1,9 +1,18 @@
 from ..extensions import db
+from ..serializers import serialize
+from .project import Project
+from sqlalchemy import event, func, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 class ProjectApplication(db.Model):
     __tablename__ = 'project_applications'
+    __table_args__ = (
+        db.UniqueConstraint('project_id', 'freelancer_id', name='uq_project_applications_project_freelancer'),
+        db.Index('ix_project_applications_project_id_status', 'project_id', 'status'),
+        db.Index('ix_project_applications_project_id_applied_at', 'project_id', 'applied_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'))
@@ -11,22 +20,81 @@ class ProjectApplication(db.Model):
     proposal = db.Column(db.Text)
     bid_amount = db.Column(db.Numeric(10, 2))
     status = db.Column(db.String(50), default='pending')
-    applied_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    applied_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     # Define relationships
     project = db.relationship('Project', backref=db.backref('applications', cascade='all, delete-orphan'))
     freelancer = db.relationship('FreelancerProfile', backref=db.backref('applications', lazy='dynamic'))
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'freelancer_id': self.freelancer_id,
-            'proposal': self.proposal,
-            'bid_amount': float(self.bid_amount) if self.bid_amount else None,
-            'status': self.status,
-            'applied_at': self.applied_at.isoformat() if self.applied_at else None
-        }
+        return serialize(self)
+
+
+# Project.applications_count is kept in step with inserts/deletes in the same flush
+def _bump_applications_count(connection, project_id, delta):
+    if project_id is not None:
+        projects = Project.__table__
+        connection.execute(update(projects).where(projects.c.id == project_id).values(
+            applications_count=projects.c.applications_count + delta,
+            completed_at=projects.c.completed_at  # not a project update; keep the onupdate default off
+        ))
+
+
+@event.listens_for(ProjectApplication, 'after_insert')
+def _count_inserted_application(mapper, connection, target):
+    _bump_applications_count(connection, target.project_id, 1)
+
+
+@event.listens_for(ProjectApplication, 'after_delete')
+def _count_deleted_application(mapper, connection, target):
+    _bump_applications_count(connection, target.project_id, -1)
+
+
+@event.listens_for(ProjectApplication, 'after_update')
+def _count_moved_application(mapper, connection, target):
+    history = inspect(target).attrs.project_id.history
+    for project_id in history.deleted:
+        _bump_applications_count(connection, project_id, -1)
+    for project_id in history.added:
+        _bump_applications_count(connection, project_id, 1)
+
+
+def apply_statement(project_id, freelancer_id, proposal=None, bid_amount=None, open_status='posted'):
+    """The single PostgreSQL statement behind ``apply_to_project``."""
+    applications, projects = ProjectApplication.__table__, Project.__table__
+    open_project = select(projects.c.id).where(
+        projects.c.id == project_id, projects.c.status == open_status
+    ).cte('open_project')
+    inserted = insert(applications).from_select(
+        ['project_id', 'freelancer_id', 'proposal', 'bid_amount', 'status', 'applied_at'],
+        select(open_project.c.id, literal(freelancer_id), literal(proposal, db.Text),
+               literal(bid_amount, applications.c.bid_amount.type), literal('pending'),
+               literal(datetime.now(timezone.utc), db.DateTime))
+    ).on_conflict_do_nothing(
+        index_elements=['project_id', 'freelancer_id']
+    ).returning(applications.c.id).cte('inserted')
+    # UPDATE ... RETURNING also reports the project's status, telling "no such
+    # project" and "not open" apart from "already applied" in the same statement.
+    return update(projects).where(projects.c.id == project_id).values(
+        applications_count=projects.c.applications_count + select(func.count()).select_from(inserted).scalar_subquery(),
+        completed_at=projects.c.completed_at
+    ).returning(projects.c.status, select(inserted.c.id).scalar_subquery().label('application_id'))
+
+
+def apply_to_project(project_id, freelancer_id, proposal=None, bid_amount=None, open_status='posted'):
+    """Creates an application in one round trip (PostgreSQL).
+
+    One statement inserts the application only if the project is open, skips
+    it if this freelancer already applied (unique constraint, ``ON CONFLICT
+    DO NOTHING``) and bumps ``applications_count``; the mapper events don't
+    see Core inserts. Returns ``(project_status, application_id)``: None when
+    the project doesn't exist, ``application_id`` None when it isn't open or
+    the freelancer already applied.
+    """
+    stmt = apply_statement(project_id, freelancer_id, proposal, bid_amount, open_status)
+    row = db.session.execute(stmt).first()
+    return (row.status, row.application_id) if row is not None else (None, None)
+
 
 class ProjectApplicationSchema(SQLAlchemyAutoSchema):
     class Meta:
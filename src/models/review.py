@@ -1,4 +1,5 @@
 from ..extensions import db
+from ..serializers import serialize
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
@@ -13,14 +14,7 @@ class Review(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'reviewer_id': self.reviewer_id,
-            'rating': self.rating,
-            'comment': self.comment,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return serialize(self)
 
 class ReviewSchema(SQLAlchemyAutoSchema):
     class Meta:
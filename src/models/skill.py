@@ -1,4 +1,5 @@
 from ..extensions import db
+from ..serializers import serialize
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 class Skill(db.Model):
@@ -8,7 +9,7 @@ class Skill(db.Model):
     name = db.Column(db.String(100), nullable=False, unique=True)
 
     def to_dict(self):
-        return {'id': self.id, 'name': self.name}
+        return serialize(self)
 
 class SkillSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -22,7 +23,7 @@ class FreelancerSkill(db.Model):
     skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
 
     def to_dict(self):
-        return {'freelancer_profile_id': self.freelancer_profile_id, 'skill_id': self.skill_id}
+        return serialize(self)
 
 class FreelancerSkillSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -1,26 +1,32 @@
 from ..extensions import db
+from ..serializers import serialize
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 class TimeLog(db.Model):
     __tablename__ = 'time_logs'
+    __table_args__ = (
+        # At most one running timer (end_time IS NULL) per freelancer
+        db.Index('uq_time_logs_running_timer', 'freelancer_id', unique=True,
+                 postgresql_where=db.text('end_time IS NULL'), sqlite_where=db.text('end_time IS NULL')),
+        db.Index('ix_time_logs_freelancer_id_start_time', 'freelancer_id', 'start_time'),
+        # Timesheets select logs still open or ending after a point in time
+        db.Index('ix_time_logs_freelancer_id_end_time', 'freelancer_id', 'end_time'),
+        db.Index('ix_time_logs_project_id_end_time', 'project_id', 'end_time'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'))
     freelancer_id = db.Column(db.Integer, db.ForeignKey('freelancer_profiles.id'))
     start_time = db.Column(db.DateTime)
     end_time = db.Column(db.DateTime)
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'freelancer_id': self.freelancer_id,
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None
-        }
+        return serialize(self)
 
 class TimeLogSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = TimeLog
-        load_instance = True
\ No newline at end of file
+        load_instance = True
@@ -0,0 +1,134 @@
+from ..extensions import db
+from .time_log import TimeLog
+from sqlalchemy import Interval, cast, delete, extract, func, insert, literal, select, true
+from datetime import datetime, timedelta, timezone
+
+ONE_DAY = literal(timedelta(days=1), Interval)
+ONE_MICROSECOND = literal(timedelta(microseconds=1), Interval)
+
+
+class TimesheetDay(db.Model):
+    """Seconds logged per freelancer, project and day, for finished weeks.
+
+    Covers closed time logs on days before ``TimesheetRollup.through``;
+    timesheet reports read it there and bucket ``time_logs`` live after it.
+    ``flask timesheets rollup`` moves ``through`` up to the start of the
+    current week, and writes that land before it (bulk backfills, timers
+    started in an earlier week) rebuild their days with
+    ``refresh_timesheet_days``.
+    """
+    __tablename__ = 'timesheet_days'
+    __table_args__ = (
+        db.Index('ix_timesheet_days_project_id_day', 'project_id', 'day'),
+    )
+
+    freelancer_id = db.Column(db.Integer, db.ForeignKey('freelancer_profiles.id', ondelete='CASCADE'),
+                              primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    seconds = db.Column(db.Integer, nullable=False, default=0)
+
+
+class TimesheetRollup(db.Model):
+    """Single row (id 1): ``timesheet_days`` is complete before ``through``."""
+    __tablename__ = 'timesheet_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    through = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def week_start(moment):
+    """Monday 00:00 of ``moment``'s week (what ``date_trunc('week', ...)`` returns)."""
+    day = datetime(moment.year, moment.month, moment.day)
+    return day - timedelta(days=day.weekday())
+
+
+def split_by_day(where, window_lo, window_hi, now):
+    """``(freelancer_id, project_id, day, seconds)`` for every day each matching
+    log overlaps within ``[window_lo, window_hi)`` (PostgreSQL).
+
+    Logs crossing midnight yield one row per day, each with only that day's
+    part; running timers count up to ``now``. ``window_lo`` must fall on a
+    midnight and may be a per-row expression.
+    """
+    end = func.coalesce(TimeLog.end_time, now)
+    days = func.generate_series(
+        func.date_trunc('day', func.greatest(TimeLog.start_time, window_lo)),
+        func.least(end, window_hi) - ONE_MICROSECOND,
+        ONE_DAY
+    ).table_valued('day').render_derived('days').lateral()
+    seconds = extract('epoch', func.least(end, days.c.day + ONE_DAY, window_hi)
+                      - func.greatest(TimeLog.start_time, days.c.day))
+    return select(
+        TimeLog.freelancer_id, TimeLog.project_id, days.c.day, seconds.label('seconds')
+    ).select_from(TimeLog).join(days, true()).where(
+        *where, TimeLog.project_id.isnot(None), TimeLog.start_time < window_hi, end > window_lo
+    )
+
+
+def _rebuild(where, day_where, lo, hi):
+    """Replaces ``timesheet_days`` rows in ``[lo, hi)`` from closed time logs."""
+    db.session.execute(delete(TimesheetDay).where(*day_where, TimesheetDay.day >= lo, TimesheetDay.day < hi))
+    parts = split_by_day([*where, TimeLog.end_time.isnot(None)], lo, hi, _now()).subquery()
+    db.session.execute(insert(TimesheetDay).from_select(
+        ['freelancer_id', 'project_id', 'day', 'seconds'],
+        select(parts.c.freelancer_id, parts.c.project_id, cast(parts.c.day, db.Date),
+               cast(func.round(func.sum(parts.c.seconds)), db.Integer))
+        .group_by(parts.c.freelancer_id, parts.c.project_id, parts.c.day)
+    ))
+
+
+def rollup_through(lock=False):
+    """The rollup watermark, or None when nothing is rolled up.
+
+    ``lock`` takes a share lock on the state row so a concurrent
+    ``roll_up_finished_weeks`` waits for the caller's writes to commit and
+    includes them.
+    """
+    query = select(TimesheetRollup.through).where(TimesheetRollup.id == 1)
+    if lock:
+        query = query.with_for_update(read=True)
+    return db.session.execute(query).scalar()
+
+
+def refresh_timesheet_days(freelancer_id, since, until):
+    """Rebuilds the rolled-up days a change to ``[since, until)`` touched.
+
+    Call after writing time logs for ``freelancer_id`` in that span. Costs
+    one statement when it lies entirely in the current week (nothing there
+    is rolled up yet) and three otherwise. Runs in the caller's transaction.
+    """
+    if since >= week_start(_now()):
+        return
+    through = rollup_through(lock=True)
+    if through is None or since >= through:
+        return
+    lo = datetime(since.year, since.month, since.day)
+    hi = min(datetime(until.year, until.month, until.day) + timedelta(days=1), through)
+    _rebuild([TimeLog.freelancer_id == freelancer_id], [TimesheetDay.freelancer_id == freelancer_id], lo, hi)
+
+
+def roll_up_finished_weeks(now=None):
+    """Rolls up every finished week not rolled up yet; returns the new watermark."""
+    through = week_start(now or _now())
+    state = db.session.execute(
+        select(TimesheetRollup).where(TimesheetRollup.id == 1).with_for_update()
+    ).scalar_one_or_none()
+    if state is None:
+        state = TimesheetRollup(id=1)
+        db.session.add(state)
+    start = state.through
+    if start is None:
+        first = db.session.execute(select(func.min(TimeLog.start_time))).scalar()
+        start = week_start(first) if first is not None else through
+    if start < through:
+        _rebuild([], [], start, through)
+    state.through = max(through, state.through or through)
+    db.session.flush()
+    return state.through
@@ -1,7 +1,7 @@
-from ..extensions import db, ma
+from ..extensions import db, ma, hasher
+from ..serializers import serialize
 from .skill import FreelancerSkill
 from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone, timedelta
 
 class User(db.Model):
@@ -23,10 +23,15 @@ class User(db.Model):
         'FreelancerProfile', uselist=False, back_populates='user', cascade='all, delete-orphan')
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        """Verify a password, upgrading the stored hash if its parameters are stale."""
+        if not hasher.verify(self.password_hash, password):
+            return False
+        if hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
     def generate_token(self):
         return create_access_token(identity=self.id)
@@ -50,14 +55,7 @@ class User(db.Model):
         return False
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'role': self.role,
-            'is_verified': self.is_verified,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
-        }
+        return serialize(self)
 
 class ClientProfile(db.Model):
     __tablename__ = 'client_profiles'
@@ -76,17 +74,7 @@ class ClientProfile(db.Model):
     # payments = db.relationship("Payment", backref="client")
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'company_name': self.company_name,
-            'industry': self.industry,
-            'bio': self.bio,
-            'website': self.website,
-            'profile_picture_uri': self.profile_picture_uri,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return serialize(self)
 
 class FreelancerProfile(db.Model):
     __tablename__ = 'freelancer_profiles'
@@ -107,17 +95,7 @@ class FreelancerProfile(db.Model):
     # payments = db.relationship("Payment", backref="freelancer")
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'hourly_rate': float(self.hourly_rate) if self.hourly_rate is not None else None,
-            'bio': self.bio,
-            'experience': self.experience,
-            'portfolio_links': self.portfolio_links,
-            'profile_picture_uri': self.profile_picture_uri,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return serialize(self)
 
 class UserSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -0,0 +1,91 @@
+"""Password hashing on a bounded worker pool.
+
+Werkzeug's password KDFs (scrypt / pbkdf2) are deliberately expensive. Running
+them inline lets a burst of login attempts occupy every request thread, so
+hashing and verification are funnelled through a small thread pool (hashlib
+releases the GIL while deriving keys) with a hard cap on queued work. When the
+pool is saturated callers get a 503 straight away instead of piling up.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherBusy(ServiceUnavailable):
+    """Raised when the hashing pool has no free slot; rendered as a 503."""
+    description = 'Authentication service is busy. Please retry shortly.'
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method):
+    """The parameter prefix werkzeug writes for ``method`` (e.g. 'scrypt:32768:8:1')."""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+class PasswordHasher:
+    """Flask extension wrapping werkzeug hashing with a bounded executor.
+
+    Config:
+        PASSWORD_HASH_METHOD   werkzeug method string (default 'scrypt')
+        PASSWORD_HASH_WORKERS  threads allowed to run the KDF concurrently
+        PASSWORD_HASH_QUEUE    extra requests allowed to wait for a thread
+        PASSWORD_HASH_TIMEOUT  seconds a caller waits for its result
+    """
+
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self.timeout = 10.0
+        self._executor = None
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.timeout = float(app.config.get('PASSWORD_HASH_TIMEOUT', 10.0))
+        workers = int(app.config.get('PASSWORD_HASH_WORKERS', 2))
+        queue = int(app.config.get('PASSWORD_HASH_QUEUE', 16))
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        app.extensions['password_hasher'] = self
+
+    def _run(self, fn, *args):
+        # Outside an initialised app (scripts, shell) just hash inline.
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy(retry_after=1)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the KDF actually finishes: a caller that
+        # times out can't stop a running hash, so releasing on timeout would
+        # let more work in than the pool can take.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise PasswordHasherBusy(retry_after=1)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was produced with different parameters."""
+        if not password_hash:
+            return False
+        return password_hash.split('$', 1)[0] != _method_prefix(self.method)
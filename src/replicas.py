@@ -0,0 +1,166 @@
+"""Read-replica routing with read-your-writes protection.
+
+Replica URLs come from DATABASE_REPLICA_URLS and are registered as the
+``replica_<n>`` binds (see config.py). ``RoutingSession`` sends statements
+that would use the primary engine to a replica when the current request is a
+read:
+
+* GET/HEAD handlers read from a replica by default; ``@use_primary`` opts a
+  handler out (e.g. read-then-write GETs), ``@read_only`` opts a non-GET
+  handler in.
+* Flushes, INSERT/UPDATE/DELETE, ``FOR UPDATE`` and raw ``text()`` statements
+  always go to the primary, and once a request has written every later read in
+  it does too (plain ``text('SELECT ...')`` doesn't count as a write).
+* After a successful write the user is pinned to the primary for
+  DB_PRIMARY_PIN_SECONDS, both in-process (keyed by JWT identity) and with a
+  ``db_pin`` cookie (``SameSite=None; Secure``, since the frontend is on
+  another site) so other workers honour it, so users see their own writes
+  despite replication lag.
+
+Without replicas configured everything goes to the primary, unchanged.
+"""
+import random
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND_PREFIX = 'replica_'
+PIN_COOKIE = 'db_pin'
+READ_METHODS = ('GET', 'HEAD')
+
+_recent_writers = {}
+_recent_writers_lock = threading.Lock()
+
+
+def read_only(fn):
+    """Route this handler's reads to a replica even if it isn't a GET."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g._db_route = 'replica'
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def use_primary(fn):
+    """Keep this handler on the primary, e.g. a GET that updates what it reads.
+
+    Also marks the handler (``writes_on_read``) so /api/batch won't replay it.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g._db_route = 'primary'
+        return fn(*args, **kwargs)
+    wrapper.writes_on_read = True
+    return wrapper
+
+
+def _current_user_id():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _is_pinned(window):
+    now = time.time()
+    try:
+        if float(request.cookies.get(PIN_COOKIE, 0)) > now:
+            return True
+    except ValueError:
+        pass
+    user_id = _current_user_id()
+    if user_id is None:
+        return False
+    with _recent_writers_lock:
+        expires = _recent_writers.get(user_id)
+        if expires is not None and expires <= now:
+            del _recent_writers[user_id]
+            expires = None
+    return expires is not None
+
+
+def _is_write(clause):
+    if isinstance(clause, UpdateBase):
+        return True
+    return getattr(clause, '_for_update_arg', None) is not None
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends request reads to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context():
+            return engine
+        engines = self._db.engines
+        if engine is not engines.get(None):
+            return engine  # model with its own bind_key
+        if self._flushing or _is_write(clause):
+            g._db_wrote = True
+            return engine
+        if isinstance(clause, TextClause):
+            # Raw SQL can't be classified reliably; only plain SELECTs avoid pinning.
+            if not clause.text.lstrip().lower().startswith('select'):
+                g._db_wrote = True
+            return engine
+        replica = _replica_for_request(engines)
+        return replica if replica is not None else engine
+
+
+def _replica_for_request(engines):
+    if g.get('_db_wrote'):
+        return None
+    names = g.get('_db_replicas')
+    if not names:
+        return None
+    route = g.get('_db_route')
+    if route is None:
+        route = 'replica' if request.method in READ_METHODS else 'primary'
+        if route == 'replica' and _is_pinned(g._db_pin_window):
+            route = 'primary'
+        g._db_route = route
+    if route != 'replica':
+        return None
+    if '_db_replica' not in g:
+        g._db_replica = random.choice(names)
+    return engines[g._db_replica]
+
+
+def init_read_replicas(app):
+    names = sorted(k for k in app.config.get('SQLALCHEMY_BINDS') or {} if k.startswith(REPLICA_BIND_PREFIX))
+    if not names:
+        return
+    window = float(app.config.get('DB_PRIMARY_PIN_SECONDS', 5))
+
+    @app.before_request
+    def _start_db_routing():
+        for key in ('_db_route', '_db_replica', '_db_wrote'):
+            g.pop(key, None)  # g can outlive a request (batched sub-requests)
+        g._db_replicas = names
+        g._db_pin_window = window
+
+    @app.after_request
+    def _pin_after_write(response):
+        if not g.get('_db_wrote') or response.status_code >= 400 or window <= 0:
+            return response
+        expires = time.time() + window
+        user_id = _current_user_id()
+        if user_id is not None:
+            with _recent_writers_lock:
+                if len(_recent_writers) > 10000:
+                    now = time.time()
+                    for key in [k for k, v in _recent_writers.items() if v <= now]:
+                        del _recent_writers[key]
+                _recent_writers[user_id] = expires
+        # The frontend calls the API cross-site with credentials, which only
+        # carries SameSite=None cookies (and browsers require Secure for those).
+        response.set_cookie(PIN_COOKIE, f'{expires:.3f}', max_age=int(window) + 1,
+                            httponly=True, secure=True, samesite='None')
+        return response
@@ -0,0 +1,72 @@
+"""Fast JSON output for the flask-restx API.
+
+Registered on ``api`` for ``application/json``. Uses orjson when it is
+installed, which encodes datetime, date, time and UUID natively (Decimal goes
+through ``_default``), and falls back to the standard library encoder with the
+same conversions otherwise. Payloads orjson can't handle (e.g. integers wider
+than 64 bits) are re-encoded with the fallback rather than failing the
+request.
+
+API_JSON_ENCODER selects the encoder: ``orjson`` (default when available) or
+``json``.
+"""
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_json(data, indent=None):
+    """Standard library encoder with the same type handling as orjson."""
+    return (json.dumps(data, default=_default, indent=indent) + '\n').encode()
+
+
+def dumps_orjson(data, indent=None):
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(data, default=_default, option=option)
+    except TypeError as e:
+        logger.debug(f'orjson could not encode response, falling back to json: {e}')
+        return dumps_json(data, indent)
+
+
+ENCODERS = {'json': dumps_json}
+if orjson is not None:
+    ENCODERS['orjson'] = dumps_orjson
+
+
+def dumps(data, indent=None):
+    name = current_app.config.get('API_JSON_ENCODER') or ('orjson' if orjson is not None else 'json')
+    return ENCODERS.get(name, dumps_json)(data, indent)
+
+
+def output_json(data, code, headers=None):
+    """flask-restx representation; mirrors its default output_json."""
+    indent = 4 if current_app.debug else None
+    response = make_response(dumps(data, indent), code)
+    response.headers.extend(headers or {})
+    return response
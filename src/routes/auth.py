@@ -1,10 +1,10 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from ..extensions import db
+from ..extensions import db, hasher
+from ..auth import auth_rate_limited
 from ..models import User, FreelancerProfile, ClientProfile
 from datetime import datetime, timezone
-from werkzeug.security import generate_password_hash, check_password_hash
 from http import HTTPStatus
 # from utils.validators import is_valid_role  # Commented out as utils doesn't exist
 import logging
@@ -43,6 +43,7 @@ token_response_model = auth_ns.model('TokenResponse', {
 class Signup(Resource):
     @auth_ns.expect(signup_model)
     @auth_ns.marshal_with(token_response_model, code=HTTPStatus.CREATED)
+    @auth_rate_limited
     def post(self):
         """Register a new user (freelancer or client)"""
         data = request.get_json()
@@ -62,7 +63,7 @@ class Signup(Resource):
         # Create new user
         user = User(
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hasher.hash(data['password']),
             role=data['role'],
             created_at=datetime.now(timezone.utc)
         )
@@ -111,6 +112,7 @@ class Signup(Resource):
 class Login(Resource):
     @auth_ns.expect(login_model)
     @auth_ns.marshal_with(token_response_model)
+    @auth_rate_limited
     def post(self):
         """Authenticate a user and return JWT tokens"""
         data = request.get_json()
@@ -123,7 +125,7 @@ class Login(Resource):
         logger.info(f"Login attempt for email: {data['email']}")
 
         user = User.query.filter_by(email=data['email']).first()
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user or not user.check_password(data['password']):
             logger.error(f"Invalid credentials for email: {data['email']}")
             return {'success': False, 'message': 'Invalid email or password'}, HTTPStatus.UNAUTHORIZED
 
@@ -150,6 +152,7 @@ class Login(Resource):
 class AdminLogin(Resource):
     @auth_ns.expect(login_model)
     @auth_ns.marshal_with(token_response_model)
+    @auth_rate_limited
     def post(self):
         """Admin-specific login endpoint"""
         data = request.get_json()
@@ -162,7 +165,7 @@ class AdminLogin(Resource):
         logger.info(f"Admin login attempt for email: {data['email']}")
 
         user = User.query.filter_by(email=data['email']).first()
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user or not user.check_password(data['password']):
             logger.error(f"Invalid credentials for email: {data['email']}")
             return {'success': False, 'message': 'Invalid email or password'}, HTTPStatus.UNAUTHORIZED
 
@@ -210,6 +213,7 @@ class RegisterClient(Resource):
         'industry': fields.String(required=False, description='Industry')
     }))
     @auth_ns.marshal_with(token_response_model, code=HTTPStatus.CREATED, description='Returns access and refresh tokens')
+    @auth_rate_limited
     def post(self):
         """Register a new client user with profile"""
         data = request.get_json()
@@ -223,7 +227,7 @@ class RegisterClient(Resource):
         # Create new client user
         user = User(
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hasher.hash(data['password']),
             role='client',
             created_at=datetime.now(timezone.utc)
         )
@@ -268,6 +272,7 @@ class RegisterFreelancer(Resource):
         'skills': fields.List(fields.String, required=False, description='List of skill names')
     }))
     @auth_ns.marshal_with(token_response_model, code=HTTPStatus.CREATED, description='Returns access and refresh tokens')
+    @auth_rate_limited
     def post(self):
         """Register a new freelancer user with profile"""
         data = request.get_json()
@@ -281,7 +286,7 @@ class RegisterFreelancer(Resource):
         # Create new freelancer user
         user = User(
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hasher.hash(data['password']),
             role='freelancer',
             created_at=datetime.now(timezone.utc)
         )
@@ -363,6 +368,7 @@ admin_creation_model = auth_ns.model('AdminCreation', {
 class CreateAdmin(Resource):
     @auth_ns.expect(admin_creation_model)
     @auth_ns.marshal_with(token_response_model, code=HTTPStatus.CREATED)
+    @auth_rate_limited
     def post(self):
         """Create an admin user (requires secret key)"""
         import os
@@ -384,7 +390,7 @@ class CreateAdmin(Resource):
         # Create admin user
         admin = User(
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hasher.hash(data['password']),
             role='admin',
             is_verified=True,
             created_at=datetime.now(timezone.utc)
@@ -0,0 +1,173 @@
+# routes/batch.py
+"""Batch endpoint: several GET sub-requests in one round trip.
+
+Sub-requests are dispatched through the normal request pipeline (hooks,
+auth, error handlers) using the caller's Authorization header. They are split
+across at most BATCH_MAX_WORKERS threads; each thread runs its share inside a
+single app context, so those sub-requests share one database session and the
+identity map (the user looked up by the first handler is reused, not
+re-queried). GETs don't depend on each other, which is what makes running the
+groups concurrently safe. Each worker holds its own DB connection, so keep
+BATCH_MAX_WORKERS well under the pool size.
+
+The batch's own token is verified once and its claims are reused by the
+sub-requests instead of decoding the JWT again for each; ``init_batch``
+sets this up when the app is created. GETs that write
+(handlers marked ``@use_primary``, e.g. email and payment verification) are
+refused, and the shared session is rolled back after a sub-request fails so
+the next one doesn't inherit a broken transaction.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from sqlalchemy import event
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+
+from flask import current_app, g, has_app_context, request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import get_jwt, jwt_required
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+api = Namespace('batch', description='Batch read requests')
+
+sub_request_model = api.model('BatchSubRequest', {
+    'id': fields.String(description='Caller-chosen key echoed back in the response'),
+    'path': fields.String(required=True, description='API path with query string, e.g. /api/projects/?page=1')
+})
+
+batch_model = api.model('BatchRequest', {
+    'requests': fields.List(fields.Nested(sub_request_model), required=True)
+})
+
+
+def writes_on_read(app, path):
+    """True if GET ``path`` is routed to a handler marked ``@use_primary``."""
+    try:
+        endpoint, _ = app.url_map.bind('localhost').match(path.split('?', 1)[0], method='GET')
+    except (HTTPException, RequestRedirect):
+        return False  # answered with a 404/405/redirect, never reaches a handler
+    view = app.view_functions.get(endpoint)
+    handler = getattr(getattr(view, 'view_class', None), 'get', view)
+    return getattr(handler, 'writes_on_read', False)
+
+
+def validate_sub_requests(items, limit, denied=None):
+    """Returns ``(sub_requests, error)``; only GETs under /api/ are allowed,
+    and none for which ``denied(path)`` is true."""
+    if not isinstance(items, list) or not items:
+        return None, 'requests must be a non-empty list'
+    if len(items) > limit:
+        return None, f'At most {limit} sub-requests per batch'
+    sub_requests = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return None, f'requests[{index}].path is required'
+        path = item['path']
+        if item.get('method', 'GET').upper() != 'GET':
+            return None, f'requests[{index}]: only GET sub-requests are supported'
+        if not path.startswith('/api/') or path.split('?', 1)[0].rstrip('/') == '/api/batch':
+            return None, f'requests[{index}].path must be an /api/ path other than /api/batch'
+        if denied is not None and denied(path):
+            return None, f'requests[{index}]: {path} changes data and cannot be batched'
+        sub_requests.append({'id': item.get('id', str(index)), 'path': path})
+    return sub_requests, None
+
+
+def _reuse_verified_token(decode):
+    """Wraps ``JWTManager._decode_jwt_from_config`` so sub-requests get the
+    batch's already verified claims back instead of decoding the token again."""
+    @wraps(decode)
+    def wrapper(encoded_token, csrf_value=None, allow_expired=False):
+        verified = g.get('_batch_jwt') if has_app_context() else None
+        if verified is not None and verified[0] == encoded_token and csrf_value is None and not allow_expired:
+            return verified[1]
+        return decode(encoded_token, csrf_value, allow_expired)
+    wrapper.reuses_batch_token = True
+    return wrapper
+
+
+def init_batch(app):
+    """Lets batch sub-requests reuse the batch's verified token; call after
+    ``JWTManager.init_app``.
+
+    flask-jwt-extended has no public hook that skips decoding, so this wraps
+    the manager's decode method once, here rather than per request. Should a
+    library upgrade drop that method, batches still work and each sub-request
+    simply decodes the token again.
+    """
+    manager = app.extensions['flask-jwt-extended']
+    decode = getattr(manager, '_decode_jwt_from_config', None)
+    if decode is None:
+        logger.warning("JWTManager._decode_jwt_from_config is gone; batch sub-requests will decode their token")
+    elif not getattr(decode, 'reuses_batch_token', False):
+        manager._decode_jwt_from_config = _reuse_verified_token(decode)
+
+
+def _run_group(app, group, headers, base_url, verified_token):
+    results = []
+    # The identity map only holds weak references; keep loaded objects alive
+    # so later sub-requests in the group find them instead of re-querying.
+    loaded = []
+    keep_alive = lambda session, instance: loaded.append(instance)
+    with app.app_context():
+        g._batch_jwt = verified_token  # sub-request contexts share this app context's g
+        session = db.session()
+        event.listen(session, 'loaded_as_persistent', keep_alive)
+        for index, sub in group:
+            path, _, query = sub['path'].partition('?')
+            try:
+                with app.test_request_context(path, query_string=query, method='GET',
+                                              headers=headers, base_url=base_url):
+                    response = app.full_dispatch_request()
+                    body = response.get_json(silent=True)
+                    if body is None:
+                        body = response.get_data(as_text=True)
+                    results.append((index, {'id': sub['id'], 'path': sub['path'],
+                                            'status': response.status_code, 'body': body}))
+                    failed = response.status_code >= 400
+            except Exception as e:
+                logger.exception(f"Batch sub-request {sub['path']} failed")
+                results.append((index, {'id': sub['id'], 'path': sub['path'],
+                                        'status': 500, 'body': {'success': False, 'message': str(e)}}))
+                failed = True
+            if failed:
+                session.rollback()
+        event.remove(session, 'loaded_as_persistent', keep_alive)
+    return results
+
+
+@api.route('')
+class Batch(Resource):
+    @api.doc(security='Bearer Auth')
+    @api.expect(batch_model)
+    @api.response(200, 'Combined responses, in request order')
+    @api.response(400, 'Invalid batch')
+    @jwt_required()
+    def post(self):
+        """Run several GET requests and return their responses together"""
+        data = request.get_json(silent=True) or {}
+        limit = current_app.config.get('BATCH_MAX_REQUESTS', 10)
+        app = current_app._get_current_object()
+        sub_requests, error = validate_sub_requests(data.get('requests'), limit,
+                                                    denied=lambda path: writes_on_read(app, path))
+        if error:
+            return {'success': False, 'message': error}, 400
+
+        authorization = request.headers.get('Authorization', '')
+        verified_token = (authorization.partition(' ')[2], get_jwt())
+        headers = {'Authorization': authorization, 'Accept': 'application/json'}
+        workers = max(1, min(current_app.config.get('BATCH_MAX_WORKERS', 4), len(sub_requests)))
+        groups = [list(enumerate(sub_requests))[i::workers] for i in range(workers)]
+
+        # Even a single group runs on a worker thread so sub-requests get their own app context and g.
+        with ThreadPoolExecutor(workers) as pool:
+            futures = [pool.submit(_run_group, app, group, headers, request.host_url, verified_token)
+                       for group in groups]
+            results = [item for future in futures for item in future.result()]
+
+        responses = [result for _, result in sorted(results, key=lambda item: item[0])]
+        return {'success': True, 'data': responses}, 200
@@ -0,0 +1,136 @@
+# routes/dashboard.py
+"""Client dashboard: the overview counters in a handful of aggregate queries.
+
+Everything is computed in the database and scoped to the caller's
+client_profile.id, so the number of queries and the size of the response stay
+the same however many projects, invoices or payments the client has built up:
+
+* project counts per status (one GROUP BY),
+* milestones awaiting approval, unpaid invoices, pending applications and
+  payment totals (one row of FILTER aggregates, one single-row subquery per table),
+* the most recent payments (LIMIT DASHBOARD_RECENT_PAYMENTS).
+
+The (client_id/project_id, status) indexes from the
+``add_dashboard_indexes`` migration keep each aggregate on an index range
+scan.
+"""
+import logging
+
+from sqlalchemy import func, select, true
+
+from flask import current_app
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..extensions import db
+from ..instrumentation import query_budget
+from ..models import ClientProfile, Invoice, Milestone, Payment, Project, ProjectApplication, User
+
+logger = logging.getLogger(__name__)
+
+api = Namespace('client/dashboard', description='Client dashboard summary')
+
+PAYMENT_RECEIVED_STATUSES = ('completed', 'successful', 'processed')
+
+
+def _money(value):
+    return float(value or 0)
+
+
+def project_counts(client_id):
+    rows = db.session.execute(
+        select(Project.status, func.count())
+        .where(Project.client_id == client_id)
+        .group_by(Project.status)
+    ).all()
+    by_status = {status: count for status, count in rows}
+    return {'total': sum(by_status.values()), 'by_status': by_status}
+
+
+def pending_counters(client_id):
+    """Milestone, invoice, application and payment aggregates in one round trip."""
+    client_projects = select(Project.id).where(Project.client_id == client_id)
+    awaiting = Milestone.status == 'submitted'
+    unpaid = Invoice.status != 'paid'
+    received = Payment.status.in_(PAYMENT_RECEIVED_STATUSES)
+
+    milestones = select(
+        func.count().filter(awaiting), func.sum(Milestone.amount).filter(awaiting)
+    ).where(Milestone.project_id.in_(client_projects)).subquery()
+    invoices = select(
+        func.count().filter(unpaid), func.sum(Invoice.amount).filter(unpaid)
+    ).join(Milestone, Invoice.milestone_id == Milestone.id).where(
+        Milestone.project_id.in_(client_projects)
+    ).subquery()
+    applications = select(
+        func.count(), func.count(ProjectApplication.project_id.distinct())
+    ).where(
+        ProjectApplication.project_id.in_(client_projects), ProjectApplication.status == 'pending'
+    ).subquery()
+    payments = select(
+        func.count().filter(received), func.sum(Payment.amount).filter(received)
+    ).where(Payment.client_id == client_id).subquery()
+
+    # Each subquery yields exactly one row, so joining them on TRUE is a 1x1x1x1 product.
+    row = db.session.execute(
+        select(*milestones.c, *invoices.c, *applications.c, *payments.c).select_from(
+            milestones.join(invoices, true()).join(applications, true()).join(payments, true())
+        )
+    ).one()
+    return {
+        'milestones_awaiting_approval': {'count': row[0], 'amount': _money(row[1])},
+        'unpaid_invoices': {'count': row[2], 'amount': _money(row[3])},
+        'pending_applications': {'count': row[4], 'projects': row[5]},
+        'payments': {'count': row[6], 'total_paid': _money(row[7])},
+    }
+
+
+def recent_payments(client_id, limit):
+    rows = db.session.execute(
+        select(Payment.id, Payment.invoice_id, Payment.amount, Payment.status, Payment.paid_at)
+        .where(Payment.client_id == client_id)
+        .order_by(Payment.paid_at.desc(), Payment.id.desc())
+        .limit(limit)
+    ).all()
+    return [{
+        'id': r.id,
+        'invoice_id': r.invoice_id,
+        'amount': _money(r.amount),
+        'status': r.status,
+        'paid_at': r.paid_at.isoformat() if r.paid_at else None
+    } for r in rows]
+
+
+def client_dashboard(client_id, recent_limit=5):
+    summary = {'projects': project_counts(client_id)}
+    summary.update(pending_counters(client_id))
+    summary['recent_payments'] = recent_payments(client_id, recent_limit)
+    return summary
+
+
+@api.route('')
+class ClientDashboard(Resource):
+    @api.doc(security='Bearer Auth')
+    @api.response(200, 'Success')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Only clients can view the dashboard')
+    @api.response(404, 'Client profile not found')
+    @jwt_required()
+    @query_budget(4)
+    def get(self):
+        """Summary counters for the current client's projects, milestones, invoices and payments"""
+        user = db.session.execute(
+            select(User.role, ClientProfile.id.label('client_id'))
+            .outerjoin(ClientProfile, ClientProfile.user_id == User.id)
+            .where(User.id == int(get_jwt_identity()))
+        ).first()
+        if not user:
+            return {'success': False, 'message': 'User not found'}, 404
+        if user.role != 'client':
+            return {'success': False, 'message': 'Only clients can view the dashboard'}, 403
+        if user.client_id is None:
+            return {'success': False, 'message': 'Client profile not found'}, 404
+        client_id = user.client_id
+
+        limit = current_app.config.get('DASHBOARD_RECENT_PAYMENTS', 5)
+        logger.info(f"Client {client_id} loaded dashboard")
+        return {'success': True, 'data': client_dashboard(client_id, limit)}, 200
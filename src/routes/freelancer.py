@@ -4,7 +4,7 @@ from flask_restx import Namespace, Resource, reqparse, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from ..extensions import db
 from ..models.user import FreelancerProfile, User
-from ..models.project_application import ProjectApplication
+from ..models.project_application import ProjectApplication, apply_to_project
 from ..models.project import Project
 from http import HTTPStatus
 import logging
@@ -165,33 +165,26 @@ class ApplyToProject(Resource):
     def post(self, project_id):
         """Apply to a project"""
         freelancer = request.user
-        data = request.get_json()
+        data = request.get_json() or {}
 
-        # Check if project exists and is available
-        project = Project.query.filter_by(id=project_id, status='posted').first()
-        if not project:
+        # One statement: insert if the project is open and not already applied to
+        status, application_id = apply_to_project(
+            project_id, freelancer.id, proposal=data.get('proposal'), bid_amount=data.get('bid_amount')
+        )
+        if status != 'posted':
+            db.session.rollback()
             return {'message': 'Project not found or not available'}, HTTPStatus.NOT_FOUND
-
-        # Check if already applied
-        existing_app = ProjectApplication.query.filter_by(
-            project_id=project_id, freelancer_id=freelancer.id
-        ).first()
-        if existing_app:
+        if application_id is None:
+            db.session.rollback()
             return {'message': 'Already applied to this project'}, HTTPStatus.BAD_REQUEST
-
-        # Create application
-        application = ProjectApplication(
-            project_id=project_id,
-            freelancer_id=freelancer.id,
-            proposal=data.get('proposal'),
-            bid_amount=data.get('bid_amount'),
-            status='pending'
-        )
-
-        db.session.add(application)
         db.session.commit()
         logger.info(f"Freelancer {freelancer.id} applied to project {project_id}")
-        return {'message': 'Application submitted successfully', 'application_id': application.id}, HTTPStatus.CREATED
+        return {'message': 'Application submitted successfully', 'application_id': application_id}, HTTPStatus.CREATED
 
 def register_routes(api_ns):
+    # Not mounted: create_app passes a fresh namespace and this module's routes
+    # live on ``ns``, which is never added to the API. require_role also expects
+    # email identities and a ``role`` claim that routes/auth.py tokens don't
+    # carry, so ApplyToProject (and the rest of this module) is unreachable
+    # until it is ported to the current tokens.
     pass
\ No newline at end of file
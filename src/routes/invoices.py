@@ -1,8 +1,12 @@
-from flask import request
+from concurrent.futures import TimeoutError as FutureTimeout
+from flask import request, current_app, make_response
 from flask_restx import Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from ..extensions import db
+from ..extensions import db, renderer
+from ..instrumentation import query_budget
+from ..invoice_documents import CONTENT_TYPES, document_hash, pdf_available
 from ..models import Invoice, Application, TimeEntry, FreelancerProfile
+from ..models.invoice_document import cached_invoice_document, invoice_document_inputs, store_invoice_document
 from datetime import datetime, timezone
 from http import HTTPStatus
 import logging
@@ -102,4 +106,62 @@ def register_routes(ns):
                 'hourly_rate': float(profile.hourly_rate),
                 'amount': amount
             }, HTTPStatus.OK
-        
\ No newline at end of file
+        
+
+    @ns.route('/invoices/<int:invoice_id>/document')
+    class InvoiceDocumentDownload(Resource):
+        @ns.doc(security='Bearer Auth', params={'format': 'html (default) or pdf'})
+        @ns.response(200, 'The document')
+        @ns.response(202, 'Rendering; retry after Retry-After seconds')
+        @ns.response(304, 'Unchanged since the ETag sent in If-None-Match')
+        @ns.response(503, 'Render pool busy')
+        @jwt_required()
+        @query_budget(2)
+        def get(self, invoice_id):
+            """Download an invoice as HTML or PDF, rendered off the request thread and cached by content hash"""
+            fmt = request.args.get('format', 'html')
+            if fmt not in CONTENT_TYPES:
+                return {'success': False, 'message': 'format must be html or pdf'}, HTTPStatus.BAD_REQUEST
+            if fmt == 'pdf' and not pdf_available():
+                return {'success': False, 'message': 'PDF rendering is not available'}, HTTPStatus.NOT_IMPLEMENTED
+
+            found = invoice_document_inputs(invoice_id)
+            if found is None:
+                return {'success': False, 'message': 'Invoice not found'}, HTTPStatus.NOT_FOUND
+            inputs, client_user_id, freelancer_user_id = found
+            user_id = int(get_jwt_identity())
+            if get_jwt().get('role') != 'admin' and user_id not in (client_user_id, freelancer_user_id):
+                return {'success': False, 'message': 'Not your invoice'}, HTTPStatus.FORBIDDEN
+
+            content_hash = document_hash(inputs, fmt)
+            if content_hash in request.if_none_match:
+                return document_response(b'', fmt, content_hash, invoice_id, HTTPStatus.NOT_MODIFIED)
+            body = cached_invoice_document(invoice_id, fmt, content_hash)
+            if body is not None:
+                return document_response(body, fmt, content_hash, invoice_id)
+
+            app = current_app._get_current_object()
+
+            def store(rendered):
+                with app.app_context():
+                    store_invoice_document(invoice_id, fmt, content_hash, rendered)
+
+            future = renderer.submit(content_hash, inputs, fmt, on_done=store)
+            try:
+                body = future.result(timeout=current_app.config.get('INVOICE_RENDER_WAIT_SECONDS', 5))
+            except FutureTimeout:
+                logger.info(f"Invoice {invoice_id} {fmt} still rendering")
+                response = make_response({'success': True, 'message': 'Rendering; retry shortly'}, HTTPStatus.ACCEPTED)
+                response.headers['Retry-After'] = '1'
+                return response
+            logger.info(f"Rendered invoice {invoice_id} as {fmt}")
+            return document_response(body, fmt, content_hash, invoice_id)
+
+
+def document_response(body, fmt, content_hash, invoice_id, status=HTTPStatus.OK):
+    response = make_response(body, status)
+    response.headers['Content-Type'] = CONTENT_TYPES[fmt]
+    response.headers['Content-Disposition'] = f'inline; filename=invoice-{invoice_id}.{fmt}'
+    response.set_etag(content_hash)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -3,7 +3,9 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
-from models import Milestone, Project, User
+from ..models import ClientProfile, FreelancerProfile, Milestone, Project, User
+from ..models.milestone_progress import apply_milestone_change
+from ..transitions import transition
 from datetime import datetime
 
 # Create namespace
@@ -37,6 +39,22 @@ milestone_update_model = api.model('MilestoneUpdate', {
 })
 
 
+def is_project_client(project, user):
+    return project is not None and user is not None and user.client_profile is not None \
+        and project.client_id == user.client_profile.id
+
+
+def can_view_project(project, user):
+    if is_project_client(project, user):
+        return True
+    return project is not None and user is not None and user.freelancer_profile is not None \
+        and project.freelancer_id == user.freelancer_profile.id
+
+
+def get_current_user():
+    return db.session.get(User, int(get_jwt_identity()))
+
+
 @api.route('/')
 class MilestoneList(Resource):
     @api.doc(security='Bearer Auth')
@@ -45,10 +63,10 @@ class MilestoneList(Resource):
     def get(self):
         """Get all milestones for current user's projects"""
         try:
-            current_user_id = get_jwt_identity()
+            user_id = int(get_jwt_identity())
 
             # Get current user with role information
-            current_user = User.query.get(current_user_id)
+            current_user = db.session.get(User, user_id)
             if not current_user:
                 return {
                     'success': False,
@@ -58,35 +76,19 @@ class MilestoneList(Resource):
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
 
-            # Get projects based on user role
+            # Scope by joining through the user's profile instead of
+            # materialising their project ids first
+            query = Milestone.query.join(Project, Milestone.project_id == Project.id)
             if current_user.role == 'client':
-                user_projects = Project.query.filter_by(
-                    client_id=current_user_id)
+                query = query.join(ClientProfile, Project.client_id == ClientProfile.id)\
+                    .filter(ClientProfile.user_id == user_id)
             elif current_user.role == 'freelancer':
-                user_projects = Project.query.filter_by(
-                    freelancer_id=current_user_id)
-            else:  # admin or other roles
-                user_projects = Project.query
-
-            project_ids = [project.id for project in user_projects.all()]
+                query = query.join(FreelancerProfile, Project.freelancer_id == FreelancerProfile.id)\
+                    .filter(FreelancerProfile.user_id == user_id)
+            # admin or other roles see every milestone
 
-            if not project_ids:
-                return {
-                    'success': True,
-                    'data': [],
-                    'pagination': {
-                        'page': 1,
-                        'per_page': per_page,
-                        'total': 0,
-                        'pages': 0
-                    }
-                }
-
-            # Get milestones for these projects
-            milestones = Milestone.query.filter(
-                Milestone.project_id.in_(project_ids)
-            ).order_by(Milestone.due_date.asc())\
-             .paginate(page=page, per_page=per_page, error_out=False)
+            milestones = query.order_by(Milestone.due_date.asc(), Milestone.id.asc())\
+                .paginate(page=page, per_page=per_page, error_out=False)
 
             return {
                 'success': True,
@@ -114,11 +116,9 @@ class MilestoneList(Resource):
     def post(self):
         """Create a new milestone for a project (Client only)"""
         try:
-            current_user_id = get_jwt_identity()
-
             # Check if user is a client
-            current_user = User.query.get(current_user_id)
-            if not current_user or current_user.role != 'client':
+            user = get_current_user()
+            if not user or user.role != 'client':
                 return {
                     'success': False,
                     'message': 'Only clients can create milestones'
@@ -139,14 +139,14 @@ class MilestoneList(Resource):
             project_id = data['project_id']
 
             # Verify project exists and user owns it
-            project = Project.query.get(project_id)
+            project = db.session.get(Project, project_id)
             if not project:
                 return {
                     'success': False,
                     'message': 'Project not found'
                 }, 404
 
-            if project.client_id != current_user_id:
+            if not is_project_client(project, user):
                 return {
                     'success': False,
                     'message': 'Not authorized to create milestones for this project'
@@ -173,6 +173,7 @@ class MilestoneList(Resource):
             )
 
             db.session.add(milestone)
+            apply_milestone_change(project_id, after=(milestone.status, milestone.amount))
             db.session.commit()
 
             return {
@@ -201,12 +202,10 @@ class ProjectMilestones(Resource):
     def get(self, project_id):
         """Get all milestones for a project"""
         try:
-            current_user_id = get_jwt_identity()
-
             # Verify project exists and user has access
             project = Project.query.get_or_404(project_id)
 
-            if project.client_id != current_user_id and project.freelancer_id != current_user_id:
+            if not can_view_project(project, get_current_user()):
                 return {
                     'success': False,
                     'message': 'Not authorized to view milestones for this project'
@@ -246,18 +245,17 @@ class MilestoneResource(Resource):
     def get(self, milestone_id):
         """Get a specific milestone"""
         try:
-            current_user_id = get_jwt_identity()
             milestone = Milestone.query.get_or_404(milestone_id)
 
             # Verify user has access to the project
-            project = Project.query.get(milestone.project_id)
+            project = db.session.get(Project, milestone.project_id)
             if not project:
                 return {
                     'success': False,
                     'message': 'Project not found'
                 }, 404
 
-            if project.client_id != current_user_id and project.freelancer_id != current_user_id:
+            if not can_view_project(project, get_current_user()):
                 return {
                     'success': False,
                     'message': 'Not authorized to view this milestone'
@@ -282,18 +280,18 @@ class MilestoneResource(Resource):
     def put(self, milestone_id):
         """Update a milestone"""
         try:
-            current_user_id = get_jwt_identity()
             milestone = Milestone.query.get_or_404(milestone_id)
 
             # Verify user owns the project
-            project = Project.query.get(milestone.project_id)
-            if project.client_id != current_user_id:
+            project = db.session.get(Project, milestone.project_id)
+            if not is_project_client(project, get_current_user()):
                 return {
                     'success': False,
                     'message': 'Not authorized to update this milestone'
                 }, 403
 
             data = request.get_json()
+            before = (milestone.status, milestone.amount)
 
             # Update fields if provided
             if 'title' in data:
@@ -314,6 +312,7 @@ class MilestoneResource(Resource):
             if 'status' in data:
                 milestone.status = data['status']
 
+            apply_milestone_change(milestone.project_id, before, (milestone.status, milestone.amount))
             db.session.commit()
 
             return {
@@ -336,18 +335,18 @@ class MilestoneResource(Resource):
     def delete(self, milestone_id):
         """Delete a milestone"""
         try:
-            current_user_id = get_jwt_identity()
             milestone = Milestone.query.get_or_404(milestone_id)
 
             # Verify user owns the project
-            project = Project.query.get(milestone.project_id)
-            if project.client_id != current_user_id:
+            project = db.session.get(Project, milestone.project_id)
+            if not is_project_client(project, get_current_user()):
                 return {
                     'success': False,
                     'message': 'Not authorized to delete this milestone'
                 }, 403
 
             db.session.delete(milestone)
+            apply_milestone_change(milestone.project_id, before=(milestone.status, milestone.amount))
             db.session.commit()
 
             return {
@@ -369,16 +368,16 @@ class ApproveMilestone(Resource):
     @api.response(200, 'Milestone approved successfully')
     @api.response(400, 'Cannot approve milestone')
     @api.response(403, 'Forbidden')
+    @api.response(409, 'Milestone changed concurrently')
     @jwt_required()
     def put(self, milestone_id):
         """Approve a milestone (client action)"""
         try:
-            current_user_id = get_jwt_identity()
             milestone = Milestone.query.get_or_404(milestone_id)
 
             # Verify user owns the project
-            project = Project.query.get(milestone.project_id)
-            if project.client_id != current_user_id:
+            project = db.session.get(Project, milestone.project_id)
+            if not is_project_client(project, get_current_user()):
                 return {
                     'success': False,
                     'message': 'Not authorized to approve this milestone'
@@ -391,7 +390,15 @@ class ApproveMilestone(Resource):
                     'message': 'Can only approve submitted milestones'
                 }, 400
 
-            milestone.status = 'approved'
+            # Conditional UPDATE: of several concurrent approve/reject requests only one matches
+            version = (request.get_json(silent=True) or {}).get('version')
+            if transition(Milestone, milestone_id, 'submitted', 'approved', version=version) is None:
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'message': 'Milestone was changed by another request'
+                }, 409
+            apply_milestone_change(milestone.project_id, ('submitted', milestone.amount), ('approved', milestone.amount))
             db.session.commit()
 
             return {
@@ -417,17 +424,17 @@ class RejectMilestone(Resource):
     @api.response(200, 'Milestone rejected successfully')
     @api.response(400, 'Cannot reject milestone')
     @api.response(403, 'Forbidden')
+    @api.response(409, 'Milestone changed concurrently')
     @jwt_required()
     def put(self, milestone_id):
         """Reject a milestone with feedback"""
         try:
-            current_user_id = get_jwt_identity()
             data = request.get_json()
             milestone = Milestone.query.get_or_404(milestone_id)
 
             # Verify user owns the project
-            project = Project.query.get(milestone.project_id)
-            if project.client_id != current_user_id:
+            project = db.session.get(Project, milestone.project_id)
+            if not is_project_client(project, get_current_user()):
                 return {
                     'success': False,
                     'message': 'Not authorized to reject this milestone'
@@ -446,8 +453,14 @@ class RejectMilestone(Resource):
                     'message': 'Can only reject submitted milestones'
                 }, 400
 
-            milestone.status = 'rejected'
             # You might want to store feedback in a separate field or model
+            if transition(Milestone, milestone_id, 'submitted', 'rejected', version=data.get('version')) is None:
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'message': 'Milestone was changed by another request'
+                }, 409
+            apply_milestone_change(milestone.project_id, ('submitted', milestone.amount), ('rejected', milestone.amount))
             db.session.commit()
 
             return {
@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
 from models import Payment, ClientProfile, Invoice
 from ..extensions import db
+from ..replicas import use_primary
 from http import HTTPStatus
 import logging
 
@@ -114,6 +115,7 @@ class PaymentInitiate(Resource):
 @ns.route('/verify/<string:tx_ref>')
 class PaymentVerify(Resource):
     @require_role('client')
+    @use_primary
     def get(self, tx_ref):
         """Verify a payment by transaction reference"""
         client = request.user
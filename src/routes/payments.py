@@ -5,6 +5,9 @@ from ..extensions import db
 from ..models.user import ClientProfile, FreelancerProfile, User
 from ..models.invoice import Invoice
 from ..models.payment import Payment
+from ..jobs import enqueue, job_handler
+from ..metrics import track_external_call
+from ..replicas import use_primary
 from http import HTTPStatus
 import logging
 import requests
@@ -106,7 +109,8 @@ class InitiatePayment(Resource):
             }
         }
         try:
-            response = requests.post(FLUTTERWAVE_API_URL, json=payload, headers=headers)
+            with track_external_call('flutterwave', 'initiate'):
+                response = requests.post(FLUTTERWAVE_API_URL, json=payload, headers=headers)
             response.raise_for_status()
             data = response.json()
             if data['status'] != 'success':
@@ -134,32 +138,54 @@ class InitiatePayment(Resource):
             'payment_url': data['data']['link']
         }, HTTPStatus.OK
 
-@ns.route('/verify/<string:tx_ref>')
+@job_handler('verify_payment')
+def verify_payment(tx_ref):
+    """Background job: confirm a payment with Flutterwave and record its status.
+
+    Gateway errors raise so the job is retried with backoff.
+    """
+    headers = {
+        'Authorization': f'Bearer {FLUTTERWAVE_SECRET_KEY}',
+        'Content-Type': 'application/json'
+    }
+    with track_external_call('flutterwave', 'verify'):
+        response = requests.get(f'https://api.flutterwave.com/v3/transactions/{tx_ref}/verify',
+                                headers=headers, timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    if data['status'] != 'success':
+        logger.error(f"Flutterwave verification failed: {data}")
+        return
+    payment = Payment.query.filter_by(transaction_id=tx_ref).first()
+    if not payment:
+        logger.error(f"Payment not found for tx_ref {tx_ref}")
+        return
+    payment.status = data['data']['status']
+    payment.paid_at = datetime.now(timezone.utc)
+    logger.info(f"Payment {payment.id} verified for tx_ref {tx_ref}")
+
 class VerifyPayment(Resource):
+    @jwt_required()
+    @use_primary
     def get(self, tx_ref):
-        headers = {
-            'Authorization': f'Bearer {FLUTTERWAVE_SECRET_KEY}',
-            'Content-Type': 'application/json'
-        }
-        try:
-            response = requests.get(f'https://api.flutterwave.com/v3/transactions/{tx_ref}/verify', headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if data['status'] != 'success':
-                logger.error(f"Flutterwave verification failed: {data}")
-                return {'message': 'Payment verification failed'}, HTTPStatus.BAD_REQUEST
-            payment = Payment.query.filter_by(transaction_id=tx_ref).first()
-            if not payment:
-                logger.error(f"Payment not found for tx_ref {tx_ref}")
-                return {'message': 'Payment not found'}, HTTPStatus.NOT_FOUND
-            payment.status = data['data']['status']
-            payment.paid_at = datetime.now(timezone.utc)
-            db.session.commit()
-            logger.info(f"Payment {payment.id} verified for tx_ref {tx_ref}")
+        # Only the paying client may poll a payment; anyone else gets a 404
+        payment = (Payment.query
+                   .join(ClientProfile, ClientProfile.id == Payment.client_id)
+                   .filter(Payment.transaction_id == tx_ref, ClientProfile.user_id == int(get_jwt_identity()))
+                   .first())
+        if not payment:
+            logger.error(f"Payment not found for tx_ref {tx_ref}")
+            return {'message': 'Payment not found'}, HTTPStatus.NOT_FOUND
+        if payment.status != 'pending':
             return {'message': 'Payment verified', 'status': payment.status}, HTTPStatus.OK
-        except requests.RequestException as e:
-            logger.error(f"Flutterwave verification failed: {e}")
-            return {'message': 'Verification error'}, HTTPStatus.INTERNAL_SERVER_ERROR
+        # Checked with the gateway by a job worker; repeat polls share one queued job
+        enqueue('verify_payment', {'tx_ref': tx_ref}, lane='high', key=tx_ref)
+        db.session.commit()
+        return {'message': 'Payment verification in progress', 'status': payment.status}, HTTPStatus.ACCEPTED
 
 def register_routes(ns):
-    pass
\ No newline at end of file
+    # Only VerifyPayment is mounted. ClientPayments and InitiatePayment stay on
+    # this module's own ``ns``, which is never added to the API: require_role
+    # expects email identities and a ``role`` claim that routes/auth.py tokens
+    # don't carry.
+    ns.add_resource(VerifyPayment, '/verify/<string:tx_ref>')
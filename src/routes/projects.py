@@ -2,8 +2,12 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, select
+from sqlalchemy.orm import load_only
 from ..extensions import db
-from ..models import Project, ProjectApplication, User
+from ..models import FreelancerProfile, Project, ProjectApplication, Review, User
+from ..models.project import project_serializer
+from ..transitions import transition
 
 # Create namespace
 projects_ns = Namespace('projects', description='Project operations')
@@ -28,20 +32,44 @@ project_create_model = api.model('ProjectCreate', {
     'budget': fields.Float(required=True, description='Project budget')
 })
 
+# ?include= names accepted for the nested project details
+PROJECT_INCLUDES = {'client': 'client_details', 'freelancer': 'freelancer_details', 'progress': 'milestone_progress'}
+
 hire_model = api.model('HireFreelancer', {
-    'freelancer_id': fields.Integer(required=True, description='Freelancer ID to hire')
+    'freelancer_id': fields.Integer(required=True, description='Freelancer ID to hire'),
+    'version': fields.Integer(description='Project version last seen; the hire fails with 409 if it changed')
 })
 
+# Project statuses a freelancer can still be hired from
+HIREABLE_STATUSES = ('draft', 'posted', 'open')
+
 
 @api.route('/')
 class ProjectList(Resource):
-    @api.doc(security='Bearer Auth')
+    @api.doc(security='Bearer Auth', params={
+        'fields': 'Comma-separated project columns to return, e.g. id,title,budget',
+        'include': 'Comma-separated relationships to expand: client, freelancer, progress'
+    })
     @api.response(200, 'Success')
+    @api.response(400, 'Unknown field or include')
     @api.response(401, 'Unauthorized')
     @jwt_required()
     def get(self):
         """Get projects based on user role"""
         try:
+            fields_arg = request.args.get('fields')
+            include_arg = request.args.get('include')
+            try:
+                fields, include = project_serializer.parse_fieldset(fields_arg, include_arg, PROJECT_INCLUDES)
+            except ValueError as e:
+                return {
+                    'success': False,
+                    'message': str(e)
+                }, 400
+            if fields_arg is None and include_arg is None:
+                # No sparse fieldset requested: keep the full default shape
+                include = tuple(PROJECT_INCLUDES.values())
+
             current_user_id = get_jwt_identity()
 
             # Get current user with role
@@ -74,12 +102,13 @@ class ProjectList(Resource):
             else:  # admin or other roles
                 query = Project.query
 
-            projects = query.order_by(Project.created_at.desc())\
+            projects = query.options(*project_serializer.query_options(fields, include))\
+                .order_by(Project.created_at.desc())\
                 .paginate(page=page, per_page=per_page, error_out=False)
 
             return {
                 'success': True,
-                'data': [project.to_dict() for project in projects.items],
+                'data': project_serializer.dump_many(projects.items, include, fields),
                 'pagination': {
                     'page': projects.page,
                     'per_page': projects.per_page,
@@ -252,14 +281,41 @@ class ProjectResource(Resource):
             }, 400
 
 
+# ?sort= keys for project applications; rating is the freelancer's average review score
+APPLICATION_SORTS = ('applied_at', 'bid', 'rating')
+PROPOSAL_PREVIEW_LENGTH = 200
+
+
+def freelancer_ratings(project_id):
+    """Average review rating per freelancer who applied to ``project_id``.
+
+    Reviews hang off projects; a freelancer's rating is the average of the
+    reviews left by others on projects they were hired for.
+    """
+    applicants = select(ProjectApplication.freelancer_id).where(ProjectApplication.project_id == project_id)
+    return select(Project.freelancer_id.label('freelancer_id'), func.avg(Review.rating).label('rating'))\
+        .join(Review, Review.project_id == Project.id)\
+        .join(FreelancerProfile, FreelancerProfile.id == Project.freelancer_id)\
+        .where(Project.freelancer_id.in_(applicants), Review.reviewer_id != FreelancerProfile.user_id)\
+        .group_by(Project.freelancer_id)\
+        .subquery()
+
+
 @api.route('/<int:project_id>/applications')
 class ProjectApplications(Resource):
-    @api.doc(security='Bearer Auth')
+    @api.doc(security='Bearer Auth', params={
+        'page': 'Page number',
+        'per_page': 'Items per page (max 100)',
+        'sort': 'applied_at (default), bid or rating',
+        'order': 'asc or desc (default)',
+        'include': 'proposal: return the full proposal text instead of a preview'
+    })
     @api.response(200, 'Success')
+    @api.response(400, 'Unknown sort or order')
     @api.response(403, 'Forbidden')
     @jwt_required()
     def get(self, project_id):
-        """Get all applications for a project"""
+        """Get a page of applications for a project"""
         try:
             current_user_id = get_jwt_identity()
             current_user = User.query.get(int(current_user_id))
@@ -283,25 +339,66 @@ class ProjectApplications(Resource):
                 }, 403
             # Admin can view any project applications
 
-            applications = ProjectApplication.query.filter_by(project_id=project_id)\
-                .join(User, ProjectApplication.freelancer_id == User.id)\
-                .add_entity(User)\
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+            sort = request.args.get('sort', 'applied_at')
+            order = request.args.get('order', 'desc')
+            full_proposal = 'proposal' in request.args.get('include', '').split(',')
+            if sort not in APPLICATION_SORTS or order not in ('asc', 'desc'):
+                return {
+                    'success': False,
+                    'message': f"sort must be one of {', '.join(APPLICATION_SORTS)} and order asc or desc"
+                }, 400
+
+            ratings = freelancer_ratings(project_id)
+            # The proposal text is only loaded in full on request; list views get a preview
+            columns = [ProjectApplication.id, ProjectApplication.freelancer_id, ProjectApplication.bid_amount,
+                       ProjectApplication.status, ProjectApplication.applied_at]
+            if full_proposal:
+                columns.append(ProjectApplication.proposal)
+            preview = func.substr(ProjectApplication.proposal, 1, PROPOSAL_PREVIEW_LENGTH).label('proposal_preview')
+            sort_column = {
+                'applied_at': ProjectApplication.applied_at,
+                'bid': ProjectApplication.bid_amount,
+                'rating': ratings.c.rating,
+            }[sort]
+            sort_column = sort_column.asc() if order == 'asc' else sort_column.desc()
+
+            applications = db.session.query(
+                ProjectApplication, FreelancerProfile.user_id, FreelancerProfile.hourly_rate,
+                User.email, ratings.c.rating, preview
+            ).options(load_only(*columns))\
+                .join(FreelancerProfile, ProjectApplication.freelancer_id == FreelancerProfile.id)\
+                .join(User, FreelancerProfile.user_id == User.id)\
+                .outerjoin(ratings, ratings.c.freelancer_id == ProjectApplication.freelancer_id)\
+                .filter(ProjectApplication.project_id == project_id)\
+                .order_by(sort_column.nulls_last(), ProjectApplication.id)\
+                .limit(per_page).offset((page - 1) * per_page)\
                 .all()
+            total = project.applications_count
 
             return {
                 'success': True,
                 'data': [{
-                    'application_id': app[0].id,
+                    'application_id': application.id,
                     'freelancer': {
-                        'id': app[1].id,
-                        'name': f"{app[1].first_name} {app[1].last_name}",
-                        'email': app[1].email
+                        'id': application.freelancer_id,
+                        'user_id': user_id,
+                        'email': email,
+                        'hourly_rate': float(hourly_rate) if hourly_rate is not None else None,
+                        'rating': round(float(rating), 2) if rating is not None else None
                     },
-                    'proposal': app[0].proposal,
-                    'bid_amount': float(app[0].bid_amount) if app[0].bid_amount else None,
-                    'status': app[0].status,
-                    'applied_at': app[0].created_at.isoformat() if app[0].created_at else None
-                } for app in applications]
+                    'proposal': application.proposal if full_proposal else proposal_preview,
+                    'bid_amount': float(application.bid_amount) if application.bid_amount is not None else None,
+                    'status': application.status,
+                    'applied_at': application.applied_at.isoformat() if application.applied_at else None
+                } for application, user_id, hourly_rate, email, rating, proposal_preview in applications],
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total,
+                    'pages': (total + per_page - 1) // per_page
+                }
             }
 
         except Exception as e:
@@ -318,6 +415,7 @@ class ProjectHire(Resource):
     @api.response(200, 'Freelancer hired successfully')
     @api.response(400, 'Validation error')
     @api.response(403, 'Forbidden')
+    @api.response(409, 'Project already hired or changed concurrently')
     @jwt_required()
     def post(self, project_id):
         """Hire a freelancer for a project (Client only)"""
@@ -354,11 +452,18 @@ class ProjectHire(Resource):
                     'message': 'Freelancer has not applied to this project'
                 }, 400
 
-            # Update project with hired freelancer
-            project.freelancer_id = freelancer_id
-            project.status = 'active'
+            # Conditional UPDATE: of several concurrent hires only one matches
+            hired = transition(Project, project_id, HIREABLE_STATUSES, 'active',
+                               values={'freelancer_id': freelancer_id},
+                               where=(Project.freelancer_id.is_(None),), version=data.get('version'))
+            if hired is None:
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'message': 'Project already has a freelancer or was changed by another request'
+                }, 409
 
-            # Update application status
+            # Only the winning request gets here
             application.status = 'hired'
 
             db.session.commit()
@@ -1,10 +1,20 @@
-from flask import request
+from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from ..extensions import db, api
-from ..auth import admin_required, create_token
+from ..auth import admin_required, create_token, auth_rate_limited
 from ..utils import paginate_query
-from datetime import datetime
-from sqlalchemy import func
+from ..instrumentation import query_budget
+from ..slow_queries import slow_query_log
+from ..replicas import use_primary
+from ..serializers import serialize
+from ..transitions import transition, version_bump
+from ..models.milestone_progress import refresh_milestone_progress
+from ..models.invoice import generate_milestone_invoices
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import func, and_, delete, update, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 
 # Import all models and their schemas cleanly from the models package
 from ..models import (
@@ -35,9 +45,31 @@ admin_user_model = admin_ns.model('AdminUser', {
     'role': fields.String(required=True, enum=['client', 'freelancer', 'admin'])
 })
 dispute_resolution_model = admin_ns.model('DisputeResolution', {
+    'resolution': fields.String(required=True),
+    'version': fields.Integer(description='Dispute version last seen; resolving fails with 409 if it changed')
+})
+bulk_selector_model = admin_ns.model('BulkSelector', {
+    'ids': fields.List(fields.Integer, description='Explicit ids to act on'),
+    'filter': fields.Raw(description='Column equality filter, e.g. {"status": ["open", "pending"]}')
+})
+bulk_status_model = admin_ns.inherit('BulkStatus', bulk_selector_model, {
+    'status': fields.String(required=True)
+})
+bulk_resolution_model = admin_ns.inherit('BulkDisputeResolution', bulk_selector_model, {
     'resolution': fields.String(required=True)
 })
 
+# Upper bound on explicit ids per bulk request so one call can't pin the DB.
+BULK_MAX_IDS = 5000
+
+# Statuses bulk-status may set, per model; other models get no bulk-status
+# endpoint. Disputes go through bulk-resolve, which also records the
+# resolution and resolved_at.
+BULK_STATUSES = {
+    Project: ('draft', 'posted', 'open', 'active', 'completed'),
+    Milestone: ('pending', 'submitted', 'approved', 'rejected'),
+}
+
 
 def init_routes():
     """Initializes core API routes by adding namespaces to the API object.
@@ -52,8 +84,9 @@ def init_routes():
 @auth_ns.route('/signup')
 class Signup(Resource):
     @auth_ns.expect(signup_model, validate=True)
+    @auth_rate_limited
     def post(self):
-        from utils import send_verification_email
+        from ..jobs import enqueue
         from flask import request, current_app
         import logging
 
@@ -79,18 +112,15 @@ class Signup(Resource):
             new_user = User(email=data['email'], role=data['role'])
             new_user.set_password(data['password'])
             db.session.add(new_user)
+            db.session.flush()
+
+            # Mailed by a job worker; queued in the same commit as the user
+            enqueue('send_verification_email',
+                    {'user_id': new_user.id, 'base_url': request.host_url.rstrip('/')}, lane='high')
             db.session.commit()
 
             current_app.logger.info(f"New user registered: {new_user.email} (ID: {new_user.id})")
-
-            # Send verification email
-            base_url = request.host_url.rstrip('/')
-            if send_verification_email(new_user, base_url):
-                current_app.logger.info(f"Verification email sent to: {new_user.email}")
-                return {'message': 'Registration successful. Please check your email to verify your account.'}, 201
-            else:
-                current_app.logger.error(f"Failed to send verification email to: {new_user.email}")
-                return {'message': 'Registration successful, but failed to send verification email. Please contact support.'}, 201
+            return {'message': 'Registration successful. Please check your email to verify your account.'}, 201
 
         except Exception as e:
             db.session.rollback()
@@ -99,6 +129,7 @@ class Signup(Resource):
 
 @auth_ns.route('/verify-email')
 class VerifyEmail(Resource):
+    @use_primary
     def get(self):
         from flask import current_app
         import logging
@@ -137,6 +168,7 @@ class VerifyEmail(Resource):
 @auth_ns.route('/login')
 class Login(Resource):
     @auth_ns.expect(login_model, validate=True)
+    @auth_rate_limited
     def post(self):
         from flask import current_app
         import logging
@@ -178,51 +210,221 @@ class Login(Resource):
 
 # Corrected Admin CRUD Route Generation 
 
-# A dictionary mapping API endpoints to their respective Model and Schema
+# A dictionary mapping API endpoints to their respective Model
 MODELS_CRUD = {
-    'users': (User, UserSchema),
-    'disputes': (Dispute, DisputeSchema),
-    'projects': (Project, ProjectSchema),
-    'milestones': (Milestone, MilestoneSchema),
-    'client_profiles': (ClientProfile, ClientProfileSchema),
-    'freelancer_profiles': (FreelancerProfile, FreelancerProfileSchema),
-    'policies': (Policy, PolicySchema),
+    'users': User,
+    'disputes': Dispute,
+    'projects': Project,
+    'milestones': Milestone,
+    'client_profiles': ClientProfile,
+    'freelancer_profiles': FreelancerProfile,
+    'policies': Policy,
     # Add other models here for automatic GET/DELETE endpoint creation
 }
 
-# This factory function creates the resource classes with the correct model and schema,
+# Denormalized rollups rebuilt after admin deletes/bulk changes, which bypass the
+# handlers that normally maintain them: model -> (grouping column, refresh function)
+ROLLUPS = {
+    Milestone: (Milestone.project_id, refresh_milestone_progress),
+}
+
+# This factory function creates the resource classes with the correct model,
 # solving the late binding closure problem.
-def create_admin_resource(model_cls, schema_cls):
+def create_admin_resource(model_cls):
     class AdminList(Resource):
         @admin_required
         def get(self):
             """Lists all items for a given model."""
             pagination = model_cls.query.paginate(page=request.args.get('page', 1, type=int), per_page=10, error_out=False)
-            return paginate_query(pagination, schema_cls(many=True))
+            return paginate_query(pagination, model_cls)
 
     class AdminResource(Resource):
         @admin_required
         def get(self, id):
             """Gets a single item by ID."""
             instance = model_cls.query.get_or_404(id)
-            return schema_cls().dump(instance)
+            return serialize(instance)
 
         @admin_required
         def delete(self, id):
             """Deletes an item by ID."""
             instance = model_cls.query.get_or_404(id)
             db.session.delete(instance)
+            if model_cls in ROLLUPS:
+                column, refresh = ROLLUPS[model_cls]
+                db.session.flush()
+                refresh([getattr(instance, column.key)])
             db.session.commit()
             return {'message': f'Item deleted successfully.'}, 200
 
     return AdminList, AdminResource
 
 
+# --- Bulk (set-based) admin operations ---
+
+def parse_bulk_selector(model_cls, data):
+    """
+    Builds a WHERE clause from a bulk request body.
+
+    Accepts either ``ids`` (a list of primary keys, sent as a single array
+    parameter so the statement is ``id = ANY(:ids)``) or ``filter`` (a dict of
+    column -> value or list of values). Returns ``(clause, ids, error)``;
+    ``ids`` is None for filter-based requests.
+    """
+    data = data or {}
+    ids = data.get('ids')
+    filters = data.get('filter')
+
+    if ids is not None:
+        if not isinstance(ids, list) or not all(_is_int(i) for i in ids):
+            return None, None, 'ids must be a list of integers'
+        if not ids:
+            return None, None, 'ids must not be empty'
+        if len(ids) > BULK_MAX_IDS:
+            return None, None, f'At most {BULK_MAX_IDS} ids per request'
+        ids = list(dict.fromkeys(ids))
+        clause = model_cls.id == any_(bindparam('ids', ids, type_=ARRAY(db.Integer)))
+        return clause, ids, None
+
+    if not isinstance(filters, dict) or not filters:
+        return None, None, 'Provide either ids or a non-empty filter'
+
+    columns = model_cls.__table__.c
+    clauses = []
+    for name, value in filters.items():
+        if name not in columns:
+            return None, None, f'Unknown filter column: {name}'
+        column = columns[name]
+        try:
+            if isinstance(value, list):
+                clauses.append(column.in_([filter_value(column, v) for v in value]))
+            elif value is None:
+                clauses.append(column.is_(None))
+            else:
+                clauses.append(column == filter_value(column, value))
+        except ValueError:
+            return None, None, f'Invalid value for filter column {name}'
+    return and_(*clauses), None, None
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def filter_value(column, value):
+    """``value`` converted to ``column``'s Python type; raises ValueError when
+    it doesn't fit (so a bad filter is a 400 rather than a database error)."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is bool:
+        if isinstance(value, bool):
+            return value
+    elif python_type is int:
+        if _is_int(value):
+            return value
+    elif python_type in (float, Decimal):
+        if _is_int(value) or isinstance(value, (float, str)):
+            try:
+                return python_type(value)
+            except (ArithmeticError, ValueError):
+                pass
+    elif python_type in (datetime, date):
+        if isinstance(value, str):
+            return python_type.fromisoformat(value)
+    elif python_type is str:
+        if isinstance(value, str):
+            return value
+    else:
+        return value
+    raise ValueError(f'{value!r} is not a valid {python_type.__name__}')
+
+
+def bulk_results(ids, affected_ids, done_label, missing_label='not_found'):
+    """Per-item result list for an id-based bulk request."""
+    if ids is None:
+        return [{'id': i, 'status': done_label} for i in affected_ids]
+    affected = set(affected_ids)
+    return [{'id': i, 'status': done_label if i in affected else missing_label} for i in ids]
+
+
+def create_admin_bulk_resources(model_cls):
+    """
+    Creates set-based bulk resources for a model. Each request runs exactly
+    one DELETE/UPDATE ... RETURNING statement instead of loading and
+    mutating instances one by one.
+
+    Note: bulk deletes bypass ORM-level cascades; rows still referenced by
+    other tables are reported as a conflict and nothing is deleted. Models
+    listed in ROLLUPS also rebuild the rollups of the affected groups (two
+    more statements).
+    """
+    rollup = ROLLUPS.get(model_cls)
+    statuses = BULK_STATUSES.get(model_cls)
+    returning = (model_cls.id, rollup[0]) if rollup else (model_cls.id,)
+    budget = 3 if rollup else 1
+
+    def refresh_rollup(rows):
+        if rollup:
+            rollup[1]({row[1] for row in rows})
+        return [row[0] for row in rows]
+
+    class AdminBulkDelete(Resource):
+        @admin_ns.expect(bulk_selector_model)
+        @admin_required
+        @query_budget(budget)
+        def post(self):
+            """Deletes every item matching the given ids or filter."""
+            clause, ids, error = parse_bulk_selector(model_cls, request.get_json(silent=True))
+            if error:
+                return {'message': error}, 400
+            stmt = delete(model_cls).where(clause).returning(*returning)
+            try:
+                deleted = refresh_rollup(db.session.execute(stmt, execution_options={'synchronize_session': False}).all())
+                db.session.commit()
+            except IntegrityError as e:
+                db.session.rollback()
+                return {'message': 'Some items are still referenced by other records; nothing was deleted.',
+                        'detail': str(e.orig)}, 409
+            return {
+                'deleted': len(deleted),
+                'results': bulk_results(ids, deleted, 'deleted')
+            }, 200
+
+    class AdminBulkStatus(Resource):
+        @admin_ns.expect(bulk_status_model)
+        @admin_required
+        @query_budget(budget)
+        def put(self):
+            """Sets the status of every item matching the given ids or filter."""
+            data = request.get_json(silent=True) or {}
+            if data.get('status') not in statuses:
+                return {'message': f"status must be one of: {', '.join(statuses)}"}, 400
+            clause, ids, error = parse_bulk_selector(model_cls, data)
+            if error:
+                return {'message': error}, 400
+            stmt = update(model_cls).where(clause).values(status=data['status'], **version_bump(model_cls)).returning(*returning)
+            updated = refresh_rollup(db.session.execute(stmt, execution_options={'synchronize_session': False}).all())
+            db.session.commit()
+            return {
+                'updated': len(updated),
+                'results': bulk_results(ids, updated, 'updated')
+            }, 200
+
+    resources = {'bulk-delete': AdminBulkDelete}
+    if statuses:
+        resources['bulk-status'] = AdminBulkStatus
+    return resources
+
+
 # This loop now correctly assigns the generated resource classes to each endpoint
-for endpoint, (model_class, schema_class) in MODELS_CRUD.items():
-    ListResource, DetailResource = create_admin_resource(model_class, schema_class)
+for endpoint, model_class in MODELS_CRUD.items():
+    ListResource, DetailResource = create_admin_resource(model_class)
     admin_ns.add_resource(ListResource, f'/{endpoint}', endpoint=f'{endpoint}_list')
     admin_ns.add_resource(DetailResource, f'/{endpoint}/<int:id>', endpoint=f'{endpoint}_detail')
+    for action, BulkResource in create_admin_bulk_resources(model_class).items():
+        admin_ns.add_resource(BulkResource, f'/{endpoint}/{action}', endpoint=f'{endpoint}_{action}')
 
 
 # --- Specific Routes with Custom Logic (like POST for users) ---
@@ -242,7 +444,7 @@ class UserActions(Resource):
         new_user.set_password(data['password'])
         db.session.add(new_user)
         db.session.commit()
-        return UserSchema().dump(new_user), 201
+        return serialize(new_user), 201
 
 
 @admin_ns.route('/disputes/<int:dispute_id>/resolve')
@@ -251,18 +453,67 @@ class AdminDisputeResolve(Resource):
     @admin_required
     def put(self, dispute_id):
         """Resolves a dispute."""
-        dispute = Dispute.query.get_or_404(dispute_id)
+        Dispute.query.get_or_404(dispute_id)
         data = request.json
-        dispute.resolution = data.get('resolution')
-        dispute.status = 'resolved'
-        dispute.resolved_at = datetime.utcnow()
+        # Conditional UPDATE: a dispute is resolved exactly once, even under concurrent requests
+        dispute = transition(Dispute, dispute_id, None, 'resolved', values={
+            'resolution': data.get('resolution'),
+            'resolved_at': datetime.utcnow()
+        }, where=(Dispute.status != 'resolved',), version=data.get('version'))
+        if dispute is None:
+            db.session.rollback()
+            return {'message': 'Dispute is already resolved or was changed by another request'}, 409
+        db.session.commit()
+        return serialize(dispute)
+
+
+@admin_ns.route('/disputes/bulk-resolve')
+class AdminDisputeBulkResolve(Resource):
+    @admin_ns.expect(bulk_resolution_model)
+    @admin_required
+    @query_budget(1)
+    def put(self):
+        """Resolves many disputes in a single UPDATE ... RETURNING statement."""
+        data = request.get_json(silent=True) or {}
+        if not data.get('resolution'):
+            return {'message': 'resolution is required'}, 400
+        clause, ids, error = parse_bulk_selector(Dispute, data)
+        if error:
+            return {'message': error}, 400
+        stmt = update(Dispute).where(clause, Dispute.status != 'resolved').values(
+            resolution=data['resolution'],
+            status='resolved',
+            resolved_at=datetime.utcnow(),
+            **version_bump(Dispute)
+        ).returning(Dispute.id)
+        resolved = db.session.execute(stmt, execution_options={'synchronize_session': False}).scalars().all()
+        db.session.commit()
+        return {
+            'resolved': len(resolved),
+            # Ids that were not updated either don't exist or were already resolved
+            'results': bulk_results(ids, resolved, 'resolved', missing_label='skipped')
+        }, 200
+
+
+@admin_ns.route('/invoices/generate')
+class AdminInvoiceGenerate(Resource):
+    @admin_required
+    @query_budget(1)
+    def post(self):
+        """Invoices every approved, un-invoiced milestone in one INSERT ... SELECT statement."""
+        data = request.get_json(silent=True) or {}
+        due_days = data.get('due_days', current_app.config.get('INVOICE_DUE_DAYS', 14))
+        if not isinstance(due_days, int) or due_days < 0:
+            return {'message': 'due_days must be a non-negative integer'}, 400
+        created = generate_milestone_invoices(due_days)
         db.session.commit()
-        return DisputeSchema().dump(dispute)
+        return {'created': created}, 200
 
 
 @admin_ns.route('/analytics')
 class AdminAnalytics(Resource):
     @admin_required
+    @query_budget(3)
     def get(self):
         """Gets key analytics data."""
         total_users = db.session.query(func.count(User.id)).scalar()
@@ -272,4 +523,24 @@ class AdminAnalytics(Resource):
             'total_users': total_users,
             'ongoing_projects': ongoing_projects,
             'revenue': float(revenue)
-        }
\ No newline at end of file
+        }
+
+
+@admin_ns.route('/slow-queries')
+class AdminSlowQueries(Resource):
+    @admin_required
+    def get(self):
+        """Lists recorded slow queries (this worker only), slowest first."""
+        entries = slow_query_log.entries()
+        return {
+            'enabled': bool(current_app.config.get('SLOW_QUERY_LOG')),
+            'threshold_ms': current_app.config.get('SLOW_QUERY_THRESHOLD_MS'),
+            'count': len(entries),
+            'data': entries
+        }, 200
+
+    @admin_required
+    def delete(self):
+        """Clears the slow-query log."""
+        slow_query_log.clear()
+        return {'message': 'Slow-query log cleared'}, 200
@@ -0,0 +1,354 @@
+# routes/time_logs.py
+"""Time entries: a start/stop timer and bulk ingestion for desktop trackers.
+
+* ``POST /timer/start`` opens a TimeLog with no ``end_time``. The partial
+  unique index ``uq_time_logs_running_timer`` (freelancer_id WHERE end_time
+  IS NULL) allows one running timer per freelancer, so the insert is ``ON
+  CONFLICT DO NOTHING`` and a second start gets 409 even when two arrive at
+  once.
+* ``POST /timer/stop`` closes it with ``UPDATE ... WHERE end_time IS NULL
+  RETURNING``. A timer left running longer than TIME_LOG_MAX_ENTRY_HOURS is
+  closed at that length, so no closed entry is longer than the limit (the
+  bulk overlap check relies on it).
+* ``POST /bulk`` takes up to TIME_LOG_BULK_MAX_ENTRIES closed entries,
+  validates them all (project assignment and overlaps in one query each)
+  and inserts the valid ones with a single executemany. Invalid rows are
+  reported by index and don't block the rest. Uploads for one freelancer
+  are serialised on a ``FOR UPDATE`` lock of their profile row, so two
+  concurrent batches can't both pass the overlap check and insert the same
+  time; entries ending in the future are rejected.
+"""
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..extensions import db
+from ..instrumentation import query_budget
+from ..models import FreelancerProfile, Project, TimeLog, User
+from ..models.timesheet import refresh_timesheet_days
+
+logger = logging.getLogger(__name__)
+
+api = Namespace('time-entries', description='Time tracking')
+
+time_entry_model = api.model('TimeEntry', {
+    'project_id': fields.Integer(required=True, description='Project ID'),
+    'start_time': fields.DateTime(required=True, description='Start (ISO 8601, UTC unless an offset is given)'),
+    'end_time': fields.DateTime(required=True, description='End (ISO 8601)'),
+    'description': fields.String(description='Work description'),
+})
+
+bulk_model = api.model('TimeEntryBulk', {
+    'entries': fields.List(fields.Nested(time_entry_model), required=True, description='Entries to record'),
+})
+
+timer_start_model = api.model('TimerStart', {
+    'project_id': fields.Integer(required=True, description='Project ID'),
+    'description': fields.String(description='Work description'),
+})
+
+timer_stop_model = api.model('TimerStop', {
+    'description': fields.String(description='Replaces the description given at start'),
+})
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def parse_timestamp(value):
+    """ISO 8601 string to a naive UTC datetime; raises ValueError."""
+    if not isinstance(value, str):
+        raise ValueError('must be an ISO 8601 string')
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def entry_dict(log):
+    return {
+        'id': log.id,
+        'project_id': log.project_id,
+        'start_time': log.start_time.isoformat() if log.start_time else None,
+        'end_time': log.end_time.isoformat() if log.end_time else None,
+        'duration_seconds': int((log.end_time - log.start_time).total_seconds())
+        if log.start_time and log.end_time else None,
+        'description': log.description,
+    }
+
+
+def current_freelancer_id():
+    """``(freelancer_profile_id, None)`` or ``(None, error_response)``."""
+    user = db.session.execute(
+        select(User.role, FreelancerProfile.id.label('freelancer_id'))
+        .outerjoin(FreelancerProfile, FreelancerProfile.user_id == User.id)
+        .where(User.id == int(get_jwt_identity()))
+    ).first()
+    if not user:
+        return None, ({'success': False, 'message': 'User not found'}, 404)
+    if user.role != 'freelancer':
+        return None, ({'success': False, 'message': 'Only freelancers can track time'}, 403)
+    if user.freelancer_id is None:
+        return None, ({'success': False, 'message': 'Freelancer profile not found'}, 404)
+    return user.freelancer_id, None
+
+
+def assigned_projects(freelancer_id, project_ids):
+    return set(db.session.scalars(
+        select(Project.id).where(Project.id.in_(project_ids), Project.freelancer_id == freelancer_id)
+    ))
+
+
+def lock_freelancer(freelancer_id):
+    """Locks the freelancer's profile row until the transaction ends."""
+    return db.session.execute(
+        select(FreelancerProfile.id).where(FreelancerProfile.id == freelancer_id).with_for_update()
+    ).scalar()
+
+
+def start_timer(freelancer_id, project_id, description=None):
+    """Opens a timer; returns the new row, or None if one is already running."""
+    table = TimeLog.__table__
+    insert_ = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[db.engine.dialect.name]
+    now = _now()
+    stmt = insert_(table).values(
+        project_id=project_id, freelancer_id=freelancer_id, start_time=now, description=description, created_at=now
+    ).on_conflict_do_nothing(
+        index_elements=['freelancer_id'], index_where=table.c.end_time.is_(None)
+    ).returning(*table.c)
+    return db.session.execute(stmt).first()
+
+
+def validate_entries(freelancer_id, entries, max_duration):
+    """Splits ``entries`` into insertable rows and ``{'index', 'message'}`` errors.
+
+    Entries must be on projects the freelancer is assigned to, have ended,
+    last at most ``max_duration`` and not overlap each other or time already
+    logged (including a running timer), so a tracker resending a batch
+    doesn't double-count it. Callers hold ``lock_freelancer`` so no other
+    batch inserts in between.
+    """
+    errors, candidates = [], []
+    now = _now()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append({'index': index, 'message': 'Entry must be an object'})
+            continue
+        project_id = entry.get('project_id')
+        if not isinstance(project_id, int) or isinstance(project_id, bool):
+            errors.append({'index': index, 'message': 'project_id must be an integer'})
+            continue
+        try:
+            start = parse_timestamp(entry.get('start_time'))
+            end = parse_timestamp(entry.get('end_time'))
+        except ValueError:
+            errors.append({'index': index, 'message': 'start_time and end_time must be ISO 8601 timestamps'})
+            continue
+        if end <= start:
+            errors.append({'index': index, 'message': 'end_time must be after start_time'})
+            continue
+        if end > now:
+            errors.append({'index': index, 'message': 'Entry ends in the future'})
+            continue
+        if end - start > max_duration:
+            errors.append({'index': index, 'message': f'Entry is longer than {max_duration}'})
+            continue
+        description = entry.get('description')
+        if description is not None and not isinstance(description, str):
+            errors.append({'index': index, 'message': 'description must be a string'})
+            continue
+        candidates.append((index, project_id, start, end, description))
+
+    if not candidates:
+        return [], errors
+
+    assigned = assigned_projects(freelancer_id, {c[1] for c in candidates})
+    first_start = min(c[2] for c in candidates)
+    last_end = max(c[3] for c in candidates)
+    # Existing entries that could overlap the batch; bounded on start_time so
+    # the (freelancer_id, start_time) index serves it
+    booked = sorted((start, end or now) for start, end in db.session.execute(
+        select(TimeLog.start_time, TimeLog.end_time).where(
+            TimeLog.freelancer_id == freelancer_id,
+            TimeLog.start_time < last_end,
+            or_(TimeLog.start_time > first_start - max_duration, TimeLog.end_time.is_(None)),
+            or_(TimeLog.end_time > first_start, TimeLog.end_time.is_(None)),
+        )
+    ))
+    # An entry overlaps logged time iff some entry starting before its end
+    # finishes after its start: compare against the running max of end times
+    booked_starts, latest_end = [b[0] for b in booked], []
+    for _, b_end in booked:
+        latest_end.append(max(b_end, latest_end[-1]) if latest_end else b_end)
+
+    rows, accepted = [], []
+    created_at = now
+    for index, project_id, start, end, description in sorted(candidates, key=lambda c: c[2]):
+        before_end = bisect_left(booked_starts, end)
+        if project_id not in assigned:
+            errors.append({'index': index, 'message': 'Project not found or not assigned to you'})
+        elif before_end and latest_end[before_end - 1] > start:
+            errors.append({'index': index, 'message': 'Overlaps time already logged'})
+        elif accepted and start < accepted[-1][1]:
+            # Accepted rows are sorted by start, so only the last one can overlap
+            errors.append({'index': index, 'message': f'Overlaps entry {accepted[-1][2]}'})
+        else:
+            accepted.append((start, end, index))
+            rows.append({'project_id': project_id, 'freelancer_id': freelancer_id, 'start_time': start,
+                         'end_time': end, 'description': description, 'created_at': created_at})
+    errors.sort(key=lambda e: e['index'])
+    return rows, errors
+
+
+@api.route('')
+class TimeEntryList(Resource):
+    @api.doc(security='Bearer Auth', params={
+        'page': 'Page number', 'per_page': 'Entries per page (max 100)', 'project_id': 'Only this project'})
+    @api.response(200, 'Success')
+    @jwt_required()
+    def get(self):
+        """List the current freelancer's time entries, newest first"""
+        freelancer_id, error = current_freelancer_id()
+        if error:
+            return error
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        query = select(TimeLog).where(TimeLog.freelancer_id == freelancer_id)
+        project_id = request.args.get('project_id', type=int)
+        if project_id is not None:
+            query = query.where(TimeLog.project_id == project_id)
+        logs = db.session.scalars(
+            query.order_by(TimeLog.start_time.desc(), TimeLog.id.desc())
+            .offset((page - 1) * per_page).limit(per_page)
+        ).all()
+        return {'success': True, 'data': [entry_dict(log) for log in logs],
+                'page': page, 'per_page': per_page}, 200
+
+
+@api.route('/timer')
+class Timer(Resource):
+    @api.doc(security='Bearer Auth')
+    @api.response(200, 'Success')
+    @jwt_required()
+    def get(self):
+        """The current freelancer's running timer, or null"""
+        freelancer_id, error = current_freelancer_id()
+        if error:
+            return error
+        log = db.session.scalars(
+            select(TimeLog).where(TimeLog.freelancer_id == freelancer_id, TimeLog.end_time.is_(None))
+        ).first()
+        return {'success': True, 'data': entry_dict(log) if log else None}, 200
+
+
+@api.route('/timer/start')
+class TimerStart(Resource):
+    @api.doc(security='Bearer Auth')
+    @api.expect(timer_start_model)
+    @api.response(201, 'Timer started')
+    @api.response(404, 'Project not found or not assigned to you')
+    @api.response(409, 'A timer is already running')
+    @jwt_required()
+    @query_budget(3)
+    def post(self):
+        """Start a timer on an assigned project"""
+        freelancer_id, error = current_freelancer_id()
+        if error:
+            return error
+        data = request.get_json() or {}
+        project_id = data.get('project_id')
+        if not isinstance(project_id, int) or not assigned_projects(freelancer_id, [project_id]):
+            return {'success': False, 'message': 'Project not found or not assigned to you'}, 404
+
+        log = start_timer(freelancer_id, project_id, data.get('description'))
+        if log is None:
+            db.session.rollback()
+            return {'success': False, 'message': 'A timer is already running; stop it first'}, 409
+        db.session.commit()
+        logger.info(f"Freelancer {freelancer_id} started a timer on project {project_id}")
+        return {'success': True, 'data': entry_dict(log)}, 201
+
+
+@api.route('/timer/stop')
+class TimerStop(Resource):
+    @api.doc(security='Bearer Auth')
+    @api.expect(timer_stop_model)
+    @api.response(200, 'Timer stopped')
+    @api.response(404, 'No timer is running')
+    @jwt_required()
+    @query_budget(6)
+    def post(self):
+        """Stop the running timer"""
+        freelancer_id, error = current_freelancer_id()
+        if error:
+            return error
+        data = request.get_json(silent=True) or {}
+        running = db.session.execute(
+            select(TimeLog.id, TimeLog.start_time)
+            .where(TimeLog.freelancer_id == freelancer_id, TimeLog.end_time.is_(None))
+        ).first()
+        if running is None:
+            return {'success': False, 'message': 'No timer is running'}, 404
+        max_duration = timedelta(hours=current_app.config.get('TIME_LOG_MAX_ENTRY_HOURS', 24))
+        values = {'end_time': min(_now(), running.start_time + max_duration)}
+        if 'description' in data:
+            values['description'] = data['description']
+        log = db.session.execute(
+            update(TimeLog).where(TimeLog.id == running.id, TimeLog.end_time.is_(None))
+            .values(**values).returning(TimeLog),
+            execution_options={'synchronize_session': False, 'populate_existing': True}
+        ).scalar_one_or_none()
+        if log is None:
+            db.session.rollback()
+            return {'success': False, 'message': 'No timer is running'}, 404
+        data = entry_dict(log)
+        refresh_timesheet_days(freelancer_id, log.start_time, log.end_time)
+        db.session.commit()
+        logger.info(f"Freelancer {freelancer_id} stopped timer {log.id}")
+        return {'success': True, 'data': data}, 200
+
+
+@api.route('/bulk')
+class TimeEntryBulk(Resource):
+    @api.doc(security='Bearer Auth')
+    @api.expect(bulk_model)
+    @api.response(201, 'Entries recorded; invalid rows are listed in errors')
+    @api.response(400, 'No valid entries')
+    @api.response(413, 'Too many entries')
+    @jwt_required()
+    @query_budget(8)
+    def post(self):
+        """Record many closed time entries in one request"""
+        freelancer_id, error = current_freelancer_id()
+        if error:
+            return error
+        data = request.get_json(silent=True) or {}
+        entries = data.get('entries')
+        if not isinstance(entries, list) or not entries:
+            return {'success': False, 'message': 'entries must be a non-empty list'}, 400
+        limit = current_app.config.get('TIME_LOG_BULK_MAX_ENTRIES', 5000)
+        if len(entries) > limit:
+            return {'success': False, 'message': f'At most {limit} entries per request'}, 413
+
+        max_duration = timedelta(hours=current_app.config.get('TIME_LOG_MAX_ENTRY_HOURS', 24))
+        # The overlap check reads then inserts; hold the lock across both
+        lock_freelancer(freelancer_id)
+        rows, errors = validate_entries(freelancer_id, entries, max_duration)
+        if not rows:
+            db.session.rollback()
+            return {'success': False, 'message': 'No valid entries', 'inserted': 0, 'errors': errors}, 400
+
+        # A list of parameter sets runs as one executemany
+        db.session.execute(insert(TimeLog.__table__), rows)
+        # Backfilled entries may land in weeks the timesheet rollup already covers
+        refresh_timesheet_days(freelancer_id, min(r['start_time'] for r in rows), max(r['end_time'] for r in rows))
+        db.session.commit()
+        logger.info(f"Freelancer {freelancer_id} recorded {len(rows)} time entries ({len(errors)} rejected)")
+        return {'success': True, 'inserted': len(rows), 'errors': errors}, 201
@@ -0,0 +1,169 @@
+# routes/timesheets.py
+"""Timesheets: seconds logged per project per day or week, bucketed in SQL.
+
+One query returns the whole report however long the range is:
+
+* ``generate_series`` over the range produces every bucket, so days or
+  weeks with no time logged come back as empty buckets rather than gaps;
+* finished weeks come from the ``timesheet_days`` rollup (see
+  models/timesheet.py), which ``flask timesheets rollup`` extends weekly;
+* days after the rollup watermark are computed from ``time_logs``, with
+  entries crossing midnight split per day by a lateral ``generate_series``
+  and running timers counted up to now;
+* ``date_trunc`` maps each day onto its bucket.
+
+Freelancers see their own time; clients see time on their projects.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from flask import current_app, request
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import DateTime, Interval, case, cast, func, literal, literal_column, or_, select, union_all
+
+from ..extensions import db
+from ..instrumentation import query_budget
+from ..models import ClientProfile, FreelancerProfile, Project, TimeLog, TimesheetDay, TimesheetRollup, User
+from ..models.timesheet import split_by_day, week_start
+
+api = Namespace('timesheets', description='Time logged per project per day or week')
+
+STEPS = {'day': timedelta(days=1), 'week': timedelta(weeks=1)}
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def report_range(args, today):
+    """``(granularity, lo, hi)`` from the query string, or raises ValueError.
+
+    ``from``/``to`` are inclusive dates (default: the current week); week
+    reports widen them to whole Monday-to-Sunday weeks.
+    """
+    granularity = args.get('granularity', 'day')
+    if granularity not in STEPS:
+        raise ValueError('granularity must be day or week')
+    try:
+        first = date.fromisoformat(args['from']) if args.get('from') else week_start(today).date()
+        last = date.fromisoformat(args['to']) if args.get('to') else first + timedelta(days=6)
+    except ValueError:
+        raise ValueError('from and to must be dates (YYYY-MM-DD)')
+    if last < first:
+        raise ValueError('to must not be before from')
+    lo = datetime(first.year, first.month, first.day)
+    hi = datetime(last.year, last.month, last.day) + timedelta(days=1)
+    if granularity == 'week':
+        lo, hi = week_start(lo), week_start(hi - timedelta(days=1)) + STEPS['week']
+    return granularity, lo, hi
+
+
+def timesheet_query(log_scope, day_scope, granularity, lo, hi, now):
+    """Rows of ``(bucket, project_id, seconds)``, every bucket in ``[lo, hi)`` at
+    least once (with a NULL project when nothing was logged).
+
+    ``log_scope``/``day_scope`` are conditions on TimeLog/TimesheetDay. Days
+    before the rollup watermark are read from ``timesheet_days``; the rest,
+    and running timers, from ``time_logs``.
+    """
+    step = literal(STEPS[granularity], Interval)
+    through = select(TimesheetRollup.through).where(TimesheetRollup.id == 1).scalar_subquery()
+    # [lo, split) is served by the rollup, [split, hi) live
+    split = func.greatest(lo, func.least(hi, func.coalesce(through, lo)))
+
+    rolled_up = select(
+        TimesheetDay.project_id, cast(TimesheetDay.day, DateTime).label('day'), TimesheetDay.seconds
+    ).where(*day_scope, TimesheetDay.day >= lo, TimesheetDay.day < split)
+    # Running timers aren't rolled up, so they are counted live over the whole range
+    live = split_by_day(
+        [*log_scope, or_(TimeLog.end_time.is_(None), TimeLog.end_time > split)],
+        case((TimeLog.end_time.is_(None), lo), else_=split), hi, now
+    ).subquery()
+    parts = union_all(rolled_up, select(live.c.project_id, live.c.day, live.c.seconds)).subquery()
+
+    # Inlined (granularity is one of STEPS) so SELECT and GROUP BY match as the same expression
+    bucket = func.date_trunc(literal_column(f"'{granularity}'"), parts.c.day)
+    totals = select(
+        bucket.label('bucket'), parts.c.project_id, func.sum(parts.c.seconds).label('seconds')
+    ).group_by(bucket, parts.c.project_id).subquery()
+    buckets = func.generate_series(lo, hi - step, step).table_valued('bucket').render_derived('buckets')
+    return select(buckets.c.bucket, totals.c.project_id, totals.c.seconds).select_from(
+        buckets.outerjoin(totals, totals.c.bucket == buckets.c.bucket)
+    ).order_by(buckets.c.bucket, totals.c.project_id)
+
+
+def shape_report(rows, granularity, lo, hi):
+    buckets, projects, total = {}, {}, 0
+    for bucket_start, project_id, seconds in rows:
+        bucket = buckets.setdefault(bucket_start, {'start': bucket_start.date().isoformat(),
+                                                   'seconds': 0, 'projects': {}})
+        if project_id is None:
+            continue
+        seconds = int(round(seconds or 0))
+        bucket['seconds'] += seconds
+        bucket['projects'][str(project_id)] = seconds
+        projects[str(project_id)] = projects.get(str(project_id), 0) + seconds
+        total += seconds
+    return {
+        'granularity': granularity,
+        'from': lo.date().isoformat(),
+        'to': (hi - timedelta(days=1)).date().isoformat(),
+        'seconds': total,
+        'projects': projects,
+        'buckets': list(buckets.values()),
+    }
+
+
+@api.route('')
+class Timesheet(Resource):
+    @api.doc(security='Bearer Auth', params={
+        'granularity': 'day (default) or week',
+        'from': 'First day, YYYY-MM-DD (default: Monday of this week)',
+        'to': 'Last day, inclusive (default: six days after from)',
+        'project_id': 'Only this project',
+        'freelancer_id': 'Only this freelancer (clients)',
+    })
+    @api.response(200, 'Success')
+    @api.response(400, 'Invalid range')
+    @api.response(403, 'Only freelancers and clients have timesheets')
+    @jwt_required()
+    @query_budget(2)
+    def get(self):
+        """Seconds logged per project per day or week"""
+        now = _now()
+        try:
+            granularity, lo, hi = report_range(request.args, now)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}, 400
+        max_days = current_app.config.get('TIMESHEET_MAX_DAYS', 366)
+        if hi - lo > timedelta(days=max_days):
+            return {'success': False, 'message': f'Reports span at most {max_days} days'}, 400
+
+        user = db.session.execute(
+            select(User.role, FreelancerProfile.id.label('freelancer_id'), ClientProfile.id.label('client_id'))
+            .outerjoin(FreelancerProfile, FreelancerProfile.user_id == User.id)
+            .outerjoin(ClientProfile, ClientProfile.user_id == User.id)
+            .where(User.id == int(get_jwt_identity()))
+        ).first()
+        if not user:
+            return {'success': False, 'message': 'User not found'}, 404
+        if user.role == 'freelancer' and user.freelancer_id is not None:
+            log_scope = [TimeLog.freelancer_id == user.freelancer_id]
+            day_scope = [TimesheetDay.freelancer_id == user.freelancer_id]
+        elif user.role == 'client' and user.client_id is not None:
+            client_projects = select(Project.id).where(Project.client_id == user.client_id)
+            log_scope = [TimeLog.project_id.in_(client_projects)]
+            day_scope = [TimesheetDay.project_id.in_(client_projects)]
+            freelancer_id = request.args.get('freelancer_id', type=int)
+            if freelancer_id is not None:
+                log_scope.append(TimeLog.freelancer_id == freelancer_id)
+                day_scope.append(TimesheetDay.freelancer_id == freelancer_id)
+        else:
+            return {'success': False, 'message': 'Only freelancers and clients have timesheets'}, 403
+        project_id = request.args.get('project_id', type=int)
+        if project_id is not None:
+            log_scope.append(TimeLog.project_id == project_id)
+            day_scope.append(TimesheetDay.project_id == project_id)
+
+        rows = db.session.execute(timesheet_query(log_scope, day_scope, granularity, lo, hi, now)).all()
+        return {'success': True, 'data': shape_report(rows, granularity, lo, hi)}, 200
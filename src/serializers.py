@@ -0,0 +1,201 @@
+"""Precompiled model serializers.
+
+For every mapped model a plain function turning an instance's columns into a
+JSON-ready dict is generated once (at startup, via ``init_serializers``, or on
+first use) instead of walking Marshmallow auto-schema fields per object:
+
+* Numeric/Decimal -> float, date/datetime/time -> ISO 8601 string,
+  UUID -> str, Interval -> seconds; everything else is passed through.
+* Secrets (password hashes, verification tokens) are never emitted.
+* Related objects are only serialized when asked for, by name, through the
+  ``nested`` mapping registered for a model (``include=('client_details',)``).
+* List endpoints can expose sparse fieldsets (``?fields=id,title&include=client``)
+  with ``parse_fieldset``/``query_options``, which also keep the query to the
+  requested columns and relationships.
+
+Marshmallow schemas are still used for loading/validation; this module is
+only about dumping.
+"""
+import threading
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from sqlalchemy.orm import configure_mappers, joinedload, load_only, selectinload
+
+SENSITIVE_COLUMNS = frozenset({'password_hash', 'verification_token', 'token_expires_at'})
+# Compiled sparse fieldsets kept per serializer (least recently used dropped first).
+SUBSET_CACHE_SIZE = 64
+
+_registry = {}
+
+
+def _column_expression(key, column_type):
+    """Python expression converting ``obj.<key>`` for the given column type."""
+    value = f'obj.{key}'
+    if isinstance(column_type, sa.Numeric):
+        return f'None if (v := {value}) is None else float(v)'
+    if isinstance(column_type, (sa.DateTime, sa.Date, sa.Time)):
+        return f'None if (v := {value}) is None else v.isoformat()'
+    if isinstance(column_type, sa.Uuid):
+        return f'None if (v := {value}) is None else str(v)'
+    if isinstance(column_type, sa.Interval):
+        return f'None if (v := {value}) is None else v.total_seconds()'
+    return value
+
+
+def compile_columns(model, fields=None):
+    """Generates ``fn(obj) -> dict`` for the model's columns (or ``fields``)."""
+    columns = {c.key: c for c in model.__table__.columns}
+    if fields is None:
+        fields = [key for key in columns if key not in SENSITIVE_COLUMNS]
+    entries = [f'        {key!r}: {_column_expression(key, columns[key].type)},' for key in fields]
+    source = '\n'.join([f'def serialize_{model.__name__}(obj):', '    return {', *entries, '    }'])
+    namespace = {}
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace[f'serialize_{model.__name__}']
+
+
+class ModelSerializer:
+    """Column serializer for one model plus optional named nested includes.
+
+    ``nested`` maps an output key to ``(relationship_attribute, serializer)``;
+    the related object (or collection) is only touched when the key is
+    requested through ``include``. ``fields`` on a dump narrows the columns
+    to a sparse fieldset; a function is compiled per distinct set of fields
+    (in column order) and the last SUBSET_CACHE_SIZE of them are kept.
+    """
+
+    def __init__(self, model, fields=None, nested=None):
+        self.model = model
+        self.fields = tuple(fields) if fields is not None else None
+        self.nested = nested or {}
+        self._columns = None
+        self._subsets = OrderedDict()
+        self._subsets_lock = threading.Lock()
+        self._many = {}
+
+    @property
+    def available_fields(self):
+        if self.fields is not None:
+            return self.fields
+        return tuple(c.key for c in self.model.__table__.columns if c.key not in SENSITIVE_COLUMNS)
+
+    def compile(self):
+        if self._columns is None:
+            relationships = sa.inspect(self.model).relationships
+            self._many = {key: relationships[attr].uselist for key, (attr, _) in self.nested.items()}
+            self._columns = compile_columns(self.model, self.fields)
+        for _, serializer in self.nested.values():
+            serializer.compile()
+        return self
+
+    def _columns_for(self, fields):
+        if fields is None:
+            return self._columns or self.compile()._columns
+        wanted = set(fields)
+        key = tuple(f for f in self.available_fields if f in wanted)
+        if len(key) != len(wanted):
+            raise ValueError(f"Unknown field: {sorted(wanted.difference(key))[0]}")
+        with self._subsets_lock:
+            fn = self._subsets.get(key)
+            if fn is not None:
+                self._subsets.move_to_end(key)
+                return fn
+        fn = compile_columns(self.model, key)
+        with self._subsets_lock:
+            self._subsets[key] = fn
+            while len(self._subsets) > SUBSET_CACHE_SIZE:
+                self._subsets.popitem(last=False)
+        return fn
+
+    def dump(self, obj, include=(), fields=None):
+        if obj is None:
+            return None
+        data = self._columns_for(fields)(obj)
+        if include and not self._many:
+            self.compile()
+        for key in include:
+            if key not in self.nested:
+                continue
+            attr, serializer = self.nested[key]
+            related = getattr(obj, attr)
+            data[key] = serializer.dump_many(related) if self._many[key] else serializer.dump(related)
+        return data
+
+    def dump_many(self, objs, include=(), fields=None):
+        if not include:
+            columns = self._columns_for(fields)
+            return [columns(obj) for obj in objs]
+        return [self.dump(obj, include, fields) for obj in objs]
+
+    def parse_fieldset(self, fields_arg=None, include_arg=None, aliases=None):
+        """Validates ``?fields=a,b`` / ``?include=x`` query values.
+
+        Returns ``(fields, include)``; ``fields`` is None when not restricted.
+        Include names may be nested keys or ``aliases`` of them. Raises
+        ValueError naming the first unknown field or include.
+        """
+        fields = None
+        if fields_arg:
+            available = set(self.available_fields)
+            requested = [f.strip() for f in fields_arg.split(',') if f.strip()]
+            unknown = [f for f in requested if f not in available]
+            if unknown:
+                raise ValueError(f"Unknown field: {unknown[0]}")
+            primary_key = [c.key for c in self.model.__table__.primary_key]
+            fields = tuple(dict.fromkeys(primary_key + requested))
+        include = ()
+        if include_arg:
+            aliases = aliases or {}
+            names = [aliases.get(i.strip(), i.strip()) for i in include_arg.split(',') if i.strip()]
+            unknown = [i for i in names if i not in self.nested]
+            if unknown:
+                raise ValueError(f"Unknown include: {unknown[0]}")
+            include = tuple(dict.fromkeys(names))
+        return fields, include
+
+    def query_options(self, fields=None, include=()):
+        """Loader options that fetch only ``fields`` and eager-load ``include``."""
+        options = []
+        if fields is not None:
+            options.append(load_only(*[getattr(self.model, f) for f in fields]))
+        self.compile()
+        for key in include:
+            attr, serializer = self.nested[key]
+            relationship = getattr(self.model, attr)
+            loader = selectinload(relationship) if self._many[key] else joinedload(relationship)
+            if serializer.fields is not None:
+                loader = loader.load_only(*[getattr(serializer.model, f) for f in serializer.fields])
+            options.append(loader)
+        return options
+
+
+def register(model, fields=None, nested=None):
+    """Registers (or replaces) the serializer used for ``model``."""
+    serializer = ModelSerializer(model, fields=fields, nested=nested)
+    _registry[model] = serializer
+    return serializer
+
+
+def serializer_for(model):
+    serializer = _registry.get(model)
+    if serializer is None:
+        serializer = _registry[model] = ModelSerializer(model)
+    return serializer
+
+
+def serialize(obj, include=()):
+    return serializer_for(type(obj)).dump(obj, include)
+
+
+def serialize_many(objs, model, include=()):
+    return serializer_for(model).dump_many(objs, include)
+
+
+def init_serializers(app):
+    """Builds serializers for every mapped model up front."""
+    from .extensions import db
+
+    configure_mappers()
+    for mapper in db.Model.registry.mappers:
+        serializer_for(mapper.class_).compile()
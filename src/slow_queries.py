@@ -0,0 +1,136 @@
+"""Opt-in slow-query log with EXPLAIN capture.
+
+When SLOW_QUERY_LOG is enabled, any statement taking at least
+SLOW_QUERY_THRESHOLD_MS is recorded with its SQL, the shape of its bound
+parameters (names and types only, never values) and, on PostgreSQL, its
+``EXPLAIN (ANALYZE off, FORMAT JSON)`` plan. Entries are deduplicated by a
+normalised statement fingerprint and kept in a bounded, most-recently-seen
+ring buffer per worker process, exposed at GET /api/admin/slow-queries.
+
+Statements under the threshold cost a single float comparison in the cursor
+hook (see instrumentation.py); the plan is captured only the first time a
+fingerprint is seen.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\?|:\w+|\$\d+')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+_EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'with', 'values')
+
+
+def fingerprint(statement):
+    """Stable id for a statement regardless of literal values or IN-list length."""
+    normalised = _PLACEHOLDER.sub('?', statement)
+    normalised = _LITERAL.sub('?', normalised)
+    normalised = _LIST.sub('(?+)', normalised)
+    normalised = _SPACE.sub(' ', normalised).strip().lower()
+    return hashlib.sha1(normalised.encode()).hexdigest()[:16], normalised
+
+
+def parameter_shape(parameters, executemany):
+    if executemany and parameters:
+        parameters = parameters[0]
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return None
+
+
+class SlowQueryLog:
+    def __init__(self, size=100, explain=True):
+        self.size = size
+        self.explain = explain
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, conn, cursor, statement, parameters, executemany, elapsed):
+        key, normalised = fingerprint(statement)
+        elapsed_ms = round(elapsed * 1000, 2)
+        now = datetime.now(timezone.utc).isoformat()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['count'] += 1
+                entry['total_ms'] = round(entry['total_ms'] + elapsed_ms, 2)
+                entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+                entry['last_seen'] = now
+                self._entries.move_to_end(key)
+                return
+            entry = {
+                'fingerprint': key,
+                'statement': statement,
+                'normalised': normalised,
+                'parameter_shape': parameter_shape(parameters, executemany),
+                'count': 1,
+                'total_ms': elapsed_ms,
+                'max_ms': elapsed_ms,
+                'first_seen': now,
+                'last_seen': now,
+                'plan': None,
+            }
+            self._entries[key] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+        logger.warning(json.dumps({'event': 'slow_query', 'fingerprint': key, 'ms': elapsed_ms,
+                                   'statement': statement[:500]}))
+        if self.explain:
+            entry['plan'] = self._explain(conn, cursor, statement, parameters, executemany)
+
+    def _explain(self, conn, cursor, statement, parameters, executemany):
+        if conn.dialect.name != 'postgresql' or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        if executemany and parameters:
+            parameters = parameters[0]
+        # Run inside a savepoint on the same connection so a failing EXPLAIN can't
+        # abort the request's transaction.
+        raw = cursor.connection
+        try:
+            with raw.cursor() as cur:
+                cur.execute('SAVEPOINT slow_query_explain')
+                try:
+                    cur.execute('EXPLAIN (ANALYZE off, FORMAT JSON) ' + statement, parameters or None)
+                    plan = cur.fetchone()[0]
+                    cur.execute('RELEASE SAVEPOINT slow_query_explain')
+                    return plan
+                except Exception:
+                    cur.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                    raise
+        except Exception as e:
+            logger.info(f"EXPLAIN failed for slow query: {e}")
+            return None
+
+    def entries(self):
+        with self._lock:
+            return sorted((dict(e) for e in self._entries.values()), key=lambda e: e['max_ms'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def init_slow_query_log(app):
+    if not app.config.get('SLOW_QUERY_LOG'):
+        instrumentation.set_slow_query_hook(None, None)
+        return
+    slow_query_log.size = int(app.config.get('SLOW_QUERY_LOG_SIZE', 100))
+    slow_query_log.explain = bool(app.config.get('SLOW_QUERY_EXPLAIN', True))
+    threshold = float(app.config.get('SLOW_QUERY_THRESHOLD_MS', 200)) / 1000.0
+    instrumentation.set_slow_query_hook(threshold, slow_query_log.record)
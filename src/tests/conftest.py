@@ -0,0 +1,63 @@
+"""Fixtures shared by the test modules.
+
+``make_app`` builds the small Flask app the API tests run against: a fresh
+SQLite database with the tables created, JWTs, and a flask-restx ``Api``
+(``app.api``) with the given namespaces mounted. Modules pass only the
+config their feature needs on top of ``BASE_CONFIG``. ``add_users`` inserts
+users and returns an access token for each; ``make_token`` mints one for
+any identity and claims.
+"""
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from flask_restx import Api
+
+from src.extensions import db
+from src.models import User
+
+BASE_CONFIG = {
+    'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+    'JWT_SECRET_KEY': 'test-secret',
+    # Let flask-jwt-extended's handlers answer 401s and other errors fail the test
+    'PROPAGATE_EXCEPTIONS': True,
+}
+
+
+@pytest.fixture
+def make_app():
+    def make(namespaces=None, **config):
+        app = Flask(__name__)
+        app.config.update({**BASE_CONFIG, **config})
+        db.init_app(app)
+        JWTManager(app)
+        app.api = Api(app)
+        for path, ns in (namespaces or {}).items():
+            app.api.add_namespace(ns, path=path)
+        with app.app_context():
+            db.create_all(bind_key=None)
+        return app
+    return make
+
+
+@pytest.fixture
+def make_token():
+    def make(app, identity, **claims):
+        with app.app_context():
+            return create_access_token(identity=str(identity), additional_claims=claims or None)
+    return make
+
+
+@pytest.fixture
+def add_users(make_token):
+    def add(app, roles, emails=None):
+        """Inserts a user per ``{id: role}``; returns ``{id: access token}``."""
+        emails = emails or {}
+        with app.app_context():
+            db.session.add_all(
+                User(id=user_id, email=emails.get(user_id, f'user{user_id}@example.com'), role=role,
+                     password_hash='x')
+                for user_id, role in roles.items()
+            )
+            db.session.commit()
+        return {user_id: make_token(app, user_id) for user_id in roles}
+    return add
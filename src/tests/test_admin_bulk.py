@@ -0,0 +1,55 @@
+import pytest
+
+from src.extensions import db
+from src.models import Dispute, Milestone, Project
+from src.routes.routes import admin_ns, parse_bulk_selector
+
+
+@pytest.fixture
+def admin_app(make_app, add_users, make_token):
+    app = make_app({'/api/admin': admin_ns})
+    add_users(app, {1: 'admin'})
+    with app.app_context():
+        db.session.add_all([
+            Project(id=1, client_id=None, status='posted', title='Site'),
+            Project(id=2, client_id=None, status='draft', title='App'),
+            Milestone(id=1, project_id=1, status='submitted', amount=10),
+            Milestone(id=2, project_id=1, status='pending', amount=20),
+            Dispute(id=1, status='pending'),
+        ])
+        db.session.commit()
+    app.config['TOKEN'] = make_token(app, 1, role='admin')
+    return app
+
+
+def put(app, path, body):
+    return app.test_client().put(path, json=body, headers={'Authorization': f"Bearer {app.config['TOKEN']}"})
+
+
+def test_selector_rejects_bools_and_mistyped_filters():
+    assert parse_bulk_selector(Project, {'ids': [1, True]})[2] == 'ids must be a list of integers'
+    assert parse_bulk_selector(Project, {'filter': {'id': 'abc'}})[2] == 'Invalid value for filter column id'
+    assert parse_bulk_selector(Project, {'filter': {'id': [1, False]}})[2] == 'Invalid value for filter column id'
+    assert parse_bulk_selector(Project, {'filter': {'budget': 'lots'}})[2] == 'Invalid value for filter column budget'
+    assert parse_bulk_selector(Project, {'filter': {'status': 3}})[2] == 'Invalid value for filter column status'
+    assert parse_bulk_selector(Project, {'filter': {'id': [1, 2], 'status': 'draft'}})[2] is None
+
+
+def test_bulk_status_only_accepts_known_statuses(admin_app):
+    resp = put(admin_app, '/api/admin/projects/bulk-status', {'status': 'bogus', 'filter': {'id': [1, 2]}})
+    assert resp.status_code == 400
+    resp = put(admin_app, '/api/admin/projects/bulk-status', {'status': 'active', 'filter': {'id': [1, 2]}})
+    assert resp.status_code == 200 and resp.get_json()['updated'] == 2
+    resp = put(admin_app, '/api/admin/milestones/bulk-status', {'status': 'approved', 'filter': {'project_id': 1}})
+    assert resp.status_code == 200 and resp.get_json()['updated'] == 2
+    with admin_app.app_context():
+        assert {p.status for p in Project.query} == {'active'}
+
+
+def test_disputes_are_resolved_through_bulk_resolve_only(admin_app):
+    assert put(admin_app, '/api/admin/disputes/bulk-status', {'status': 'resolved', 'filter': {'id': 1}}).status_code == 404
+    resp = put(admin_app, '/api/admin/disputes/bulk-resolve', {'resolution': 'Refunded', 'filter': {'id': 1}})
+    assert resp.status_code == 200 and resp.get_json()['resolved'] == 1
+    with admin_app.app_context():
+        dispute = db.session.get(Dispute, 1)
+        assert dispute.status == 'resolved' and dispute.resolved_at is not None
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from src.extensions import limiter
+from src.passwords import PasswordHasher, PasswordHasherBusy
+from src.routes.auth import auth_ns
+
+
+@pytest.fixture
+def auth_app(make_app):
+    app = make_app({'/api/auth': auth_ns}, RATELIMIT_STORAGE_URI='memory://', AUTH_IP_RATE_LIMIT='4 per minute',
+                   AUTH_ACCOUNT_RATE_LIMIT='2 per minute')
+    limiter.init_app(app)
+    return app
+
+
+def login(client, email, ip='192.0.2.1'):
+    return client.post('/api/auth/login', json={'email': email, 'password': 'wrong'},
+                       environ_base={'REMOTE_ADDR': ip}).status_code
+
+
+def test_login_is_limited_per_account_and_per_ip(auth_app):
+    client = auth_app.test_client()
+    assert [login(client, 'a@example.com') for _ in range(3)] == [401, 401, 429]
+    # A fresh IP still can't keep guessing the same account
+    assert login(client, 'a@example.com', ip='192.0.2.2') == 429
+    # and one IP can't spread guesses over many accounts
+    assert [login(client, f'{n}@example.com', ip='192.0.2.3') for n in range(5)] == [401] * 4 + [429]
+
+
+def hasher_app(**config):
+    app = Flask(__name__)
+    app.config.update({'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', **config})
+    return PasswordHasher(app)
+
+
+def test_hasher_hashes_verifies_and_flags_old_parameters():
+    hasher = hasher_app()
+    stored = hasher.hash('secret')
+    assert hasher.verify(stored, 'secret') and not hasher.verify(stored, 'nope')
+    assert not hasher.needs_rehash(stored)
+    assert hasher_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:2000').needs_rehash(stored)
+
+
+def test_hasher_holds_its_slot_until_a_timed_out_hash_finishes():
+    hasher = hasher_app(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_TIMEOUT=0.05)
+    release = threading.Event()
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(release.wait, 5)
+    # The timed-out call is still running, so there is no room for another
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(lambda: 'ran')
+    release.set()
+    hasher._executor.shutdown(wait=True)
+    assert hasher._slots.acquire(blocking=False)
@@ -0,0 +1,124 @@
+import jwt
+import pytest
+import sqlalchemy as sa
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restx import Namespace, Resource
+
+from src.extensions import db
+from src.models import User
+from src.replicas import use_primary
+from src.routes.batch import api as batch_ns, init_batch
+
+
+@pytest.fixture
+def batch_app(make_app, add_users):
+    things = Namespace('things')
+
+    @things.route('/<int:thing_id>')
+    class Thing(Resource):
+        @jwt_required()
+        def get(self, thing_id):
+            user = db.session.get(User, int(get_jwt_identity()))
+            if thing_id == 0:
+                return {'success': False, 'message': 'Not found'}, 404
+            return {'success': True, 'data': {'id': thing_id, 'owner': user.email}}
+
+    @things.route('/claim')
+    class ClaimThing(Resource):
+        @jwt_required()
+        @use_primary
+        def get(self):
+            return {'success': True}
+
+    @things.route('/broken')
+    class BrokenThing(Resource):
+        @jwt_required()
+        def get(self):
+            db.session.add(User(id=1, email='dupe@example.com', role='client', password_hash='x'))
+            db.session.flush()
+
+    app = make_app({'/api/things': things, '/api/batch': batch_ns}, BATCH_MAX_REQUESTS=3, BATCH_MAX_WORKERS=1)
+    init_batch(app)
+    app.config['TEST_TOKEN'] = add_users(app, {1: 'client'}, {1: 'client@example.com'})[1]
+    return app
+
+
+def post_batch(app, requests):
+    headers = {'Authorization': f"Bearer {app.config['TEST_TOKEN']}"}
+    return app.test_client().post('/api/batch', json={'requests': requests}, headers=headers)
+
+
+def test_batch_returns_sub_responses_in_order(batch_app):
+    resp = post_batch(batch_app, [
+        {'id': 'first', 'path': '/api/things/1'},
+        {'id': 'missing', 'path': '/api/things/0'},
+        {'path': '/api/nothing-here'},
+    ])
+    assert resp.status_code == 200
+    data = resp.get_json()['data']
+    assert [d['id'] for d in data] == ['first', 'missing', '2']
+    assert [d['status'] for d in data] == [200, 404, 404]
+    assert data[0]['body']['data'] == {'id': 1, 'owner': 'client@example.com'}
+
+
+def test_sub_requests_share_one_session(batch_app):
+    statements = []
+    with batch_app.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    sa.event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        resp = post_batch(batch_app, [{'path': '/api/things/1'}, {'path': '/api/things/2'}])
+    finally:
+        sa.event.remove(engine, 'before_cursor_execute', listener)
+    assert [d['status'] for d in resp.get_json()['data']] == [200, 200]
+    # The user is loaded once and found in the identity map the second time.
+    assert len([s for s in statements if 'FROM users' in s]) == 1
+
+
+@pytest.mark.parametrize('requests', [
+    [],
+    [{'path': '/api/things/1'}] * 4,
+    [{'path': '/api/things/1', 'method': 'DELETE'}],
+    [{'path': '/api/batch'}],
+    [{'path': '/metrics'}],
+    [{'path': '/api/things/claim?code=1'}],
+])
+def test_invalid_batches_are_rejected(batch_app, requests):
+    assert post_batch(batch_app, requests).status_code == 400
+
+
+def test_batch_requires_auth(batch_app):
+    assert batch_app.test_client().post('/api/batch', json={'requests': [{'path': '/api/things/1'}]}).status_code == 401
+
+
+def test_parallel_groups_keep_request_order(batch_app):
+    batch_app.config['BATCH_MAX_WORKERS'] = 3
+    resp = post_batch(batch_app, [{'path': f'/api/things/{i}'} for i in (3, 0, 5)])
+    data = resp.get_json()['data']
+    assert [d['status'] for d in data] == [200, 404, 200]
+    assert [d['body'].get('data', {}).get('id') for d in data] == [3, None, 5]
+
+
+def test_token_is_decoded_once_per_batch(batch_app, monkeypatch):
+    decoded = []
+    decode = jwt.decode
+    monkeypatch.setattr(jwt, 'decode', lambda *args, **kwargs: decoded.append(1) or decode(*args, **kwargs))
+    batch_app.test_client().get('/api/things/1', headers={'Authorization': f"Bearer {batch_app.config['TEST_TOKEN']}"})
+    per_request = len(decoded)
+    resp = post_batch(batch_app, [{'path': f'/api/things/{i}'} for i in (1, 2, 3)])
+    assert [d['status'] for d in resp.get_json()['data']] == [200, 200, 200]
+    # Only the batch request itself decodes the token
+    assert len(decoded) == 2 * per_request
+
+
+def test_init_batch_wraps_the_decoder_once(batch_app):
+    manager = batch_app.extensions['flask-jwt-extended']
+    decode = manager._decode_jwt_from_config
+    init_batch(batch_app)
+    assert manager._decode_jwt_from_config is decode and decode.reuses_batch_token
+
+
+def test_failed_sub_request_does_not_poison_the_next(batch_app):
+    resp = post_batch(batch_app, [{'path': '/api/things/broken'}, {'path': '/api/things/1'}])
+    assert [d['status'] for d in resp.get_json()['data']] == [500, 200]
@@ -0,0 +1,74 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask, Response, send_file
+from io import BytesIO
+
+from src.compression import accepted_encodings, init_compression
+
+BIG = {'data': [{'id': i, 'title': f'Project {i}'} for i in range(500)]}
+
+
+@pytest.fixture
+def compressed_app():
+    app = Flask(__name__)
+    app.config.update(COMPRESS_MIN_SIZE=500, COMPRESS_GZIP_LEVEL=5)
+    init_compression(app)
+
+    @app.get('/big')
+    def big():
+        return BIG
+
+    @app.get('/small')
+    def small():
+        return {'ok': True}
+
+    @app.get('/stream')
+    def stream():
+        return Response((json.dumps(row) + '\n' for row in BIG['data']), mimetype='application/x-ndjson')
+
+    @app.get('/image')
+    def image():
+        return Response(b'\x89PNG' * 1000, mimetype='image/png')
+
+    @app.get('/download')
+    def download():
+        return send_file(BytesIO(b'a' * 5000), mimetype='text/csv', as_attachment=True, download_name='export.csv')
+
+    return app
+
+
+def test_accepted_encodings_ignores_zero_q():
+    assert accepted_encodings('gzip;q=0, br;q=0.5, identity') == {'br', 'identity'}
+
+
+def test_large_json_is_gzipped(compressed_app, monkeypatch):
+    monkeypatch.setattr('src.compression.brotli', None)
+    resp = compressed_app.test_client().get('/big', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resp.headers['Vary']
+    assert json.loads(gzip.decompress(resp.data)) == BIG
+
+
+def test_small_bodies_and_unaccepting_clients_are_left_alone(compressed_app):
+    client = compressed_app.test_client()
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/big', headers={'Accept-Encoding': 'identity'}).headers
+
+
+def test_streamed_responses_are_compressed_incrementally(compressed_app, monkeypatch):
+    monkeypatch.setattr('src.compression.brotli', None)
+    resp = compressed_app.test_client().get('/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in resp.headers
+    chunks = list(resp.response)
+    assert len(chunks) > 1
+    rows = gzip.decompress(b''.join(chunks)).decode().splitlines()
+    assert [json.loads(r) for r in rows] == BIG['data']
+
+
+def test_images_and_downloads_are_skipped(compressed_app):
+    client = compressed_app.test_client()
+    assert 'Content-Encoding' not in client.get('/image', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/download', headers={'Accept-Encoding': 'gzip'}).headers
@@ -0,0 +1,72 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.extensions import db
+from src.instrumentation import init_sql_instrumentation
+from src.models import (
+    ClientProfile, Invoice, Milestone, Payment, Project, ProjectApplication
+)
+from src.routes.dashboard import api as dashboard_ns
+
+
+@pytest.fixture
+def dashboard_app(make_app, add_users):
+    app = make_app({'/api/client/dashboard': dashboard_ns}, DASHBOARD_RECENT_PAYMENTS=2)
+    init_sql_instrumentation(app)
+    tokens = add_users(app, {1: 'client', 2: 'client', 3: 'freelancer'})
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            ClientProfile(id=20, user_id=2),
+            Project(id=1, client_id=10, status='active'),
+            Project(id=2, client_id=10, status='active'),
+            Project(id=3, client_id=10, status='draft'),
+            Project(id=4, client_id=20, status='active'),
+            Milestone(id=1, project_id=1, status='submitted', amount=Decimal('100')),
+            Milestone(id=2, project_id=2, status='submitted', amount=Decimal('50')),
+            Milestone(id=3, project_id=2, status='approved', amount=Decimal('70')),
+            Milestone(id=4, project_id=4, status='submitted', amount=Decimal('999')),
+            Invoice(id=1, milestone_id=3, status='pending', amount=Decimal('70')),
+            Invoice(id=2, milestone_id=1, status='paid', amount=Decimal('100')),
+            Invoice(id=3, milestone_id=4, status='pending', amount=Decimal('999')),
+            Payment(id=1, client_id=10, invoice_id=2, status='completed', amount=Decimal('100'),
+                    paid_at=datetime(2030, 1, 1)),
+            Payment(id=2, client_id=10, status='pending', amount=Decimal('20'), paid_at=datetime(2030, 1, 3)),
+            Payment(id=3, client_id=10, status='completed', amount=Decimal('5'), paid_at=datetime(2030, 1, 2)),
+            Payment(id=4, client_id=20, status='completed', amount=Decimal('999'), paid_at=datetime(2030, 1, 4)),
+            ProjectApplication(id=1, project_id=3, status='pending'),
+            ProjectApplication(id=2, project_id=3, status='pending'),
+            ProjectApplication(id=3, project_id=1, status='hired'),
+            ProjectApplication(id=4, project_id=4, status='pending'),
+        ])
+        db.session.commit()
+    app.config['TOKENS'] = tokens
+    return app
+
+
+def get_dashboard(app, user_id):
+    headers = {'Authorization': f"Bearer {app.config['TOKENS'][user_id]}"}
+    return app.test_client().get('/api/client/dashboard', headers=headers)
+
+
+def test_dashboard_aggregates_only_the_clients_rows(dashboard_app):
+    resp = get_dashboard(dashboard_app, 1)
+    assert resp.status_code == 200
+    data = resp.get_json()['data']
+    assert data['projects'] == {'total': 3, 'by_status': {'active': 2, 'draft': 1}}
+    assert data['milestones_awaiting_approval'] == {'count': 2, 'amount': 150.0}
+    assert data['unpaid_invoices'] == {'count': 1, 'amount': 70.0}
+    assert data['pending_applications'] == {'count': 2, 'projects': 1}
+    assert data['payments'] == {'count': 2, 'total_paid': 105.0}
+    assert [p['id'] for p in data['recent_payments']] == [2, 3]
+
+
+def test_dashboard_query_count_is_fixed(dashboard_app):
+    resp = get_dashboard(dashboard_app, 1)
+    assert 'desc="4 queries"' in resp.headers['Server-Timing']
+
+
+def test_dashboard_is_client_only(dashboard_app):
+    assert get_dashboard(dashboard_app, 3).status_code == 403
@@ -0,0 +1,137 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Response, request
+from sqlalchemy import text
+
+from src.cli import init_cli
+from src.extensions import db
+from src.idempotency import claim, init_idempotency, request_fingerprint, store
+from src.instrumentation import init_sql_instrumentation, query_budget
+from src.models import IdempotencyKey
+
+
+@pytest.fixture
+def idem_app(tmp_path, make_app, make_token):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'idem.db'}",
+                   SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 10, 'check_same_thread': False}},
+                   IDEMPOTENCY_WAIT_SECONDS=5, SQL_QUERY_BUDGET_STRICT=True)
+    init_sql_instrumentation(app)
+    init_idempotency(app)
+    app.calls = []
+    app.gate = threading.Event()
+    app.gate.set()
+
+    @app.post('/things')
+    def create_thing():
+        app.gate.wait(5)
+        app.calls.append(request.get_json())
+        if request.get_json().get('fail'):
+            return {'success': False}, 503
+        if request.get_json().get('invalid'):
+            return {'success': False, 'message': 'name is required'}, 400
+        if request.get_json().get('broken'):
+            try:
+                db.session.execute(text('SELECT * FROM missing_table'))
+            except Exception as e:
+                db.session.rollback()
+                return {'success': False, 'message': str(e)}, 400
+        headers = {'Location': f'/things/{len(app.calls)}', 'ETag': '"v1"', 'Set-Cookie': 'seen=1'}
+        return {'success': True, 'id': len(app.calls)}, 201, headers
+
+    @app.post('/counted')
+    @query_budget(1)
+    def counted():
+        db.session.execute(text('SELECT 1'))
+        return {'success': True}, 201
+
+    app.config['TOKENS'] = [make_token(app, i) for i in (1, 2)]
+    return app
+
+
+def post(app, body, key='key-1', user=0):
+    headers = {'Authorization': f"Bearer {app.config['TOKENS'][user]}", 'Idempotency-Key': key}
+    return app.test_client().post('/things', json=body, headers=headers)
+
+
+def test_replay_returns_stored_response_without_rerunning(idem_app):
+    first = post(idem_app, {'name': 'a'})
+    again = post(idem_app, {'name': 'a'})
+    assert (first.status_code, again.status_code) == (201, 201)
+    assert again.get_json() == first.get_json() == {'success': True, 'id': 1}
+    assert again.headers['Idempotent-Replayed'] == 'true'
+    assert (again.headers['Location'], again.headers['ETag']) == ('/things/1', '"v1"')
+    assert again.content_type == 'application/json' and 'Set-Cookie' not in again.headers
+    assert len(idem_app.calls) == 1
+
+    # Keys are per caller
+    assert post(idem_app, {'name': 'a'}, user=1).get_json()['id'] == 2
+
+
+def test_key_reused_for_a_different_request_is_rejected(idem_app):
+    post(idem_app, {'name': 'a'})
+    assert post(idem_app, {'name': 'b'}).status_code == 422
+
+
+def test_server_errors_release_the_key(idem_app):
+    assert post(idem_app, {'fail': True}).status_code == 503
+    with idem_app.app_context():
+        assert db.session.query(IdempotencyKey).count() == 0
+    assert post(idem_app, {'fail': True}).status_code == 503
+    assert len(idem_app.calls) == 2
+
+
+def test_concurrent_duplicates_wait_for_the_first(idem_app):
+    idem_app.gate.clear()
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(post, idem_app, {'name': 'a'}) for _ in range(3)]
+        threading.Timer(0.3, idem_app.gate.set).start()
+        responses = [f.result() for f in futures]
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert {r.get_json()['id'] for r in responses} == {1}
+    assert len(idem_app.calls) == 1
+
+
+def test_key_bookkeeping_is_not_charged_to_the_request(idem_app):
+    headers = {'Authorization': f"Bearer {idem_app.config['TOKENS'][0]}", 'Idempotency-Key': 'key-2'}
+    resp = idem_app.test_client().post('/counted', json={}, headers=headers)
+    assert resp.status_code == 201
+    assert 'desc="1 queries"' in resp.headers['Server-Timing']
+
+
+def test_only_deliberate_client_errors_are_stored(idem_app):
+    assert post(idem_app, {'invalid': True}).status_code == 400
+    assert post(idem_app, {'invalid': True}).headers.get('Idempotent-Replayed') == 'true'
+    assert post(idem_app, {'broken': True}, key='key-2').status_code == 400
+    assert post(idem_app, {'broken': True}, key='key-2').headers.get('Idempotent-Replayed') is None
+    assert len(idem_app.calls) == 3
+
+
+def test_abandoned_claim_is_taken_over_after_its_lease(idem_app):
+    key_hash = hashlib.sha256(b'user:1\0key-1').hexdigest()
+    with idem_app.test_request_context('/things', method='POST', json={'name': 'a'}):
+        claimed_at, _ = claim(key_hash, request_fingerprint(), lease=0.3, wait=0)
+    # The duplicate waits on the claim, then takes it over once the lease runs out
+    assert post(idem_app, {'name': 'a'}).status_code == 201
+    with idem_app.app_context():
+        # and the abandoned request finishing late can't overwrite its response
+        store(key_hash, claimed_at, Response('late', 200), ttl=60)
+        assert db.session.get(IdempotencyKey, key_hash).response_status == 201
+
+
+def test_purge_is_available_with_the_feature_off(make_app):
+    app = make_app(IDEMPOTENCY_ENABLED=False)
+    init_idempotency(app)
+    init_cli(app)
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.add_all([
+            IdempotencyKey(key_hash='old', fingerprint='f', created_at=now, expires_at=now - timedelta(seconds=1)),
+            IdempotencyKey(key_hash='new', fingerprint='f', created_at=now, expires_at=now + timedelta(hours=1)),
+        ])
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['idempotency', 'purge'])
+    assert result.output.strip() == 'Deleted 1 expired idempotency keys'
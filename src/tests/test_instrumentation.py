@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import text
+
+from src.extensions import db
+from src.instrumentation import QueryBudgetExceeded, init_sql_instrumentation, query_budget
+from src.models import Milestone, Project
+from src.routes.routes import admin_ns
+
+
+@pytest.fixture
+def strict_app(make_app, add_users, make_token):
+    app = make_app({'/api/admin': admin_ns}, SQL_QUERY_BUDGET_STRICT=True)
+    init_sql_instrumentation(app)
+
+    def select_one(n):
+        for _ in range(n):
+            db.session.execute(text('SELECT 1'))
+
+    def authenticated(fn):
+        def wrapper():
+            select_one(1)  # the user lookup an auth decorator makes
+            return fn()
+        wrapper.__name__ = fn.__name__
+        return wrapper
+
+    @app.get('/within')
+    @authenticated
+    @query_budget(2)
+    def within():
+        select_one(2)
+        return 'ok'
+
+    @app.get('/over')
+    @authenticated
+    @query_budget(2)
+    def over():
+        select_one(3)
+        return 'ok'
+
+    add_users(app, {1: 'admin'})
+    with app.app_context():
+        db.session.add_all([
+            Project(id=1, client_id=None, status='posted', title='Site'),
+            Milestone(id=1, project_id=1, status='submitted', amount=10),
+        ])
+        db.session.commit()
+    app.config['TOKEN'] = make_token(app, 1, role='admin')
+    return app
+
+
+def test_budget_counts_only_the_handler(strict_app):
+    client = strict_app.test_client()
+    resp = client.get('/within')
+    assert resp.status_code == 200
+    assert 'desc="3 queries"' in resp.headers['Server-Timing']
+    with pytest.raises(QueryBudgetExceeded, match='ran 3 SQL statements'):
+        client.get('/over')
+
+
+@pytest.mark.parametrize('method, path, body', [
+    ('put', '/api/admin/projects/bulk-status', {'status': 'active', 'filter': {'id': 1}}),
+    ('put', '/api/admin/milestones/bulk-status', {'status': 'approved', 'filter': {'id': 1}}),
+    ('post', '/api/admin/milestones/bulk-delete', {'filter': {'id': 1}}),
+    ('put', '/api/admin/disputes/bulk-resolve', {'resolution': 'Refunded', 'filter': {'id': 1}}),
+    ('post', '/api/admin/invoices/generate', {}),
+    ('get', '/api/admin/analytics', None),
+])
+def test_admin_endpoints_stay_within_budget(strict_app, method, path, body):
+    headers = {'Authorization': f"Bearer {strict_app.config['TOKEN']}"}
+    resp = getattr(strict_app.test_client(), method)(path, json=body, headers=headers)
+    assert resp.status_code == 200, resp.get_json()
@@ -0,0 +1,115 @@
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from src.extensions import db, renderer
+from src.invoice_documents import document_hash
+from src.models import ClientProfile, FreelancerProfile, Invoice, InvoiceDocument, Milestone, Project
+from src.routes.invoices import register_routes
+
+
+@pytest.fixture(scope='module')
+def render_pool():
+    app = Flask(__name__)
+    app.config.update(INVOICE_RENDER_WORKERS=1, INVOICE_RENDER_QUEUE=2)
+    renderer.init_app(app)
+    yield renderer
+    renderer._executor.shutdown()
+    renderer._callbacks.shutdown()
+
+
+@pytest.fixture
+def invoice_app(tmp_path, render_pool, make_app, add_users):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'invoices.db'}", INVOICE_RENDER_WAIT_SECONDS=30)
+    register_routes(app.api.namespace('invoices', path='/api/invoices'))
+    app.config['TOKENS'] = add_users(app, {1: 'client', 2: 'freelancer', 3: 'client'})
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1, company_name='Acme <Ltd>'),
+            FreelancerProfile(id=20, user_id=2),
+            Project(id=1, client_id=10, freelancer_id=20, status='active', title='Site'),
+            Milestone(id=1, project_id=1, title='Design', amount=Decimal('250.00'), status='approved'),
+            Invoice(id=1, milestone_id=1, amount=Decimal('250.00'), status='pending'),
+        ])
+        db.session.commit()
+    return app
+
+
+def download(app, user_id=1, **headers):
+    headers['Authorization'] = f"Bearer {app.config['TOKENS'][user_id]}"
+    return app.test_client().get('/api/invoices/invoices/1/document', headers=headers)
+
+
+def stored_hash(app):
+    # The render is stored from the pool's callback thread; wait for it
+    for _ in range(100):
+        with app.app_context():
+            doc = InvoiceDocument.query.filter_by(invoice_id=1, format='html').first()
+            if doc is not None:
+                return doc.content_hash
+        time.sleep(0.05)
+    raise AssertionError('document was not stored')
+
+
+def test_renders_once_and_serves_repeats_from_the_cache(invoice_app, monkeypatch):
+    first = download(invoice_app)
+    assert first.status_code == 200
+    assert first.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert b'Design' in first.data and b'Acme &lt;Ltd&gt;' in first.data
+    etag = first.headers['ETag'].strip('"')
+    assert stored_hash(invoice_app) == etag
+
+    def no_render(*args, **kwargs):
+        raise AssertionError('cached document was rendered again')
+
+    monkeypatch.setattr(renderer, 'submit', no_render)
+    repeat = download(invoice_app, user_id=2)
+    assert repeat.status_code == 200 and repeat.data == first.data
+    assert download(invoice_app, **{'If-None-Match': f'"{etag}"'}).status_code == 304
+    assert download(invoice_app, user_id=3).status_code == 403
+
+
+def test_changed_inputs_are_rendered_again(invoice_app):
+    etag = download(invoice_app).headers['ETag']
+    stored_hash(invoice_app)
+    with invoice_app.app_context():
+        db.session.get(Milestone, 1).title = 'Design and build'
+        db.session.commit()
+
+    changed = download(invoice_app)
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag and b'Design and build' in changed.data
+    for _ in range(100):
+        if stored_hash(invoice_app) == changed.headers['ETag'].strip('"'):
+            break
+        time.sleep(0.05)
+    with invoice_app.app_context():
+        assert InvoiceDocument.query.count() == 1
+
+
+def test_document_hash_covers_format_and_contents():
+    inputs = {'invoice': {'id': 1, 'amount': '10.00'}}
+    assert document_hash(inputs, 'html') == document_hash({'invoice': {'amount': '10.00', 'id': 1}}, 'html')
+    assert document_hash(inputs, 'html') != document_hash(inputs, 'pdf')
+    assert document_hash(inputs, 'html') != document_hash({'invoice': {'id': 1, 'amount': '11.00'}}, 'html')
+
+
+def test_render_stays_shared_until_it_is_stored(render_pool):
+    stored = []
+
+    def on_done(body):
+        stored.append(('k' in render_pool._in_flight, threading.current_thread().name))
+
+    inputs = {'invoice': {'id': 7}, 'freelancer': {}, 'client': {}, 'project': {}, 'milestone': {}}
+    future = render_pool.submit('k', inputs, 'html', on_done=on_done)
+    assert b'Invoice #7' in future.result(30)
+    for _ in range(100):
+        if stored and 'k' not in render_pool._in_flight:
+            break
+        time.sleep(0.05)
+    [(shared, thread)] = stored
+    assert shared and thread.startswith('invoice-store')
+    assert 'k' not in render_pool._in_flight
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from src.cli import init_cli
+from src.extensions import db
+from src.models import ClientProfile, Invoice, Milestone, Project
+from src.models.invoice import generate_milestone_invoices
+
+
+@pytest.fixture
+def billing_app(make_app, add_users):
+    app = make_app(INVOICE_DUE_DAYS=30)
+    init_cli(app)
+    add_users(app, {1: 'client'})
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            Project(id=1, client_id=10, status='active'),
+            Milestone(id=1, project_id=1, status='approved', amount=Decimal('100')),
+            Milestone(id=2, project_id=1, status='approved', amount=Decimal('40.50')),
+            Milestone(id=3, project_id=1, status='submitted', amount=Decimal('70')),
+            Milestone(id=4, project_id=1, status='approved', amount=Decimal('10')),
+            Invoice(id=1, milestone_id=4, amount=Decimal('10'), status='paid'),
+        ])
+        db.session.commit()
+    return app
+
+
+def test_invoices_each_approved_milestone_once(billing_app):
+    with billing_app.app_context():
+        assert generate_milestone_invoices(due_days=14, now=datetime(2026, 10, 31, 18)) == 2
+        db.session.commit()
+        invoices = {i.milestone_id: i for i in Invoice.query.all()}
+        assert sorted(invoices) == [1, 2, 4]
+        assert invoices[2].amount == Decimal('40.50')
+        assert (invoices[1].status, invoices[1].due_date) == ('pending', date(2026, 11, 14))
+        assert invoices[4].status == 'paid'
+
+        assert generate_milestone_invoices() == 0
+
+
+def test_cli_command_uses_configured_terms(billing_app):
+    result = billing_app.test_cli_runner().invoke(args=['invoices', 'generate'])
+    assert result.output.strip() == 'Created 2 invoices'
+    with billing_app.app_context():
+        invoice = Invoice.query.filter_by(milestone_id=1).one()
+        assert (invoice.due_date - invoice.generated_at.date()).days == 30
+    result = billing_app.test_cli_runner().invoke(args=['invoices', 'generate'])
+    assert result.output.strip() == 'Created 0 invoices'
+
+
+def test_generation_is_one_insert_select_statement(billing_app):
+    with billing_app.app_context():
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            generate_milestone_invoices()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    assert len(statements) == 1
+    assert statements[0].startswith('INSERT INTO invoices') and 'ON CONFLICT (milestone_id) DO NOTHING' in statements[0]
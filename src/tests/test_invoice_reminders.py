@@ -0,0 +1,115 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.cli import init_cli
+from src.extensions import db, mail
+from src import invoice_reminders
+from src.invoice_reminders import send_invoice_reminders, sweep_overdue_invoices
+from src.models import ClientProfile, Invoice, InvoiceReminder, Milestone, Project
+
+
+@pytest.fixture
+def reminder_app(make_app, add_users):
+    app = make_app(TESTING=True, MAIL_DEFAULT_SENDER='billing@example.com')
+    mail.init_app(app)
+    init_cli(app)
+    add_users(app, {1: 'client', 2: 'client'}, {1: 'a@example.com', 2: 'b@example.com'})
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            ClientProfile(id=20, user_id=2),
+            Project(id=1, client_id=10, status='active', title='Site'),
+            Project(id=2, client_id=10, status='active', title='App'),
+            Project(id=3, client_id=20, status='active', title='Logo'),
+            *[Milestone(id=n, project_id=p, status='approved') for n, p in ((1, 1), (2, 2), (3, 3), (4, 1), (5, 3))],
+            Invoice(id=1, milestone_id=1, amount=Decimal('100'), status='pending', due_date=date(2026, 10, 1)),
+            Invoice(id=2, milestone_id=2, amount=Decimal('50.25'), status='pending', due_date=date(2026, 10, 9)),
+            Invoice(id=3, milestone_id=3, amount=Decimal('30'), status='pending', due_date=date(2026, 10, 5)),
+            Invoice(id=4, milestone_id=4, amount=Decimal('70'), status='pending', due_date=date(2026, 10, 10)),
+            Invoice(id=5, milestone_id=5, amount=Decimal('20'), status='paid', due_date=date(2026, 9, 1)),
+        ])
+        db.session.commit()
+    return app
+
+
+def test_sweep_marks_overdue_and_queues_one_digest_per_client(reminder_app):
+    with reminder_app.app_context():
+        assert sweep_overdue_invoices(today=date(2026, 10, 10)) == (3, 2)
+        db.session.commit()
+        statuses = dict(db.session.query(Invoice.id, Invoice.status))
+        assert statuses == {1: 'overdue', 2: 'overdue', 3: 'overdue', 4: 'pending', 5: 'paid'}
+        digests = {r.client_id: r for r in InvoiceReminder.query.all()}
+        assert [i['id'] for i in digests[10].invoices] == [1, 2]
+        assert digests[10].total == Decimal('150.25')
+        assert [i['project'] for i in digests[20].invoices] == ['Logo']
+
+        # Already overdue invoices aren't swept (or reminded about) again
+        assert sweep_overdue_invoices(today=date(2026, 10, 10)) == (0, 0)
+
+
+def test_digests_are_mailed_once(reminder_app):
+    with reminder_app.app_context():
+        sweep_overdue_invoices(today=date(2026, 10, 10))
+        db.session.commit()
+        with mail.record_messages() as outbox:
+            sent, failed, _ = send_invoice_reminders()
+            assert (sent, failed) == (2, 0)
+            assert send_invoice_reminders()[:2] == (0, 0)
+        assert sorted(m.recipients[0] for m in outbox) == ['a@example.com', 'b@example.com']
+        assert '150.25' in next(m.html for m in outbox if m.recipients == ['a@example.com'])
+        assert InvoiceReminder.query.filter(InvoiceReminder.sent_at.is_(None)).count() == 0
+
+
+def test_digests_are_mailed_outside_the_claim_and_recorded_one_by_one(reminder_app, monkeypatch):
+    mailed = []
+
+    def send(email, invoices, total):
+        # The claim is committed before any mail goes out: no row locks held
+        assert not db.session().in_transaction()
+        if mailed:
+            raise RuntimeError('worker killed')
+        mailed.append(email)
+        return True
+
+    monkeypatch.setattr(invoice_reminders, 'send_overdue_invoices_email', send)
+    with reminder_app.app_context():
+        sweep_overdue_invoices(today=date(2026, 10, 10))
+        db.session.commit()
+        with pytest.raises(RuntimeError):
+            send_invoice_reminders()
+        db.session.rollback()
+
+        digests = {r.client_id: r for r in InvoiceReminder.query.all()}
+        assert mailed == ['a@example.com']
+        assert digests[10].sent_at is not None
+        assert digests[20].sent_at is None and digests[20].claimed_at is not None
+        assert [d.attempts for d in digests.values()] == [1, 1]
+
+        # Still claimed by the dead run until its lease lapses; the mailed one is never resent
+        assert send_invoice_reminders()[:2] == (0, 0)
+        mailed.clear()
+        monkeypatch.setattr(invoice_reminders, 'send_overdue_invoices_email',
+                            lambda email, *_: mailed.append(email) or True)
+        assert send_invoice_reminders(lease=0)[:2] == (1, 0)
+        assert mailed == ['b@example.com']
+
+
+def test_failed_digests_are_released_for_the_next_run(reminder_app, monkeypatch):
+    monkeypatch.setattr(invoice_reminders, 'send_overdue_invoices_email', lambda *_: False)
+    with reminder_app.app_context():
+        sweep_overdue_invoices(today=date(2026, 10, 10))
+        db.session.commit()
+        assert send_invoice_reminders()[:2] == (0, 2)
+        assert send_invoice_reminders(max_attempts=2)[:2] == (0, 2)
+        assert send_invoice_reminders(max_attempts=2)[:2] == (0, 0)
+        assert [r.claimed_at for r in InvoiceReminder.query.all()] == [None, None]
+
+
+def test_cli_sweeps_and_sends(reminder_app):
+    with mail.record_messages() as outbox:
+        result = reminder_app.test_cli_runner().invoke(args=['invoices', 'sweep-overdue'])
+    assert result.exit_code == 0, result.output
+    assert 'Sent 2 reminders (0 failed)' in result.output
+    assert len(outbox) == 2
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src import jobs
+from src.extensions import db
+from src.jobs import Worker, claim_jobs, claim_statement, enqueue, job_handler, renew_claim, run_job
+from src.models import BackgroundJob, ClientProfile, Payment
+from src.models.background_job import LANES
+from src.routes import payments
+
+
+@pytest.fixture
+def jobs_app(make_app):
+    app = make_app(JOB_MAX_ATTEMPTS=2, JOB_BACKOFF_SECONDS=10, JOB_POLL_INTERVAL=0)
+    # Mounted the way create_app does
+    payments.register_routes(app.api.namespace('client/payments', path='/api/client/payments'))
+    return app
+
+
+@pytest.fixture
+def client_tokens(jobs_app, add_users):
+    tokens = add_users(jobs_app, {1: 'client', 2: 'client'})
+    with jobs_app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            ClientProfile(id=20, user_id=2),
+            Payment(id=1, client_id=10, amount=Decimal('10'), status='pending', transaction_id='tx-9'),
+        ])
+        db.session.commit()
+    return {user_id: {'Authorization': f'Bearer {token}'} for user_id, token in tokens.items()}
+
+
+@pytest.fixture
+def calls():
+    seen = []
+    job_handler('test.record')(lambda **payload: seen.append(payload))
+
+    @job_handler('test.flaky')
+    def flaky(n):
+        seen.append(n)
+        raise RuntimeError('gateway down')
+
+    yield seen
+    jobs.HANDLERS.pop('test.record')
+    jobs.HANDLERS.pop('test.flaky')
+
+
+def test_claims_take_the_most_urgent_ready_jobs(jobs_app):
+    with jobs_app.app_context():
+        low = enqueue('test.record', {'n': 1}, lane='low')
+        default = enqueue('test.record', {'n': 2})
+        high = enqueue('test.record', {'n': 3}, lane='high')
+        enqueue('test.record', {'n': 4}, lane='high', delay=60)
+        claimed = claim_jobs('w1', limit=2, now=datetime.utcnow() + timedelta(seconds=1))
+        assert [job.id for job in claimed] == [high, default]
+        assert {job.attempts for job in claimed} == {1}
+        assert [job.id for job in claim_jobs('w2', lanes=['low', 'default'])] == [low]
+
+
+def test_claim_is_one_update_over_skip_locked_rows():
+    stmt = claim_statement('w1', 10, 300, ['high'], datetime(2026, 10, 19))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith('UPDATE background_jobs SET')
+    assert 'ORDER BY background_jobs.priority, background_jobs.run_at, background_jobs.id' in sql
+    assert 'FOR UPDATE SKIP LOCKED)' in sql and 'RETURNING' in sql
+
+
+def test_visibility_timeout_makes_abandoned_jobs_claimable_again(jobs_app):
+    with jobs_app.app_context():
+        job_id = enqueue('test.record', {'n': 1})
+        now = datetime.utcnow() + timedelta(seconds=1)
+        assert len(claim_jobs('crashed', visibility_timeout=30, now=now)) == 1
+        assert claim_jobs('w2', now=now + timedelta(seconds=29)) == []
+        [job] = claim_jobs('w2', now=now + timedelta(seconds=31))
+        assert (job.id, job.attempts) == (job_id, 2)
+
+
+
+def test_each_job_of_a_batch_gets_a_full_visibility_timeout(jobs_app, calls, monkeypatch):
+    later = datetime.utcnow() + timedelta(seconds=400)
+
+    @job_handler('test.slow')
+    def slow():
+        # Outlasts the timeout the whole batch was claimed with
+        monkeypatch.setattr(jobs, '_now', lambda: later)
+
+    with jobs_app.app_context():
+        enqueue('test.slow', lane='high')
+        enqueue('test.record', {'n': 1})
+        db.session.commit()
+        job_handler('test.record')(lambda n: calls.append(claim_jobs('w2', now=later)))
+        try:
+            assert Worker(jobs_app).run_once() == 2
+        finally:
+            jobs.HANDLERS.pop('test.slow')
+        assert calls == [[]]
+
+
+def test_a_reclaimed_job_is_not_renewed_by_its_old_worker(jobs_app):
+    with jobs_app.app_context():
+        enqueue('test.record', {'n': 1})
+        now = datetime.utcnow() + timedelta(seconds=1)
+        [job] = claim_jobs('crashed', visibility_timeout=30, now=now)
+        assert len(claim_jobs('w2', now=now + timedelta(seconds=31))) == 1
+        assert renew_claim(job, 'crashed', 30) is False
+
+
+def test_enqueue_with_key_dedupes_unfinished_jobs(jobs_app, calls):
+    with jobs_app.app_context():
+        first = enqueue('test.record', {'n': 1}, key='tx-1')
+        assert enqueue('test.record', {'n': 1}, key='tx-1') is None
+        db.session.commit()
+        assert Worker(jobs_app).run_once() == 1
+        assert calls == [{'n': 1}]
+        assert db.session.get(BackgroundJob, first).status == 'done'
+        assert enqueue('test.record', {'n': 1}, key='tx-1') not in (None, first)
+
+
+def test_failures_back_off_then_fail(jobs_app, calls):
+    with jobs_app.app_context():
+        job_id = enqueue('test.flaky', {'n': 7})
+        db.session.commit()
+        assert Worker(jobs_app).run_once() == 1
+        job = db.session.get(BackgroundJob, job_id)
+        assert (job.status, job.attempts, job.last_error) == ('queued', 1, 'RuntimeError: gateway down')
+        assert job.run_at >= datetime.utcnow() + timedelta(seconds=4)
+
+        [claimed] = claim_jobs('w1', now=job.run_at)
+        db.session.commit()
+        assert run_job(claimed, 'w1') is False
+        db.session.refresh(job)
+        assert (job.status, job.attempts, job.locked_by) == ('failed', 2, None)
+        assert job.finished_at is not None and calls == [7, 7]
+
+
+def test_payment_verification_is_enqueued_and_run_by_a_worker(jobs_app, client_tokens, monkeypatch):
+    client = jobs_app.test_client()
+    owner = client_tokens[1]
+    assert client.get('/api/client/payments/verify/tx-9', headers=owner).status_code == 202
+    assert client.get('/api/client/payments/verify/tx-9', headers=owner).status_code == 202
+    with jobs_app.app_context():
+        # Repeat polls share one queued job
+        [job] = BackgroundJob.query.all()
+        assert (job.kind, job.priority, job.payload) == ('verify_payment', LANES['high'], {'tx_ref': 'tx-9'})
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'status': 'success', 'data': {'status': 'successful'}}
+
+    monkeypatch.setattr(payments.requests, 'get', lambda *args, **kwargs: Response())
+    assert Worker(jobs_app).run_once() == 1
+    resp = client.get('/api/client/payments/verify/tx-9', headers=owner)
+    assert resp.status_code == 200 and resp.get_json()['status'] == 'successful'
+
+
+def test_payment_verification_is_only_for_the_paying_client(jobs_app, client_tokens):
+    client = jobs_app.test_client()
+    assert client.get('/api/client/payments/verify/tx-9').status_code == 401
+    assert client.get('/api/client/payments/verify/tx-9', headers=client_tokens[2]).status_code == 404
+    with jobs_app.app_context():
+        assert BackgroundJob.query.count() == 0
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+from src.extensions import db
+from src.metrics import init_metrics, route_labels
+
+ROOT = Path(__file__).resolve().parents[2]
+
+WORKER = """
+from src.metrics import REQUEST_COUNT, WORKER_UP
+WORKER_UP.set(1)
+REQUEST_COUNT.labels('client', '/payments', 'GET', '200').inc({count})
+"""
+
+
+@pytest.fixture
+def metrics_app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', METRICS_TOKEN='scrape')
+    db.init_app(app)
+    init_metrics(app)
+    return app
+
+
+def run_worker(directory, count):
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(directory)}
+    subprocess.run([sys.executable, '-c', WORKER.format(count=count)], cwd=ROOT, env=env, check=True)
+
+
+def scrape(app):
+    resp = app.test_client().get('/metrics', headers={'Authorization': 'Bearer scrape'})
+    assert resp.status_code == 200
+    return resp.get_data(as_text=True)
+
+
+def test_route_labels_use_the_longest_namespace_prefix():
+    prefixes = [('/api/client/payments', 'payments'), ('/api/client', 'client')]
+    assert route_labels('/api/client/payments/<int:payment_id>', prefixes) == ('payments', '/<int:payment_id>')
+    assert route_labels('/api/client', prefixes) == ('client', '/')
+    assert route_labels('/api/admin/users', prefixes) == ('admin', '/users')
+    assert route_labels(None, prefixes) == ('unmatched', '')
+
+
+def test_metrics_requires_the_token(metrics_app):
+    assert metrics_app.test_client().get('/metrics').status_code == 401
+
+
+def test_scrape_merges_every_worker_process(metrics_app, tmp_path, monkeypatch):
+    run_worker(tmp_path, 2)
+    run_worker(tmp_path, 3)
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    body = scrape(metrics_app)
+    assert ('http_requests_total{method="GET",namespace="client",resource="/payments",status="200"} 5.0'
+            in body)
+    assert body.count('app_worker_up{pid=') == 2
+
+
+def test_scrape_uses_the_process_registry_without_a_multiprocess_dir(metrics_app, monkeypatch):
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    assert 'db_pool_checkouts_total' in scrape(metrics_app)
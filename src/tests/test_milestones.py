@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+import pytest
+
+from src.extensions import db
+from src.models import ClientProfile, FreelancerProfile, Milestone, MilestoneProgress, Project
+from src.models.milestone_progress import refresh_milestone_progress
+from src.routes.milestone import api as milestones_ns
+
+
+@pytest.fixture
+def milestone_app(make_app, add_users):
+    app = make_app({'/api/milestones': milestones_ns})
+    app.config['TOKENS'] = add_users(app, {1: 'client', 2: 'client', 3: 'freelancer'})
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            ClientProfile(id=20, user_id=2),
+            FreelancerProfile(id=30, user_id=3),
+            Project(id=1, client_id=10, freelancer_id=30, status='active'),
+            Project(id=2, client_id=20, status='active'),
+        ])
+        db.session.commit()
+    return app
+
+
+def call(app, method, path, user_id=1, **kwargs):
+    headers = {'Authorization': f"Bearer {app.config['TOKENS'][user_id]}"}
+    return getattr(app.test_client(), method)(f'/api/milestones{path}', headers=headers, **kwargs)
+
+
+def create(app, project_id=1, amount=100, user_id=1):
+    resp = call(app, 'post', '/', user_id, json={
+        'project_id': project_id, 'title': 'M', 'description': 'd', 'due_date': '2030-01-01', 'amount': amount
+    })
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()['data']['id']
+
+
+def progress(app, project_id=1):
+    with app.app_context():
+        row = db.session.get(MilestoneProgress, project_id)
+        return {c: getattr(row, c) for c in ('total', 'approved', 'pending', 'amount_approved', 'amount_remaining')}
+
+
+def test_handlers_keep_the_progress_rollup_current(milestone_app):
+    first = create(milestone_app, amount=100)
+    second = create(milestone_app, amount=40)
+    assert progress(milestone_app) == {'total': 2, 'approved': 0, 'pending': 2,
+                                       'amount_approved': 0, 'amount_remaining': Decimal('140')}
+
+    assert call(milestone_app, 'put', f'/{first}', json={'status': 'submitted'}).status_code == 200
+    assert call(milestone_app, 'put', f'/{first}/approve').status_code == 200
+    assert call(milestone_app, 'put', f'/{second}', json={'status': 'submitted', 'amount': 50}).status_code == 200
+    assert call(milestone_app, 'put', f'/{second}/reject', json={'feedback': 'redo'}).status_code == 200
+    assert progress(milestone_app) == {'total': 2, 'approved': 1, 'pending': 1,
+                                       'amount_approved': Decimal('100'), 'amount_remaining': Decimal('50')}
+
+    assert call(milestone_app, 'delete', f'/{first}').status_code == 200
+    expected = {'total': 1, 'approved': 0, 'pending': 1, 'amount_approved': 0, 'amount_remaining': Decimal('50')}
+    assert progress(milestone_app) == expected
+
+    with milestone_app.app_context():
+        refresh_milestone_progress([1])
+        db.session.commit()
+    assert progress(milestone_app) == expected
+
+
+def test_list_is_scoped_through_the_users_profile(milestone_app):
+    own = create(milestone_app, project_id=1)
+    create(milestone_app, project_id=2, user_id=2)
+
+    for user_id in (1, 3):
+        resp = call(milestone_app, 'get', '/', user_id)
+        assert resp.status_code == 200
+        assert [m['id'] for m in resp.get_json()['data']] == [own]
+
+
+def test_only_the_project_client_can_change_milestones(milestone_app):
+    milestone_id = create(milestone_app)
+    assert call(milestone_app, 'delete', f'/{milestone_id}', user_id=2).status_code == 403
+    with milestone_app.app_context():
+        assert db.session.get(Milestone, milestone_id) is not None
@@ -0,0 +1,126 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.extensions import db
+from src.models import ClientProfile, FreelancerProfile, Project, ProjectApplication, Review
+from src.models.project_application import apply_statement
+from src.routes import freelancer
+from src.routes.projects import api as projects_ns
+
+
+@pytest.fixture
+def applications_app(make_app, add_users):
+    app = make_app({'/api/projects': projects_ns})
+    freelancers = {2 + n: 'freelancer' for n in range(3)}
+    app.config['TOKEN'] = add_users(app, {1: 'client', **freelancers},
+                                    {user_id: f'f{user_id - 2}@example.com' for user_id in freelancers})[1]
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            Project(id=1, client_id=10, status='posted'),
+        ])
+        for n in range(3):
+            db.session.add_all([
+                FreelancerProfile(id=20 + n, user_id=2 + n),
+                # A past project per freelancer, reviewed by the client with rating n + 3
+                Project(id=100 + n, client_id=10, freelancer_id=20 + n, status='completed'),
+                Review(project_id=100 + n, reviewer_id=1, rating=n + 3),
+            ])
+        db.session.flush()
+        db.session.add_all([
+            ProjectApplication(id=1, project_id=1, freelancer_id=20, bid_amount=Decimal('300'),
+                               proposal='x' * 500, applied_at=datetime(2030, 1, 1)),
+            ProjectApplication(id=2, project_id=1, freelancer_id=21, bid_amount=Decimal('100'),
+                               proposal='short', applied_at=datetime(2030, 1, 3)),
+            ProjectApplication(id=3, project_id=1, freelancer_id=22, bid_amount=Decimal('200'),
+                               proposal='mid', applied_at=datetime(2030, 1, 2)),
+        ])
+        db.session.commit()
+    return app
+
+
+def list_applications(app, query=''):
+    headers = {'Authorization': f"Bearer {app.config['TOKEN']}"}
+    return app.test_client().get(f'/api/projects/1/applications{query}', headers=headers)
+
+
+def test_applications_count_follows_inserts_and_deletes(applications_app):
+    with applications_app.app_context():
+        assert db.session.get(Project, 1).applications_count == 3
+        db.session.delete(db.session.get(ProjectApplication, 2))
+        db.session.commit()
+        project = db.session.get(Project, 1)
+        assert (project.applications_count, project.completed_at) == (2, None)
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', [2, 3, 1]),
+    ('?sort=bid&order=asc', [2, 3, 1]),
+    ('?sort=rating', [3, 2, 1]),
+    ('?sort=applied_at&order=asc&per_page=2&page=2', [2]),
+])
+def test_applications_are_sorted_and_paginated(applications_app, query, expected):
+    resp = list_applications(applications_app, query)
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [a['application_id'] for a in body['data']] == expected
+    assert body['pagination']['total'] == 3
+
+
+def test_list_returns_proposal_preview_unless_requested(applications_app):
+    data = list_applications(applications_app, '?sort=bid&order=desc').get_json()['data']
+    assert data[0]['proposal'] == 'x' * 200
+    assert data[0]['freelancer'] == {'id': 20, 'user_id': 2, 'email': 'f0@example.com',
+                                     'hourly_rate': None, 'rating': 3.0}
+    data = list_applications(applications_app, '?sort=bid&order=desc&include=proposal').get_json()['data']
+    assert data[0]['proposal'] == 'x' * 500
+
+
+def test_unknown_sort_is_rejected(applications_app):
+    assert list_applications(applications_app, '?sort=name').status_code == 400
+
+
+def test_apply_is_one_update_over_an_insert_cte():
+    sql = str(apply_statement(1, 20, 'hi', Decimal('10')).compile(dialect=postgresql.dialect()))
+    assert sql.startswith('WITH open_project AS') and 'ON CONFLICT (project_id, freelancer_id) DO NOTHING' in sql
+    assert 'applications_count=(projects.applications_count + (SELECT count(*) AS count_1 \nFROM inserted))' in sql
+    assert 'RETURNING projects.status' in sql
+
+
+@pytest.fixture
+def apply_app(monkeypatch, make_app, add_users, make_token):
+    app = make_app({'/api/freelancer': freelancer.ns})
+    add_users(app, {2: 'freelancer'}, {2: 'f0@example.com'})
+    with app.app_context():
+        db.session.add(FreelancerProfile(id=20, user_id=2))
+        db.session.commit()
+    # routes/freelancer.py expects email identities and a role claim
+    app.config['TOKEN'] = make_token(app, 'f0@example.com', role='freelancer')
+    app.calls = []
+
+    def outcome(result):
+        def fake(*args, **kwargs):
+            app.calls.append((args, kwargs))
+            return result
+        monkeypatch.setattr(freelancer, 'apply_to_project', fake)
+    app.outcome = outcome
+    return app
+
+
+@pytest.mark.parametrize('result, status', [
+    ((None, None), 404),        # no such project
+    (('active', None), 404),    # not open for applications
+    (('posted', None), 400),    # already applied
+    (('posted', 7), 201),
+])
+def test_apply_to_project_responses(apply_app, result, status):
+    apply_app.outcome(result)
+    resp = apply_app.test_client().post('/api/freelancer/projects/1/apply', json={'proposal': 'hi', 'bid_amount': 10},
+                                        headers={'Authorization': f"Bearer {apply_app.config['TOKEN']}"})
+    assert resp.status_code == status
+    assert apply_app.calls == [((1, 20), {'proposal': 'hi', 'bid_amount': 10})]
+    if status == 201:
+        assert resp.get_json()['application_id'] == 7
@@ -0,0 +1,106 @@
+"""Replica routing, using two local SQLite files as primary and replica.
+
+Each database holds a marker row naming itself, so a handler can tell which
+one served its read. The fixture isn't called ``app`` so pytest-flask doesn't
+hold a request context (and its ``g``) open across the test's requests.
+"""
+import pytest
+import sqlalchemy as sa
+
+from src.extensions import db
+from src import replicas
+from src.replicas import init_read_replicas, read_only, use_primary
+
+marker = sa.Table('routing_marker', sa.MetaData(), sa.Column('name', sa.String(20)))
+
+
+@pytest.fixture
+def routed_app(tmp_path, make_app):
+    replicas._recent_writers.clear()
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+        SQLALCHEMY_BINDS={'replica_0': f"sqlite:///{tmp_path / 'replica.db'}"},
+        DB_PRIMARY_PIN_SECONDS=60,
+    )
+    init_read_replicas(app)
+
+    with app.app_context():
+        for name, engine in (('primary', db.engines[None]), ('replica', db.engines['replica_0'])):
+            marker.create(engine)
+            with engine.begin() as conn:
+                conn.execute(marker.insert().values(name=name))
+
+    def served_by():
+        return db.session.execute(sa.select(marker.c.name)).scalar()
+
+    @app.get('/read')
+    def read():
+        return {'db': served_by()}
+
+    @app.get('/read-primary')
+    @use_primary
+    def read_primary():
+        return {'db': served_by()}
+
+    @app.post('/search')
+    @read_only
+    def search():
+        return {'db': served_by()}
+
+    @app.post('/write')
+    def write():
+        db.session.execute(marker.insert().values(name='written'))
+        db.session.commit()
+        return {'db': served_by()}
+
+    return app
+
+
+@pytest.fixture
+def token_for(make_token):
+    def headers(app, user_id):
+        return {'Authorization': f'Bearer {make_token(app, user_id)}'}
+    return headers
+
+
+def test_get_reads_from_replica(routed_app):
+    assert routed_app.test_client().get('/read').get_json()['db'] == 'replica'
+
+
+def test_use_primary_keeps_get_on_primary(routed_app):
+    assert routed_app.test_client().get('/read-primary').get_json()['db'] == 'primary'
+
+
+def test_read_only_routes_post_to_replica(routed_app):
+    assert routed_app.test_client().post('/search').get_json()['db'] == 'replica'
+
+
+def test_reads_after_a_write_stay_on_primary(routed_app):
+    assert routed_app.test_client().post('/write').get_json()['db'] == 'primary'
+
+
+def test_writer_is_pinned_to_primary(routed_app, token_for):
+    writer, other = token_for(routed_app, 1), token_for(routed_app, 2)
+    routed_app.test_client().post('/write', headers=writer)
+
+    # A fresh client (no pin cookie) is still pinned by JWT identity...
+    assert routed_app.test_client().get('/read', headers=writer).get_json()['db'] == 'primary'
+    # ...while other users keep reading from the replica.
+    assert routed_app.test_client().get('/read', headers=other).get_json()['db'] == 'replica'
+
+
+def test_pin_cookie_routes_anonymous_reads_to_primary(routed_app):
+    client = routed_app.test_client()
+    response = client.post('/write')
+    cookie = response.headers.get('Set-Cookie', '')
+    assert 'db_pin' in cookie and 'Secure' in cookie and 'SameSite=None' in cookie
+    assert client.get('/read').get_json()['db'] == 'primary'
+    assert routed_app.test_client().get('/read').get_json()['db'] == 'replica'
+
+
+def test_pin_expires(routed_app, monkeypatch, token_for):
+    headers = token_for(routed_app, 3)
+    routed_app.test_client().post('/write', headers=headers)
+    later = replicas.time.time() + 120
+    monkeypatch.setattr(replicas.time, 'time', lambda: later)
+    assert routed_app.test_client().get('/read', headers=headers).get_json()['db'] == 'replica'
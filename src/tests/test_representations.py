@@ -0,0 +1,47 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from flask import Flask
+
+from src import representations
+from src.representations import ENCODERS, output_json
+
+PAYLOAD = {
+    'amount': Decimal('12.50'),
+    'due_date': date(2030, 1, 1),
+    'paid_at': datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    'reference': UUID('12345678-1234-5678-1234-567812345678'),
+    'items': [1, 'two', None],
+}
+EXPECTED = {
+    'amount': 12.5,
+    'due_date': '2030-01-01',
+    'paid_at': '2030-01-02T03:04:05+00:00',
+    'reference': '12345678-1234-5678-1234-567812345678',
+    'items': [1, 'two', None],
+}
+
+
+@pytest.mark.parametrize('encoder', sorted(ENCODERS))
+def test_encoders_handle_decimal_dates_and_uuid(encoder):
+    assert json.loads(ENCODERS[encoder](PAYLOAD)) == EXPECTED
+
+
+@pytest.mark.skipif('orjson' not in ENCODERS, reason='orjson not installed')
+def test_orjson_falls_back_for_unsupported_values():
+    assert json.loads(ENCODERS['orjson']({'big': 2 ** 70})) == {'big': 2 ** 70}
+
+
+def test_output_json_uses_configured_encoder(monkeypatch):
+    calls = []
+    monkeypatch.setitem(representations.ENCODERS, 'json', lambda data, indent=None: calls.append(data) or b'{}')
+    app = Flask(__name__)
+    app.config['API_JSON_ENCODER'] = 'json'
+    with app.app_context():
+        response = output_json({'ok': True}, 201, {'X-Test': '1'})
+    assert calls == [{'ok': True}]
+    assert response.status_code == 201
+    assert response.headers['X-Test'] == '1'
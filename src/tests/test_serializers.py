@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+import pytest
+import sqlalchemy as sa
+
+from src.extensions import db, ma
+from src.models import ClientProfile, FreelancerProfile, Project, User
+from src.models.project import project_serializer
+from src import serializers
+from src.serializers import ModelSerializer, init_serializers, serialize
+
+
+@pytest.fixture
+def session_app(make_app):
+    app = make_app()
+    ma.init_app(app)
+    with app.app_context():
+        init_serializers(app)
+        user = User(email='client@example.com', role='client', password_hash='x', verification_token='secret')
+        db.session.add(user)
+        db.session.flush()
+        client = ClientProfile(user_id=user.id, company_name='Acme', industry='Software')
+        db.session.add(client)
+        db.session.flush()
+        db.session.add_all(Project(title=f'P{i}', budget=Decimal('10.50'), status='posted', client_id=client.id)
+                           for i in range(3))
+        db.session.commit()
+        yield app
+
+
+def count_statements(fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sa.event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = fn()
+    finally:
+        sa.event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, statements
+
+
+def test_secrets_are_never_serialized(session_app):
+    data = serialize(User.query.first())
+    assert 'password_hash' not in data and 'verification_token' not in data
+    assert data['email'] == 'client@example.com'
+
+
+def test_sparse_fieldset_limits_columns_and_skips_relationships(session_app):
+    fields, include = project_serializer.parse_fieldset('title,budget', None)
+    assert fields == ('id', 'title', 'budget') and include == ()
+
+    def run():
+        query = Project.query.options(*project_serializer.query_options(fields, include))
+        return project_serializer.dump_many(query.all(), include, fields)
+
+    rows, statements = count_statements(run)
+    assert rows[0] == {'id': rows[0]['id'], 'title': 'P0', 'budget': 10.5}
+    assert len(statements) == 1
+    assert 'description' not in statements[0]
+
+
+def test_include_eager_loads_in_the_same_query(session_app):
+    fields, include = project_serializer.parse_fieldset('title', 'client', {'client': 'client_details'})
+
+    def run():
+        query = Project.query.options(*project_serializer.query_options(fields, include))
+        return project_serializer.dump_many(query.all(), include, fields)
+
+    rows, statements = count_statements(run)
+    assert len(statements) == 1
+    assert rows[0]['client_details'] == {'id': rows[0]['client_details']['id'], 'company_name': 'Acme',
+                                         'industry': 'Software'}
+
+
+@pytest.mark.parametrize('fields_arg,include_arg', [('title,secret', None), ('password_hash', None), (None, 'milestones')])
+def test_unknown_fields_and_includes_are_rejected(fields_arg, include_arg):
+    with pytest.raises(ValueError):
+        project_serializer.parse_fieldset(fields_arg, include_arg)
+
+
+def test_sparse_fieldsets_share_compiled_functions_and_are_capped(monkeypatch):
+    monkeypatch.setattr(serializers, 'SUBSET_CACHE_SIZE', 2)
+    serializer = ModelSerializer(Project)
+    assert serializer._columns_for(('title', 'id')) is serializer._columns_for(('id', 'title', 'title'))
+    serializer._columns_for(('id', 'budget'))
+    serializer._columns_for(('id', 'status'))
+    assert list(serializer._subsets) == [('id', 'budget'), ('id', 'status')]
+    with pytest.raises(ValueError):
+        serializer._columns_for(('id', 'password_hash'))
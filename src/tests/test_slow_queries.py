@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from src import instrumentation
+from src.extensions import db
+from src.slow_queries import SlowQueryLog, fingerprint, init_slow_query_log, parameter_shape, slow_query_log
+
+SQLITE = SimpleNamespace(dialect=SimpleNamespace(name='sqlite'))
+
+
+def test_fingerprint_ignores_literals_placeholders_and_list_length():
+    key, normalised = fingerprint("SELECT * FROM users\n  WHERE id IN (1, 2, 3) AND email = 'a@b.c'")
+    assert normalised == 'select * from users where id in (?+) and email = ?'
+    assert fingerprint('select * from users where id in (%(id_1)s, %(id_2)s) and email = :email')[0] == key
+    assert fingerprint('SELECT * FROM projects WHERE id = 1')[0] != fingerprint('SELECT * FROM users WHERE id = 1')[0]
+
+
+def test_parameter_shape_keeps_types_not_values():
+    assert parameter_shape({'email': 'a@b.c', 'id': 3}, False) == {'email': 'str', 'id': 'int'}
+    assert parameter_shape([(1, 'x'), (2, 'y')], True) == ['int', 'str']
+    assert parameter_shape(None, False) is None
+
+
+def test_repeated_statements_share_one_entry():
+    log = SlowQueryLog(explain=False)
+    log.record(SQLITE, None, 'SELECT * FROM users WHERE id = ?', (1,), False, 0.25)
+    log.record(SQLITE, None, 'SELECT * FROM users WHERE id = ?', (2,), False, 0.5)
+    log.record(SQLITE, None, 'SELECT * FROM projects WHERE id = 9', (), False, 0.3)
+    users, projects = log.entries()
+    assert (users['count'], users['total_ms'], users['max_ms']) == (2, 750.0, 500.0)
+    assert users['parameter_shape'] == ['int']
+    assert (projects['count'], projects['plan']) == (1, None)
+
+
+def test_log_evicts_the_least_recently_seen_fingerprint():
+    log = SlowQueryLog(size=2, explain=False)
+    for table in ('users', 'projects', 'users', 'invoices'):
+        log.record(SQLITE, None, f'SELECT * FROM {table}', None, False, 0.2)
+    assert sorted(e['normalised'] for e in log.entries()) == ['select * from invoices', 'select * from users']
+
+
+@pytest.fixture
+def slow_app(make_app):
+    app = make_app(SLOW_QUERY_LOG=True, SLOW_QUERY_THRESHOLD_MS=0)
+    instrumentation.init_sql_instrumentation(app)
+    init_slow_query_log(app)
+    slow_query_log.clear()
+    yield app
+    instrumentation.set_slow_query_hook(None, None)
+    slow_query_log.clear()
+
+
+def test_statements_over_the_threshold_are_recorded_without_a_plan_off_postgres(slow_app):
+    with slow_app.app_context():
+        for n in range(3):
+            db.session.execute(text('SELECT :n'), {'n': n})
+    [entry] = [e for e in slow_query_log.entries() if e['normalised'] == 'select ?']
+    assert entry['count'] == 3 and entry['plan'] is None
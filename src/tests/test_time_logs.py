@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from src.extensions import db
+from src.models import ClientProfile, FreelancerProfile, Project, TimeLog
+from src.routes.time_logs import api as time_entries_ns
+
+
+@pytest.fixture
+def time_app(make_app, add_users):
+    app = make_app({'/api/time-entries': time_entries_ns}, TIME_LOG_BULK_MAX_ENTRIES=3000)
+    app.config['TOKENS'] = add_users(app, {1: 'client', 2: 'freelancer'})
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            FreelancerProfile(id=20, user_id=2),
+            Project(id=1, client_id=10, freelancer_id=20, status='active'),
+            Project(id=2, client_id=10, status='posted'),
+            TimeLog(id=1, project_id=1, freelancer_id=20,
+                    start_time=datetime(2026, 10, 1, 9), end_time=datetime(2026, 10, 1, 12)),
+        ])
+        db.session.commit()
+    return app
+
+
+def call(app, method, path, user_id=2, **kwargs):
+    headers = {'Authorization': f"Bearer {app.config['TOKENS'][user_id]}"}
+    return getattr(app.test_client(), method)(f'/api/time-entries{path}', headers=headers, **kwargs)
+
+
+def test_one_running_timer_per_freelancer(time_app):
+    resp = call(time_app, 'post', '/timer/start', json={'project_id': 1, 'description': 'api'})
+    assert resp.status_code == 201
+    timer_id = resp.get_json()['data']['id']
+    assert call(time_app, 'post', '/timer/start', json={'project_id': 1}).status_code == 409
+    assert call(time_app, 'post', '/timer/start', json={'project_id': 2}).status_code == 404
+    assert call(time_app, 'post', '/timer/start', 1, json={'project_id': 1}).status_code == 403
+    assert call(time_app, 'get', '/timer').get_json()['data']['id'] == timer_id
+
+    resp = call(time_app, 'post', '/timer/stop', json={})
+    assert resp.status_code == 200
+    assert resp.get_json()['data']['end_time'] is not None
+    assert call(time_app, 'post', '/timer/stop', json={}).status_code == 404
+    assert call(time_app, 'get', '/timer').get_json()['data'] is None
+    assert call(time_app, 'post', '/timer/start', json={'project_id': 1}).status_code == 201
+
+
+def test_forgotten_timer_is_capped_so_overlaps_are_still_found(time_app):
+    with time_app.app_context():
+        db.session.add(TimeLog(id=2, project_id=1, freelancer_id=20, start_time=datetime(2026, 9, 1, 9)))
+        db.session.commit()
+    resp = call(time_app, 'post', '/timer/stop', json={})
+    assert resp.get_json()['data']['end_time'].startswith('2026-09-02T09:00:00')
+
+    resp = call(time_app, 'post', '/bulk', json={'entries': [
+        {'project_id': 1, 'start_time': '2026-09-02T08:00:00', 'end_time': '2026-09-02T08:30:00'},
+        {'project_id': 1, 'start_time': '2026-09-02T09:00:00', 'end_time': '2026-09-02T10:00:00'},
+    ]})
+    assert [e['index'] for e in resp.get_json()['errors']] == [0]
+
+
+def test_bulk_reports_errors_per_row(time_app):
+    resp = call(time_app, 'post', '/bulk', json={'entries': [
+        {'project_id': 1, 'start_time': '2026-10-02T09:00:00Z', 'end_time': '2026-10-02T10:00:00Z'},
+        {'project_id': 2, 'start_time': '2026-10-02T11:00:00', 'end_time': '2026-10-02T12:00:00'},
+        {'project_id': 1, 'start_time': 'yesterday', 'end_time': '2026-10-02T12:00:00'},
+        {'project_id': 1, 'start_time': '2026-10-02T13:00:00', 'end_time': '2026-10-02T12:00:00'},
+        {'project_id': 1, 'start_time': '2026-10-01T11:00:00', 'end_time': '2026-10-01T13:00:00'},
+        {'project_id': 1, 'start_time': '2026-10-02T09:30:00+00:00', 'end_time': '2026-10-02T09:45:00+00:00'},
+        {'project_id': 1, 'start_time': '2026-10-02T12:00:00+02:00', 'end_time': '2026-10-02T12:30:00+02:00',
+         'description': 'review'},
+    ]})
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert body['inserted'] == 2
+    assert [e['index'] for e in body['errors']] == [1, 2, 3, 4, 5]
+    assert body['errors'][1]['message'] == 'start_time and end_time must be ISO 8601 timestamps'
+    assert body['errors'][3]['message'] == 'Overlaps time already logged'
+    assert body['errors'][4]['message'] == 'Overlaps entry 0'
+
+    with time_app.app_context():
+        assert db.session.get(TimeLog, 3).start_time == datetime(2026, 10, 2, 10)
+
+    # Resending the same batch doesn't double-count it
+    resend = call(time_app, 'post', '/bulk', json={'entries': [
+        {'project_id': 1, 'start_time': '2026-10-02T09:00:00Z', 'end_time': '2026-10-02T10:00:00Z'},
+    ]})
+    assert resend.status_code == 400
+    assert resend.get_json()['inserted'] == 0
+
+
+def test_bulk_inserts_thousands_of_rows_with_one_executemany(time_app):
+    entries = [
+        {'project_id': 1, 'start_time': f'2026-03-{1 + n // 100:02d}T{(n % 100) // 10:02d}:{(n % 10) * 5:02d}:00',
+         'end_time': f'2026-03-{1 + n // 100:02d}T{(n % 100) // 10:02d}:{(n % 10) * 5 + 4:02d}:00'}
+        for n in range(2500)
+    ]
+    with time_app.app_context():
+        engine = db.engine
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO time_logs'):
+            inserts.append(executemany)
+
+    event.listen(engine, 'before_cursor_execute', count_inserts)
+    try:
+        resp = call(time_app, 'post', '/bulk', json={'entries': entries})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_inserts)
+    assert resp.status_code == 201, resp.get_json()['errors'][:3]
+    assert resp.get_json()['inserted'] == 2500
+    assert inserts == [True]
+
+    too_many = call(time_app, 'post', '/bulk', json={'entries': entries + entries})
+    assert too_many.status_code == 413
+
+
+def test_bulk_locks_the_freelancer_before_checking_overlaps(time_app):
+    statements = []
+
+    def record(state):
+        statements.append(str(state.statement.compile(dialect=postgresql.dialect())))
+
+    with time_app.app_context():
+        event.listen(db.session, 'do_orm_execute', record)
+        try:
+            resp = call(time_app, 'post', '/bulk', json={'entries': [
+                {'project_id': 1, 'start_time': '2026-10-03T09:00:00', 'end_time': '2026-10-03T10:00:00'},
+            ]})
+        finally:
+            event.remove(db.session, 'do_orm_execute', record)
+    assert resp.status_code == 201
+    lock = next(i for i, s in enumerate(statements) if s.endswith('FOR UPDATE'))
+    overlaps = next(i for i, s in enumerate(statements) if 'FROM time_logs' in s)
+    assert 'FROM freelancer_profiles' in statements[lock] and lock < overlaps
+
+
+def test_bulk_rejects_entries_that_end_in_the_future(time_app):
+    later = datetime.utcnow() + timedelta(hours=1)
+    resp = call(time_app, 'post', '/bulk', json={'entries': [
+        {'project_id': 1, 'start_time': (later - timedelta(hours=2)).isoformat(), 'end_time': later.isoformat()},
+        {'project_id': 1, 'start_time': later.isoformat(), 'end_time': (later + timedelta(hours=1)).isoformat()},
+    ]})
+    assert resp.status_code == 400
+    assert [e['message'] for e in resp.get_json()['errors']] == ['Entry ends in the future'] * 2
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from werkzeug.datastructures import MultiDict
+
+from src.models import TimeLog, TimesheetDay
+from src.models.timesheet import week_start
+from src.routes.timesheets import api as timesheets_ns, report_range, shape_report, timesheet_query
+
+
+@pytest.fixture
+def timesheet_app(make_app, add_users):
+    app = make_app({'/api/timesheets': timesheets_ns}, TIMESHEET_MAX_DAYS=100)
+    app.config['TOKEN'] = add_users(app, {1: 'admin'})[1]
+    return app
+
+
+def get(app, query):
+    return app.test_client().get(f'/api/timesheets?{query}',
+                                 headers={'Authorization': f"Bearer {app.config['TOKEN']}"})
+
+
+def test_report_range_defaults_to_this_week_and_aligns_weeks():
+    today = datetime(2026, 10, 15, 13)  # a Thursday
+    assert week_start(today) == datetime(2026, 10, 12)
+    assert report_range(MultiDict(), today) == ('day', datetime(2026, 10, 12), datetime(2026, 10, 19))
+    assert report_range(MultiDict({'granularity': 'week', 'from': '2026-09-02', 'to': '2026-10-01'}), today) == \
+        ('week', datetime(2026, 8, 31), datetime(2026, 10, 5))
+    for args in ({'granularity': 'month'}, {'from': 'soon'}, {'from': '2026-10-02', 'to': '2026-10-01'}):
+        with pytest.raises(ValueError):
+            report_range(MultiDict(args), today)
+
+
+def test_report_validates_range_and_role(timesheet_app):
+    assert get(timesheet_app, 'granularity=hour').status_code == 400
+    assert get(timesheet_app, 'from=2026-01-01&to=2026-12-31').status_code == 400
+    assert get(timesheet_app, 'from=2026-10-01').status_code == 403
+
+
+def test_shape_report_keeps_empty_buckets():
+    rows = [
+        (datetime(2026, 10, 12), 1, 3600.0),
+        (datetime(2026, 10, 12), 2, 1800.4),
+        (datetime(2026, 10, 13), None, None),
+        (datetime(2026, 10, 14), 1, 600),
+    ]
+    report = shape_report(rows, 'day', datetime(2026, 10, 12), datetime(2026, 10, 15))
+    assert report['from'] == '2026-10-12' and report['to'] == '2026-10-14'
+    assert report['seconds'] == 6000
+    assert report['projects'] == {'1': 4200, '2': 1800}
+    assert [(b['start'], b['seconds']) for b in report['buckets']] == [
+        ('2026-10-12', 5400), ('2026-10-13', 0), ('2026-10-14', 600)]
+
+
+def test_report_is_one_statement_over_rollup_and_live_logs():
+    stmt = timesheet_query([TimeLog.freelancer_id == 5], [TimesheetDay.freelancer_id == 5], 'week',
+                           datetime(2026, 8, 31), datetime(2026, 10, 19), datetime(2026, 10, 18, 12))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert 'AS buckets(bucket) LEFT OUTER JOIN' in sql
+    assert 'JOIN LATERAL generate_series(date_trunc(' in sql
+    assert "date_trunc('week', anon_2.day)" in sql
+    assert 'FROM timesheet_days' in sql and 'FROM timesheet_rollup' in sql
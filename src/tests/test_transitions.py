@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from src.extensions import db
+from src.models import (
+    ClientProfile, FreelancerProfile, Milestone, MilestoneProgress, Project, ProjectApplication
+)
+from src.models.milestone_progress import refresh_milestone_progress
+from src.routes.milestone import api as milestones_ns
+from src.routes.projects import api as projects_ns
+
+
+@pytest.fixture
+def race_app(tmp_path, make_app, add_users):
+    app = make_app(
+        {'/api/milestones': milestones_ns, '/api/projects': projects_ns},
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'race.db'}",
+        # Statement-level transactions: like Postgres READ COMMITTED, a waiting
+        # UPDATE re-checks its WHERE clause against the winner's committed row.
+        SQLALCHEMY_ENGINE_OPTIONS={'isolation_level': 'AUTOCOMMIT',
+                                   'connect_args': {'timeout': 10, 'check_same_thread': False}})
+    app.config['TOKEN'] = add_users(app, {1: 'client', 2: 'freelancer', 3: 'freelancer'})[1]
+    with app.app_context():
+        db.session.add_all([
+            ClientProfile(id=10, user_id=1),
+            FreelancerProfile(id=20, user_id=2),
+            FreelancerProfile(id=30, user_id=3),
+            Project(id=1, client_id=10, status='active', freelancer_id=20),
+            Project(id=2, client_id=10, status='posted'),
+            Milestone(id=1, project_id=1, status='submitted', amount=Decimal('80')),
+            ProjectApplication(id=1, project_id=2, freelancer_id=20, status='pending'),
+            ProjectApplication(id=2, project_id=2, freelancer_id=30, status='pending'),
+        ])
+        db.session.commit()
+        refresh_milestone_progress([1])
+        db.session.commit()
+    return app
+
+
+def race(app, table, requests):
+    """Fires ``requests`` in parallel; every UPDATE on ``table`` waits until all
+    of them have done their reads, which is when read-then-write code races."""
+    barrier = threading.Barrier(len(requests))
+
+    def hold_update(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(f'UPDATE {table} '):
+            barrier.wait(timeout=10)
+
+    def send(request):
+        method, path, body = request
+        headers = {'Authorization': f"Bearer {app.config['TOKEN']}"}
+        return getattr(app.test_client(), method)(path, json=body, headers=headers)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', hold_update)
+    try:
+        with ThreadPoolExecutor(len(requests)) as pool:
+            return list(pool.map(send, requests))
+    finally:
+        event.remove(engine, 'before_cursor_execute', hold_update)
+
+
+def test_concurrent_approve_and_reject_only_one_wins(race_app):
+    responses = race(race_app, 'milestones', [
+        ('put', '/api/milestones/1/approve', {}),
+        ('put', '/api/milestones/1/reject', {'feedback': 'no'}),
+    ])
+    assert sorted(r.status_code for r in responses) == [200, 409]
+    winner = 'approved' if responses[0].status_code == 200 else 'rejected'
+    with race_app.app_context():
+        milestone = db.session.get(Milestone, 1)
+        assert (milestone.status, milestone.version) == (winner, 2)
+        assert db.session.get(MilestoneProgress, 1).approved == (1 if winner == 'approved' else 0)
+
+
+def test_concurrent_hires_only_one_wins(race_app):
+    responses = race(race_app, 'projects', [
+        ('post', '/api/projects/2/hire', {'freelancer_id': 20}),
+        ('post', '/api/projects/2/hire', {'freelancer_id': 30}),
+    ])
+    assert sorted(r.status_code for r in responses) == [200, 409]
+    winner = 20 if responses[0].status_code == 200 else 30
+    with race_app.app_context():
+        project = db.session.get(Project, 2)
+        assert (project.status, project.freelancer_id) == ('active', winner)
+        hired = ProjectApplication.query.filter_by(project_id=2, status='hired').all()
+        assert [a.freelancer_id for a in hired] == [winner]
+
+
+def test_stale_version_is_rejected(race_app):
+    headers = {'Authorization': f"Bearer {race_app.config['TOKEN']}"}
+    client = race_app.test_client()
+    resp = client.post('/api/projects/2/hire', json={'freelancer_id': 20, 'version': 7}, headers=headers)
+    assert resp.status_code == 409
+    resp = client.post('/api/projects/2/hire', json={'freelancer_id': 20, 'version': 1}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.get_json()['data']['version'] == 2
@@ -0,0 +1,55 @@
+"""Race-free status transitions without row locks.
+
+``transition`` moves a row from one status to another with a single
+conditional statement::
+
+    UPDATE milestones SET status = 'approved', version = version + 1
+    WHERE id = :id AND status = 'submitted' [AND version = :version]
+    RETURNING milestones.*
+
+The database evaluates the WHERE clause against the latest committed row,
+so when two requests race only one matches and the other gets no row back
+(no SELECT ... FOR UPDATE, no read-modify-write window). Handlers turn a
+missing row into a 409.
+
+Models with a ``version`` column (``version_id_col``) also get optimistic
+concurrency for ordinary ORM flushes: SQLAlchemy adds ``AND version = :old``
+to their UPDATEs and raises StaleDataError when someone else got there
+first. ``transition`` and set-based updates bump it via ``version_bump``.
+"""
+from sqlalchemy import update
+
+from .extensions import db
+
+
+def version_bump(model):
+    """``{'version': version + 1}`` for versioned models, ``{}`` otherwise."""
+    column = model.__mapper__.version_id_col
+    if column is None:
+        return {}
+    return {column.key: column + 1}
+
+
+def transition(model, ident, from_status, to_status, values=None, where=(), version=None):
+    """Conditionally sets ``status`` and returns the updated instance.
+
+    ``from_status`` is one status, several, or None for any. ``where`` adds
+    extra conditions (e.g. ``Project.freelancer_id.is_(None)``) and
+    ``version`` pins the row version the caller last saw. Returns None when
+    no row matched: it doesn't exist or another request changed it first.
+    Runs in the caller's transaction; the caller commits.
+    """
+    conditions = [model.id == ident, *where]
+    if isinstance(from_status, str):
+        conditions.append(model.status == from_status)
+    elif from_status is not None:
+        conditions.append(model.status.in_(from_status))
+    if version is not None:
+        conditions.append(model.__mapper__.version_id_col == version)
+
+    stmt = update(model).where(*conditions).values(
+        status=to_status, **(values or {}), **version_bump(model)
+    ).returning(model)
+    return db.session.execute(
+        stmt, execution_options={'synchronize_session': False, 'populate_existing': True}
+    ).scalar_one_or_none()
@@ -1,8 +1,12 @@
 import os
 from flask import url_for
 from flask_mail import Message
-from .extensions import mail
+from .extensions import db, mail
+from .jobs import job_handler
+from .metrics import track_external_call
+from .serializers import serializer_for
 from urllib.parse import quote
+from markupsafe import escape
 
 def send_verification_email(user, base_url):
     """Send email verification link to user"""
@@ -37,7 +41,8 @@ def send_verification_email(user, base_url):
             """
         )
 
-        mail.send(msg)
+        with track_external_call('smtp', 'verification_email'):
+            mail.send(msg)
         return True
     except Exception as e:
         logging.error(f"Error sending verification email to {user.email}: {str(e)}")
@@ -75,20 +80,69 @@ def send_password_reset_email(user, reset_token, base_url):
             """
         )
 
-        mail.send(msg)
+        with track_external_call('smtp', 'password_reset_email'):
+            mail.send(msg)
         return True
     except Exception as e:
         logging.error(f"Error sending password reset email to {user.email}: {str(e)}")
         return False
 
+@job_handler('send_verification_email')
+def send_verification_email_job(user_id, base_url):
+    """Background job: mail a new user their verification link (retried on failure)"""
+    from .models.user import User
+
+    user = db.session.get(User, user_id)
+    if user is None or user.is_verified:
+        return
+    if not send_verification_email(user, base_url):
+        raise RuntimeError(f"Verification email to {user.email} was not sent")
+
+def send_overdue_invoices_email(email, invoices, total):
+    """Send one digest covering all of a client's newly overdue invoices"""
+    import logging
+
+    try:
+        lines = ''.join(
+            f"""
+                <tr>
+                    <td style="padding: 6px 0;">#{invoice['id']} {escape(invoice.get('project') or '')}</td>
+                    <td style="padding: 6px 0;">{invoice['due_date']}</td>
+                    <td style="padding: 6px 0; text-align: right;">{invoice['amount']}</td>
+                </tr>"""
+            for invoice in invoices
+        )
+        msg = Message(
+            subject=f'{len(invoices)} overdue invoice(s) - Workforce Platform',
+            recipients=[email],
+            html=f"""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <h2 style="color: #333;">Invoices past their due date</h2>
+                <p>The following invoices are now overdue:</p>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><th style="text-align: left;">Invoice</th><th style="text-align: left;">Due</th>
+                        <th style="text-align: right;">Amount</th></tr>{lines}
+                </table>
+                <p><strong>Total outstanding: {total}</strong></p>
+            </div>
+            """
+        )
+
+        with track_external_call('smtp', 'overdue_invoices_email'):
+            mail.send(msg)
+        return True
+    except Exception as e:
+        logging.error(f"Error sending overdue invoices email to {email}: {str(e)}")
+        return False
+
 # Pagination utility
-def paginate_query(pagination, schema):
+def paginate_query(pagination, model, include=()):
     """
-    Takes a SQLAlchemy pagination object and a Marshmallow schema,
-    and returns a serializable dictionary. Flask-RESTX handles the
-    envelope wrapping.
+    Takes a SQLAlchemy pagination object and the model it pages over,
+    and returns a serializable dictionary using the model's precompiled
+    serializer. Flask-RESTX handles the envelope wrapping.
     """
-    items = schema.dump(pagination.items)
+    items = serializer_for(model).dump_many(pagination.items, include)
     return {
         'items': items,
         'total': pagination.total,